@@ -1,6 +1,9 @@
 
 import datetime
+import os
+import re
 from file_manager import FileManager
+from trading_calendar import get_last_trading_day, is_holiday_table_covered, is_trading_day
 
 # 파일 관리자 객체를 한 번만 초기화
 file_manager = FileManager()
@@ -21,23 +24,41 @@ def get_trading_day_folder_path():
 
 def get_last_trading_day_str():
     """
-    가장 최근의 평일(월-금)을 찾아 'YYYYMMDD' 형식의 문자열로 반환합니다.
-    (공휴일은 고려하지 않음)
+    가장 최근의 거래일을 찾아 'YYYYMMDD' 형식의 문자열로 반환합니다.
+    주말과 KRX 휴장일(trading_calendar.KRX_HOLIDAYS)을 모두 건너뜁니다.
+    환경변수 TRADING_DAY가 있으면 그 날짜를 사용합니다. (과거 날짜 재처리용)
     """
+    if os.environ.get('TRADING_DAY'):
+        return os.environ['TRADING_DAY']
+
     today = datetime.date.today()
-    
-    # 오늘이 토요일(5)이면 1일을 빼서 금요일로
-    if today.weekday() == 5:
-        last_trading_day = today - datetime.timedelta(days=1)
-    # 오늘이 일요일(6)이면 2일을 빼서 금요일로
-    elif today.weekday() == 6:
-        last_trading_day = today - datetime.timedelta(days=2)
-    # 평일이면 오늘 날짜 그대로 사용
-    else:
-        last_trading_day = today
+
+    if not is_holiday_table_covered(today):
+        print(f"경고: {today.year}년 KRX 휴장일 표가 없어 주말만 제외합니다. (trading_calendar.py)")
+
+    # 오늘이 거래일이면 오늘, 아니면(주말/휴장일) 직전 거래일
+    last_trading_day = get_last_trading_day(today)
         
     return last_trading_day.strftime("%Y%m%d")
 
+def list_previous_trading_days(tradingday, count):
+    """
+    작업 폴더에서 tradingday 이전의 거래일 폴더(YYYYMMDD)를 최신순으로 최대 count개 찾습니다.
+    뉴스 수집은 달력 날짜 폴더(get_daily_folder_path)를 만들므로, 주말/휴장일 폴더는 건너뜁니다.
+    """
+    base_path = file_manager.get_current_path()
+    days = [name for name in os.listdir(base_path)
+            if re.fullmatch(r'\d{8}', name) and name < tradingday and os.path.isdir(os.path.join(base_path, name))
+            and _is_trading_day_name(name)]
+    return sorted(days, reverse=True)[:count]
+
+def _is_trading_day_name(name):
+    """폴더 이름(YYYYMMDD)이 실제 거래일인지 확인합니다. (날짜가 아닌 8자리 숫자면 False)"""
+    try:
+        return is_trading_day(name)
+    except ValueError:
+        return False
+
 
 # --- KRX 관련 상수들 (getKrxStockList.py에서 가져옴) ---
 KRX_OTP_GENERATE_URL = 'http://data.krx.co.kr/comm/fileDn/GenerateOTP/generate.cmd'
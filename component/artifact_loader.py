@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 산출물(CSV/XLSX) 동시 로더]
+# 여러 단계에서 만든 파일들을 하나씩 차례로 읽으면 전체 시간은 "모든 파일 읽는 시간의 합"이 됩니다.
+# 이 모듈은 파일마다 필요한 컬럼(usecols)과 자료형(dtype)을 미리 정의해 두고,
+# 스레드 여러 개로 동시에 읽어 전체 시간이 "가장 오래 걸리는 파일 하나" 수준이 되도록 합니다.
+#
+# 사용 예:
+#   specs = {
+#       'krx': {'path': '.../krx_stock_list_20250102.csv', 'usecols': ['종목코드', '종목명'], 'dtype': {'종목코드': str}},
+#       'url': {'path': '.../naver_stock_chart_20250102.xlsx', 'sheet_name': '종목차트'},
+#       'rank': {'path': '.../theme_rank_20250102.csv', 'optional': True},
+#   }
+#   missing = find_missing_artifacts(specs)   # 없는 필수 파일 목록을 한 번에 확인
+#   frames = load_artifacts(specs)            # {'krx': DataFrame, 'url': DataFrame, 'rank': None}
+# -----------------------------------------------------------------------------------------
+
+
+def find_missing_artifacts(specs):
+    """
+    필수(optional이 아닌) 파일 중 존재하지 않는 파일 경로 목록을 반환합니다.
+
+    Args:
+        specs (dict): 이름 -> 파일 정보 딕셔너리 ('path', 'usecols', 'dtype', 'sheet_name', 'optional')
+    Returns:
+        list: 없는 파일 경로 리스트
+    """
+    return [spec['path'] for spec in specs.values()
+            if not spec.get('optional') and not os.path.exists(spec['path'])]
+
+
+def read_artifact(spec):
+    """
+    파일 정보 하나를 읽어 DataFrame으로 반환합니다. (optional 파일이 없으면 None)
+    확장자가 .xlsx이면 read_excel, 그 외에는 read_csv를 사용합니다.
+    """
+    path = spec['path']
+    if spec.get('optional') and not os.path.exists(path):
+        return None
+
+    kwargs = {}
+    if spec.get('usecols') is not None:
+        # 파일에 없는 컬럼을 지정해도 오류가 나지 않도록 존재하는 컬럼만 읽습니다.
+        wanted = set(spec['usecols'])
+        kwargs['usecols'] = lambda col: col in wanted
+    if spec.get('dtype') is not None:
+        kwargs['dtype'] = spec['dtype']
+
+    if path.endswith('.xlsx'):
+        df = pd.read_excel(path, sheet_name=spec.get('sheet_name', 0), **kwargs)
+    else:
+        df = pd.read_csv(path, **kwargs)
+
+    # 지정한 컬럼 순서대로 정렬
+    if spec.get('usecols') is not None:
+        df = df[[col for col in spec['usecols'] if col in df.columns]]
+    return df
+
+
+def load_artifacts(specs, max_workers=None):
+    """
+    여러 파일을 스레드로 동시에 읽습니다.
+
+    Args:
+        specs (dict): 이름 -> 파일 정보 딕셔너리
+        max_workers (int, optional): 동시에 실행할 스레드 수 (기본: 파일 수)
+    Returns:
+        dict: 이름 -> DataFrame (optional 파일이 없으면 None)
+    Raises:
+        FileNotFoundError: 필수 파일이 하나라도 없으면 (filename에 없는 파일 목록을 담아서) 발생
+    """
+    missing = find_missing_artifacts(specs)
+    if missing:
+        raise FileNotFoundError(2, f"필수 파일 {len(missing)}개가 없습니다", ', '.join(missing))
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(1, len(specs))) as executor:
+        futures = {name: executor.submit(read_artifact, spec) for name, spec in specs.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,165 @@
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+
+from common import file_manager
+from file_manager import file_sha256
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 계산 결과 캐시 (입력 파일 내용 기준)]
+# 같은 KRX 파일로 분석 단계를 다시 실행하면, 결과가 같은데도 정렬/병합/요약을 처음부터 반복합니다.
+#
+# @cached_computation 을 붙인 함수는 결과를 'compute_cache/<함수명>_<키>.pkl'에 저장해 두고,
+# 다음 호출 때 키가 같으면 계산하지 않고 저장된 결과를 바로 돌려줍니다. 키는 다음 세 가지로 만듭니다.
+#   1. 입력 파일들의 내용 해시(SHA-256)   - 파일 내용이 바뀌면 다시 계산
+#   2. 함수 인자 (JSON으로 바꿀 수 있는 값만) - 조건이 바뀌면 다시 계산
+#   3. 함수가 정의된 모듈 전체 소스 + depends로 지정한 모듈 소스 + version
+#                                        - 함수 자신뿐 아니라 함께 쓰는 함수/상수를 고쳐도 다시 계산
+#
+# 캐시 폴더가 COMPUTE_CACHE_MAX_MB(기본 500MB)를 넘으면 가장 오래 쓰지 않은 파일부터 지웁니다.
+# 환경변수 COMPUTE_CACHE=off 로 캐시를 끌 수 있습니다.
+#
+# 사용 예:
+#   @cached_computation(inputs=lambda path: [path], depends=['component.excel_utils'])
+#   def select_top(path): ...
+# -----------------------------------------------------------------------------------------
+
+DEFAULT_MAX_MB = 500
+
+_hash_memo = {}   # (경로, 크기, 수정시각) -> SHA-256 (같은 실행 안에서 같은 파일을 두 번 읽지 않음)
+
+
+def is_enabled():
+    return os.environ.get('COMPUTE_CACHE', 'on').lower() != 'off'
+
+
+def get_compute_cache_path():
+    """계산 캐시 폴더 경로를 반환하고, 필요하면 생성합니다."""
+    return file_manager.make_folder('compute_cache')
+
+
+def content_hash(path):
+    """입력 파일의 내용 해시. 파일이 없으면 'missing'을 반환합니다. (없던 파일이 생기면 키가 바뀜)"""
+    if not os.path.exists(path):
+        return 'missing'
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _hash_memo:
+        _hash_memo[memo_key] = file_sha256(path)
+    return _hash_memo[memo_key]
+
+
+def code_source(func):
+    """함수의 소스 코드 (소스 파일을 찾을 수 없으면 바이트코드와 상수로 대신합니다)"""
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return repr((func.__code__.co_code, func.__code__.co_consts))
+
+
+def module_source(name):
+    """모듈 이름으로 모듈 파일 전체 내용을 읽습니다. (임포트하지 않음, 찾을 수 없으면 None)"""
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+        return None
+    with open(spec.origin, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def dependency_source(func, depends):
+    """
+    캐시 키에 넣을 코드: 함수가 정의된 모듈 전체 + depends 모듈 전체.
+    같은 모듈의 다른 함수나 상수(선정 기준 등)를 고쳐도 키가 바뀌게 하기 위해 모듈 단위로 읽습니다.
+    """
+    sources = [module_source(func.__module__) or code_source(func)]
+    for name in depends:
+        source = module_source(name)
+        if source is None:
+            raise ValueError(f"계산 캐시 의존 모듈을 찾을 수 없습니다: {name}")
+        sources.append(source)
+    return '\n'.join(sources)
+
+
+def evict(cache_path, max_bytes):
+    """캐시 폴더 크기가 max_bytes를 넘으면 가장 오래 쓰지 않은 파일부터 지웁니다."""
+    entries = []
+    for name in os.listdir(cache_path):
+        if name.endswith('.pkl'):
+            path = os.path.join(cache_path, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+
+def cached_computation(inputs=None, version='', depends=()):
+    """
+    계산 결과를 입력 파일 내용/인자/코드 기준으로 디스크에 캐시하는 데코레이터입니다.
+
+    Args:
+        inputs (callable, optional): 함수와 같은 인자를 받아 입력 파일 경로 리스트를 반환하는 함수
+        version (str): 코드 외의 이유로 캐시를 무효화하고 싶을 때 바꾸는 값
+        depends (list): 결과에 영향을 주는 다른 모듈 이름 (예: ['component.excel_utils'])
+    Returns:
+        데코레이터. 감싼 함수에는 is_cached(*args, **kwargs) 메서드가 추가됩니다.
+    """
+    def decorate(func):
+        code_hash = hashlib.sha1((dependency_source(func, depends) + version).encode('utf-8')).hexdigest()
+
+        def cache_file(args, kwargs):
+            bound = inspect.signature(func).bind(*args, **kwargs)
+            bound.apply_defaults()
+            paths = inputs(*args, **kwargs) if inputs else []
+            try:
+                # 문자열로 바꿔 넣으면 서로 다른 값(예: 잘린 DataFrame 출력)이 같은 키가 될 수 있으므로 거부합니다.
+                key_source = json.dumps({
+                    'code': code_hash,
+                    'args': bound.arguments,
+                    'inputs': [content_hash(p) for p in paths],
+                }, sort_keys=True, ensure_ascii=False)
+            except TypeError as e:
+                raise TypeError(f"계산 캐시 함수의 인자는 JSON으로 바꿀 수 있는 값이어야 합니다 ({func.__name__}): {e}")
+            key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()[:20]
+            return os.path.join(get_compute_cache_path(), f'{func.__name__}_{key}.pkl')
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return func(*args, **kwargs)
+
+            path = cache_file(args, kwargs)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'rb') as f:
+                        result = pickle.load(f)
+                    os.utime(path)  # 최근 사용 시각 갱신 (오래 안 쓴 것부터 지우기 위해)
+                    print(f"계산 캐시 사용: {func.__name__}")
+                    return result
+                except Exception as e:
+                    print(f"계산 캐시를 읽지 못해 다시 계산합니다 ({func.__name__}): {e}")
+
+            result = func(*args, **kwargs)
+            # 캐시 파일은 산출물이 아니므로 manifest에 기록하지 않고, 임시 파일 + 이름 바꾸기만 합니다.
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            evict(os.path.dirname(path), int(os.environ.get('COMPUTE_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+            return result
+
+        def is_cached(*args, **kwargs):
+            """같은 인자/입력으로 저장된 결과가 있으면 True"""
+            return is_enabled() and os.path.exists(cache_file(args, kwargs))
+
+        wrapper.is_cached = is_cached
+        return wrapper
+    return decorate
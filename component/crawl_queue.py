@@ -0,0 +1,359 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import time
+
+import pandas as pd
+
+from common import file_manager, get_last_trading_day_str
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 여러 프로세스가 나눠 하는 크롤링 작업 큐]
+# 테마 상세(수백 페이지), 시가총액(약 100페이지)처럼 요청이 많은 크롤링은
+# 파이썬 프로세스 하나, IP 하나의 속도 제한에 묶여 있었습니다.
+#
+# 이 모듈은 크롤링할 일을 '작업(task)' 단위로 SQLite 파일에 넣어 두고,
+# 여러 작업자(worker) 프로세스가 하나씩 빌려(lease) 가서 처리하게 합니다.
+#   1. enqueue : 작업 목록을 큐에 넣습니다. (작업마다 순번 seq를 붙여 결과 순서를 고정)
+#   2. work    : 작업자가 작업을 빌려 처리하고 결과(행 목록)를 큐에 돌려줍니다.
+#                빌린 작업은 visibility timeout(기본 120초) 동안 다른 작업자에게 보이지 않으며,
+#                그 안에 끝내지 못하면(작업자가 죽은 경우 등) 다른 작업자가 다시 가져갑니다.
+#   3. collect : 모든 작업이 끝나면 결과를 순번대로 이어 붙여 기존 수집기와 같은 CSV를 만듭니다.
+#                (어떤 작업자가 어떤 순서로 처리했든 항상 같은 파일이 나옵니다)
+#                테마 상세는 다음 거래일의 증분 수집이 쓰는 수집 상태 파일도 함께 만듭니다.
+#
+# 뉴스 수집은 작업 큐로 나누지 않습니다. 이미 본 URL 집합(SeenSet)과 뉴스 저장소(news_store)를
+# 거쳐야 파이프라인이 쓰는 결과가 나오므로, 기존 수집기(getNaverNewsList, getStockNews)로 실행합니다.
+#
+# 큐 파일은 기본으로 작업 폴더의 'crawl_queue.sqlite3'이며, 같은 컴퓨터의 여러 프로세스가 함께 씁니다.
+# (이때는 읽기와 쓰기가 서로 막지 않는 WAL 모드를 사용합니다)
+# --db로 다른 경로를 지정하면 WAL 대신 기본 저널 모드를 씁니다. WAL은 공유 메모리가 필요해서
+# 네트워크 파일 시스템(공유 폴더)에서는 동작하지 않기 때문입니다. 다만 기본 저널 모드도 파일 잠금에 의존하므로,
+# 잠금이 불안정한 공유 폴더(일부 NFS/SMB)에서는 여러 컴퓨터가 함께 쓰면 안전하지 않습니다.
+# 여러 컴퓨터로 나눠 실행하려면 CrawlQueue와 같은 메서드를 가진 다른 저장소(Redis 등)를 만드는 것을 권장합니다.
+#
+# 실행 예시:
+#   python3 -m component.crawl_queue enqueue theme_detail
+#   python3 -m component.crawl_queue work theme_detail     # 여러 터미널에서 동시에 실행 가능
+#   python3 -m component.crawl_queue collect theme_detail
+#   python3 -m component.crawl_queue status theme_detail
+# -----------------------------------------------------------------------------------------
+
+QUEUE_FILENAME = 'crawl_queue.sqlite3'
+VISIBILITY_TIMEOUT = 120
+MAX_ATTEMPTS = 3
+
+STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED = 'pending', 'leased', 'done', 'failed'
+
+
+class CrawlQueue:
+    """SQLite 파일 하나로 여러 프로세스가 공유하는 작업 큐입니다."""
+
+    def __init__(self, path=None, wal=None):
+        """
+        Args:
+            path (str, optional): 큐 파일 경로 (없으면 작업 폴더의 crawl_queue.sqlite3)
+            wal (bool, optional): WAL 모드 사용 여부. 지정하지 않으면 기본 경로일 때만 사용합니다.
+                                  (WAL은 공유 메모리가 필요해 네트워크 공유 폴더에서는 쓸 수 없음)
+        """
+        self.path = path or os.path.join(file_manager.get_current_path(), QUEUE_FILENAME)
+        if wal is None:
+            wal = path is None
+        # isolation_level=None: 트랜잭션을 직접 BEGIN/COMMIT으로 관리합니다.
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                job TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_until REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                result TEXT,
+                error TEXT,
+                PRIMARY KEY (job, seq)
+            )""")
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, job, payloads):
+        """
+        작업 목록을 큐에 넣습니다. 이미 들어 있는 순번은 그대로 둡니다. (다시 실행해도 안전)
+
+        Args:
+            job (str): 작업 묶음 이름 (예: 'theme_detail_20250102')
+            payloads (list): 작업별 인자 딕셔너리 리스트 (리스트 순서가 결과 순서)
+        Returns:
+            int: 새로 추가된 작업 수
+        """
+        rows = [(job, seq, json.dumps(payload, ensure_ascii=False)) for seq, payload in enumerate(payloads)]
+        before = self.conn.total_changes
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.executemany('INSERT OR IGNORE INTO tasks (job, seq, payload) VALUES (?, ?, ?)', rows)
+        self.conn.execute('COMMIT')
+        return self.conn.total_changes - before
+
+    def lease(self, job, worker, visibility_timeout=VISIBILITY_TIMEOUT, max_attempts=MAX_ATTEMPTS):
+        """
+        처리할 작업 하나를 빌립니다. 대기 중이거나, 빌려 간 작업자의 제한 시간이 지난 작업이 대상입니다.
+        제한 시간이 지난 작업 중 이미 max_attempts번 빌려 간 작업은 실패로 처리합니다.
+        (작업자를 죽이거나 멈추게 하는 작업이 끝없이 다시 나오지 않도록)
+
+        Returns:
+            tuple: (순번, 인자 딕셔너리) 또는 None (빌릴 작업이 없으면)
+        """
+        now = time.time()
+        # BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡아 두 작업자가 같은 작업을 빌리지 않게 합니다.
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(
+                'UPDATE tasks SET status = ?, error = ? '
+                'WHERE job = ? AND status = ? AND lease_until < ? AND attempts >= ?',
+                (STATUS_FAILED, f'제한 시간 초과 {max_attempts}회 (작업자 중단 또는 멈춤)',
+                 job, STATUS_LEASED, now, max_attempts))
+            row = self.conn.execute(
+                'SELECT seq, payload FROM tasks WHERE job = ? AND (status = ? OR (status = ? AND lease_until < ?)) '
+                'ORDER BY seq LIMIT 1', (job, STATUS_PENDING, STATUS_LEASED, now)).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    'UPDATE tasks SET status = ?, lease_until = ?, attempts = attempts + 1, worker = ? '
+                    'WHERE job = ? AND seq = ?', (STATUS_LEASED, now + visibility_timeout, worker, job, row[0]))
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return (row[0], json.loads(row[1])) if row else None
+
+    def complete(self, job, seq, worker, rows):
+        """작업 결과(행 목록)를 저장합니다. 제한 시간이 지나 다른 작업자가 가져간 작업이면 무시됩니다."""
+        cursor = self.conn.execute(
+            'UPDATE tasks SET status = ?, result = ?, error = NULL WHERE job = ? AND seq = ? AND worker = ? AND status = ?',
+            (STATUS_DONE, json.dumps(rows, ensure_ascii=False), job, seq, worker, STATUS_LEASED))
+        return cursor.rowcount == 1
+
+    def fail(self, job, seq, worker, error, max_attempts=MAX_ATTEMPTS):
+        """작업 실패를 기록합니다. 시도 횟수가 max_attempts 미만이면 다시 대기 상태로 돌립니다."""
+        self.conn.execute(
+            'UPDATE tasks SET status = CASE WHEN attempts < ? THEN ? ELSE ? END, lease_until = 0, error = ? '
+            'WHERE job = ? AND seq = ? AND worker = ? AND status = ?',
+            (max_attempts, STATUS_PENDING, STATUS_FAILED, str(error), job, seq, worker, STATUS_LEASED))
+
+    def counts(self, job):
+        """상태별 작업 수를 반환합니다. 예: {'pending': 10, 'leased': 2, 'done': 88}"""
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM tasks WHERE job = ? GROUP BY status', (job,)).fetchall())
+
+    def results(self, job):
+        """
+        완료된 작업의 결과 행을 순번대로 이어 붙여 반환합니다.
+
+        Returns:
+            tuple: (행 리스트, 완료되지 않은 작업 수)
+        """
+        rows, unfinished = [], 0
+        for status, result in self.conn.execute('SELECT status, result FROM tasks WHERE job = ? ORDER BY seq', (job,)):
+            if status == STATUS_DONE:
+                rows.extend(json.loads(result))
+            else:
+                unfinished += 1
+        return rows, unfinished
+
+    def errors(self, job):
+        """실패한 작업의 (순번, 인자, 오류 메시지) 목록을 반환합니다."""
+        return [(seq, json.loads(payload), error) for seq, payload, error in self.conn.execute(
+            'SELECT seq, payload, error FROM tasks WHERE job = ? AND status = ? ORDER BY seq', (job, STATUS_FAILED))]
+
+
+# -----------------------------------------------------------------------------------------
+# 작업 종류 (크롤러별 작업 목록 만들기 / 작업 하나 처리하기 / 결과 파일 이름)
+# -----------------------------------------------------------------------------------------
+
+# 작업 종류 이름 -> {'tasks': 작업 목록 생성 함수, 'handler': 작업 처리 함수, 'output': 결과 파일 이름,
+#                    'collected': 결과 파일 저장 후 추가로 할 일 (없으면 None)}
+JOBS = {}
+
+
+def job(name, output):
+    """
+    작업 종류를 JOBS에 등록하는 데코레이터입니다.
+    (처리 함수에 붙이고, 목록 생성 함수는 .tasks, 결과 저장 후 추가 작업은 .collected로 등록)
+    """
+    def register(handler):
+        JOBS[name] = {'handler': handler, 'output': output, 'tasks': None, 'collected': None}
+
+        def tasks(func):
+            JOBS[name]['tasks'] = func
+            return func
+
+        def collected(func):
+            JOBS[name]['collected'] = func
+            return func
+        handler.tasks = tasks
+        handler.collected = collected
+        return handler
+    return register
+
+
+@job('theme_detail', 'naver_themes_dtl_list_{tradingday}.csv')
+def theme_detail(payload):
+    from component.naverstock import getNaverThemDtl
+    return getNaverThemDtl.get_theme_detail(payload['테마명'], payload['전일대비'], payload['테마번호'])
+
+
+@theme_detail.tasks
+def theme_detail_tasks(tradingday, folder_path):
+    theme_list_file = os.path.join(folder_path, f'naver_themes_list_{tradingday}.csv')
+    if not os.path.exists(theme_list_file):
+        print(f"오류: 테마 목록 파일이 없습니다. ({theme_list_file})")
+        return []
+    theme_df = pd.read_csv(theme_list_file).dropna(subset=['상세url'])
+    return [{'테마명': row['테마명'], '전일대비': row['전일대비'], '테마번호': row['상세url'].split('no=')[1]}
+            for _, row in theme_df.iterrows()]
+
+
+@theme_detail.collected
+def theme_detail_collected(rows, tradingday, folder_path):
+    """getNaverThemDtl.naverThemeDtl과 같이 수집 상태 파일을 저장합니다. (모든 테마를 이날 수집한 것으로 기록)"""
+    from component.naverstock import getNaverThemDtl
+    theme_df = pd.read_csv(os.path.join(folder_path, f'naver_themes_list_{tradingday}.csv')).dropna(subset=['상세url'])
+    row_counts = pd.DataFrame(rows, columns=['테마']).groupby('테마').size()
+    state_rows = []
+    for _, row in theme_df.iterrows():
+        member_count = getNaverThemDtl.get_theme_member_count(row)
+        state_rows.append({
+            '테마': row['테마명'],
+            '테마번호': row['상세url'].split('no=')[1],
+            '종목수': member_count if member_count is not None else int(row_counts.get(row['테마명'], 0)),
+            '수집일': tradingday,
+        })
+    getNaverThemDtl.save_theme_state(state_rows, folder_path, tradingday)
+
+
+@job('market_cap', 'stock_dtl_list_{tradingday}.csv')
+def market_cap(payload):
+    from component.naverstock import getStockDtl
+    url = f"https://finance.naver.com/sise/sise_market_sum.naver?sosok={payload['sosok']}&page={payload['page']}"
+    rows = getStockDtl.get_market_cap_info(payload['sosok'], url)
+    # 마지막 페이지를 넘으면 빈 리스트, 요청/응답 오류면 None이 옵니다.
+    # 오류는 예외로 올려 다시 시도하게 합니다. (빈 결과로 완료 처리하면 그 페이지 종목이 파일에서 빠짐)
+    if rows is None:
+        raise RuntimeError(f"시가총액 페이지 수집 실패 (sosok={payload['sosok']}, page={payload['page']})")
+    return rows
+
+
+@market_cap.tasks
+def market_cap_tasks(tradingday, folder_path):
+    return [{'sosok': sosok, 'page': page} for sosok in range(0, 2) for page in range(1, 50)]
+
+
+def job_key(name, tradingday):
+    """큐 안에서 쓰는 작업 묶음 이름 (작업 종류 + 거래일)"""
+    return f'{name}_{tradingday}'
+
+
+def enqueue_job(queue, name, tradingday=None):
+    """작업 종류의 작업 목록을 만들어 큐에 넣습니다."""
+    tradingday = tradingday or get_last_trading_day_str()
+    payloads = JOBS[name]['tasks'](tradingday, file_manager.make_folder(tradingday))
+    added = queue.enqueue(job_key(name, tradingday), payloads)
+    print(f"[{name}] 작업 {len(payloads)}개 중 {added}개를 큐에 추가했습니다.")
+    return added
+
+
+def run_worker(queue, name, tradingday=None, worker=None, visibility_timeout=VISIBILITY_TIMEOUT,
+               delay=0.5, max_tasks=None):
+    """
+    큐에서 작업을 빌려 처리하는 작업자 루프입니다. 남은 작업이 없으면 끝납니다.
+
+    Args:
+        queue (CrawlQueue): 작업 큐
+        name (str): 작업 종류 이름
+        worker (str, optional): 작업자 이름 (없으면 '호스트명:PID')
+        visibility_timeout (float): 빌린 작업을 다른 작업자에게 숨기는 시간 (초)
+        delay (float): 작업 사이 대기 시간 (서버 부하 방지)
+        max_tasks (int, optional): 처리할 최대 작업 수
+    Returns:
+        int: 처리한 작업 수
+    """
+    from component import raw_archive
+
+    tradingday = tradingday or get_last_trading_day_str()
+    key = job_key(name, tradingday)
+    worker = worker or f'{socket.gethostname()}:{os.getpid()}'
+    handler = JOBS[name]['handler']
+
+    processed = 0
+    while max_tasks is None or processed < max_tasks:
+        leased = queue.lease(key, worker, visibility_timeout)
+        if leased is None:
+            # 다른 작업자가 처리 중인 작업이 있으면, 제한 시간이 지나 다시 나올 때까지 기다립니다.
+            if queue.counts(key).get(STATUS_LEASED):
+                time.sleep(min(5, visibility_timeout))
+                continue
+            break
+
+        seq, payload = leased
+        try:
+            rows = handler(payload)
+            queue.complete(key, seq, worker, rows)
+            print(f"[{worker}] {name} #{seq} 완료 ({len(rows)}행)")
+        except Exception as e:
+            queue.fail(key, seq, worker, e)
+            print(f"[{worker}] {name} #{seq} 실패: {e}")
+        processed += 1
+        raw_archive.polite_sleep(delay)
+
+    return processed
+
+
+def collect_job(queue, name, tradingday=None):
+    """
+    완료된 작업 결과를 순번대로 모아 거래일 폴더에 CSV로 저장합니다.
+    끝나지 않은 작업이 있으면 저장하지 않습니다.
+
+    Returns:
+        str: 저장한 파일 경로 (저장하지 않았으면 None)
+    """
+    tradingday = tradingday or get_last_trading_day_str()
+    key = job_key(name, tradingday)
+    rows, unfinished = queue.results(key)
+    if unfinished:
+        print(f"[{name}] 아직 끝나지 않은 작업이 {unfinished}개 있습니다. {queue.counts(key)}")
+        for seq, payload, error in queue.errors(key):
+            print(f"  - 실패 #{seq} {payload}: {error}")
+        return None
+
+    folder_path = file_manager.make_folder(tradingday)
+    save_path = os.path.join(folder_path, JOBS[name]['output'].format(tradingday=tradingday))
+    with file_manager.atomic_write(save_path) as tmp_path:
+        pd.DataFrame(rows).to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    print(f"[{name}] {len(rows)}행을 '{os.path.basename(save_path)}'로 저장했습니다.")
+    if JOBS[name]['collected'] is not None:
+        JOBS[name]['collected'](rows, tradingday, folder_path)
+    return save_path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="여러 프로세스가 나눠 하는 크롤링 작업 큐")
+    parser.add_argument('command', choices=['enqueue', 'work', 'collect', 'status'])
+    parser.add_argument('job', choices=sorted(JOBS), help="작업 종류")
+    parser.add_argument('--day', help="거래일 (YYYYMMDD, 기본: 최근 거래일)")
+    parser.add_argument('--db', help=f"큐 파일 경로 (기본: 작업 폴더의 {QUEUE_FILENAME}, 지정하면 WAL 모드를 쓰지 않음)")
+    parser.add_argument('--timeout', type=float, default=VISIBILITY_TIMEOUT, help="작업 제한 시간(초)")
+    parser.add_argument('--delay', type=float, default=0.5, help="작업 사이 대기 시간(초)")
+    args = parser.parse_args()
+
+    crawl_queue = CrawlQueue(args.db)
+    if args.command == 'enqueue':
+        enqueue_job(crawl_queue, args.job, args.day)
+    elif args.command == 'work':
+        run_worker(crawl_queue, args.job, args.day, visibility_timeout=args.timeout, delay=args.delay)
+    elif args.command == 'collect':
+        collect_job(crawl_queue, args.job, args.day)
+    else:
+        print(crawl_queue.counts(job_key(args.job, args.day or get_last_trading_day_str())))
+    crawl_queue.close()
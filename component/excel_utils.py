@@ -3,16 +3,22 @@ from openpyxl.styles import PatternFill
 from openpyxl.utils import get_column_letter
 from collections import Counter
 
-def create_theme_summary(df):
+def create_theme_summary(df, theme_index=None):
     """
     주식 분석 데이터프레임에서 테마별 빈도수를 집계하여 요약 데이터프레임을 생성합니다.
     
     Args:
         df (pd.DataFrame): '테마_x' 컬럼들이 포함된 원본 데이터프레임
+        theme_index (ThemeIndex, optional): 종목×테마 인덱스. 있으면 '종목코드' 기준으로 바로 집계합니다.
         
     Returns:
         pd.DataFrame: '테마', '종목갯수' 컬럼을 가진 요약 데이터프레임 (종목갯수 내림차순 정렬)
     """
+    # 테마 인덱스가 있으면 melt 없이 벡터 연산으로 집계
+    if theme_index is not None:
+        counts = theme_index.theme_counts(df['종목코드'])
+        return counts.rename_axis('테마').reset_index(name='종목갯수')
+
     # 1. '테마_'로 시작하는 모든 컬럼 찾기
     theme_cols = [col for col in df.columns if col.startswith('테마_')]
     
@@ -32,7 +38,7 @@ def create_theme_summary(df):
     
     return summary_df
 
-def apply_conditional_formatting(writer, sheet_name, df):
+def apply_conditional_formatting(writer, sheet_name, df, theme_index=None):
     """
     엑셀 시트에 조건부 서식(색상 강조)을 적용합니다.
     
@@ -45,6 +51,7 @@ def apply_conditional_formatting(writer, sheet_name, df):
         writer (pd.ExcelWriter): Pandas ExcelWriter 객체
         sheet_name (str): 서식을 적용할 시트 이름
         df (pd.DataFrame): 해당 시트에 기록된 원본 데이터프레임 (데이터 참조용)
+        theme_index (ThemeIndex, optional): 종목×테마 인덱스. 있으면 테마 빈도수를 인덱스로 계산합니다.
     """
     # 워크시트 객체 가져오기
     ws = writer.sheets[sheet_name]
@@ -65,14 +72,18 @@ def apply_conditional_formatting(writer, sheet_name, df):
     theme_cols_idx = [i for name, i in headers.items() if str(name).startswith('테마_')]
     
     # 테마 빈도수 계산 (전체 데이터 기준)
-    # 1. 테마 컬럼 이름들 가져오기
-    theme_col_names = [col for col in df.columns if col.startswith('테마_')]
-    # 2. 2차원 데이터를 1차원 리스트로 펼치기 (flatten)
-    all_themes = df[theme_col_names].values.flatten()
-    # 3. 유효한 테마만 필터링
-    all_themes = [t for t in all_themes if pd.notna(t) and t != '']
-    # 4. 각 테마가 몇 번 등장했는지 카운트
-    theme_counts = Counter(all_themes)
+    if theme_index is not None:
+        # 테마 인덱스로 종목 집합 안의 테마 빈도를 한 번에 계산
+        theme_counts = theme_index.theme_counts(df['종목코드']).to_dict()
+    else:
+        # 1. 테마 컬럼 이름들 가져오기
+        theme_col_names = [col for col in df.columns if col.startswith('테마_')]
+        # 2. 2차원 데이터를 1차원 리스트로 펼치기 (flatten)
+        all_themes = df[theme_col_names].values.flatten()
+        # 3. 유효한 테마만 필터링
+        all_themes = [t for t in all_themes if pd.notna(t) and t != '']
+        # 4. 각 테마가 몇 번 등장했는지 카운트
+        theme_counts = Counter(all_themes)
     
     # 데이터 행 순회 (헤더 다음인 2번째 행부터 끝까지)
     for row in range(2, ws.max_row + 1):
@@ -2,6 +2,7 @@ import pandas as pd
 import os
 import datetime
 from common import file_manager, get_daily_folder_path, get_today_str, get_last_trading_day_str,get_trading_day_folder_path
+from component.artifact_loader import find_missing_artifacts, load_artifacts
 
 def getFileSum():
     # 거래일자 설정
@@ -13,9 +14,6 @@ def getFileSum():
     # CSV 파일로 저장
     output_filename = f'total_{tradingday}.xlsx'
     
-    # 동일 파일 삭제
-    file_manager.check_and_delete_file(folder_path+'/'+ output_filename)
-
     # 파일 경로 설정
     krx_file = folder_path + f'/krx_stock_list_{tradingday}.csv'
     krx_100_file = folder_path + f'/krx_top_100_{tradingday}.csv'
@@ -24,48 +22,84 @@ def getFileSum():
     stock_dtl_file = folder_path + f'/stock_dtl_list_{tradingday}.csv'
     stock_analysis = folder_path + f'/00_stock_analysis_pivoted_{tradingday}.xlsx'
     stock_url = folder_path + f'/naver_stock_chart_{tradingday}.xlsx'
-
-
-    # 각 CSV 파일 읽기
-    try:
-        # KRX 주식 목록 읽기 (필요한 컬럼만 선택)
-        krx_df = pd.read_csv(krx_file, usecols=['종목코드', '종목명', '시장구분', '상장주식수', '고가','저가','종가', '등락률'])
-        
-        krx_100_df = pd.read_csv(krx_100_file)
-
-        # 테마 목록 읽기
-        theme_df = pd.read_csv(theme_file)
-        
-        # 테마 상세 목록 읽기
-        theme_dtl_df = pd.read_csv(theme_dtl_file)
-
-        # 종목 상세 목록 읽기
-        stock_dtl_df = pd.read_csv(stock_dtl_file)
-
-        # url 
-        stock_url_df = pd.read_excel(stock_url)
-
+    theme_analytics_file = folder_path + f'/theme_analytics_{tradingday}.csv'
+    theme_rank_file = folder_path + f'/theme_rank_{tradingday}.csv'
+    snapshot_diff_file = folder_path + f'/snapshot_diff_{tradingday}.csv'
+
+    # 파일별로 시트에 필요한 컬럼과 자료형을 지정합니다.
+    # 종목코드는 문자열로 읽어야 앞자리 0이 사라지지 않습니다. (005930 -> 5930 방지)
+    code_dtype = {'종목코드': str}
+    specs = {
+        # KRX 주식 목록 (필요한 컬럼만 선택)
+        'krx': {'path': krx_file, 'usecols': ['종목코드', '종목명', '시장구분', '상장주식수', '고가','저가','종가', '등락률'], 'dtype': code_dtype},
+        'krx_100': {'path': krx_100_file, 'usecols': ['종목코드', '종목명'], 'dtype': code_dtype},
+        # 테마 목록
+        'theme': {'path': theme_file, 'usecols': ['테마명', '전일대비', '상세url']},
+        # 테마 상세 목록
+        'theme_dtl': {'path': theme_dtl_file, 'usecols': ['테마', '테마등락률', '종목코드', '종목명', '전일비', '등락률', '거래량', '편입사유'], 'dtype': {'종목코드': str, '전일비': str, '편입사유': str}},
+        # 종목 상세 목록
+        'stock_dtl': {'path': stock_dtl_file, 'usecols': ['종목코드', '종목명', '구분', '현재가', '전일비', '등락률', '거래량', 'PER'], 'dtype': {'종목코드': str, '전일비': str}},
+        # url
+        'stock_url': {'path': stock_url, 'dtype': code_dtype},
         # 등락률 15% 이상 & 거래대금 500억 이상
-        stock_analysis_df = pd.read_excel(stock_analysis)
+        'stock_analysis': {'path': stock_analysis, 'sheet_name': '종목분석', 'dtype': code_dtype},
+        # 테마별 요약 (분석 단계에서 이미 만든 시트를 그대로 사용)
+        'theme_summary': {'path': stock_analysis, 'sheet_name': '테마별분석'},
+        # 테마 강도/순위 추이 (theme_analytics 단계가 실행된 경우에만 추가)
+        'theme_analytics': {'path': theme_analytics_file, 'optional': True},
+        'theme_rank': {'path': theme_rank_file, 'optional': True},
+        # 전일 대비 변화 (snapshot_diff 단계가 실행된 경우에만 추가)
+        'snapshot_diff': {'path': snapshot_diff_file, 'dtype': code_dtype, 'optional': True},
+    }
+
+    # 없는 파일을 처음에 한 번에 확인하여 알려줍니다.
+    missing = find_missing_artifacts(specs)
+    if missing:
+        print(f"필수 파일 {len(missing)}개를 찾을 수 없습니다:")
+        for path in missing:
+            print(f" - {path}")
+        return
+
+    # 각 파일을 동시에 읽기
+    try:
+        frames = load_artifacts(specs)
+
+        krx_df = frames['krx']
+        krx_100_df = frames['krx_100']
+        theme_df = frames['theme']
+        theme_dtl_df = frames['theme_dtl']
+        stock_dtl_df = frames['stock_dtl']
+        stock_url_df = frames['stock_url']
+        stock_analysis_df = frames['stock_analysis']
+        theme_summary_df = frames['theme_summary']
+        theme_analytics_df = frames['theme_analytics']
+        theme_rank_df = frames['theme_rank']
+        snapshot_diff_df = frames['snapshot_diff']
         
         # 거래대금 억원 단위로 변환
         # stock_analysis_df['거래대금'] = (stock_analysis_df['거래대금'] / 100000000).round(1)
         
-        # 정렬: 선정사유(오름차순), 거래대금(내림차순)
-        stock_analysis_df = stock_analysis_df.sort_values(by=['선정사유', '거래대금'], ascending=[True, False])
+        # 정렬(선정사유 오름차순, 거래대금 내림차순)과 테마별 요약은 분석 단계(daily_analysis_stocks)에서
+        # 이미 끝난 결과를 그대로 읽어 쓰므로 여기서 다시 계산하지 않습니다.
+        from component.excel_utils import apply_conditional_formatting, auto_adjust_column_width
         
+        from component.stockanalysis.theme_index import load_theme_index
 
-        # 테마별 요약 정보 생성 (excel_utils 모듈 사용)
-        # create_theme_summary 함수는 '테마' 컬럼을 기준으로 종목 수를 세어 반환합니다.
-        from component.excel_utils import create_theme_summary, apply_conditional_formatting, auto_adjust_column_width
-        
-        theme_summary_df = create_theme_summary(stock_analysis_df)
+        # 종목×테마 인덱스 (거래일당 한 번 생성된 것을 재사용, 조건부 서식에 사용)
+        theme_index = load_theme_index(tradingday, folder_path)
 
         # Excel 파일로 저장 (with 구문을 사용하여 파일을 안전하게 열고 닫음)
-        with pd.ExcelWriter(folder_path + '/' +output_filename, engine='openpyxl') as writer:
+        # 임시 파일에 쓴 뒤 한 번에 교체하므로, 중간에 오류가 나도 이전 파일이 그대로 남습니다.
+        with file_manager.atomic_write(folder_path + '/' +output_filename) as tmp_path, pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
             # 각 데이터프레임을 지정된 시트 이름으로 저장
             stock_analysis_df.to_excel(writer, sheet_name='종목분석', index=False)
             theme_summary_df.to_excel(writer, sheet_name='테마별분석', index=False)
+            if theme_analytics_df is not None:
+                theme_analytics_df.to_excel(writer, sheet_name='테마강도', index=False)
+            if theme_rank_df is not None:
+                theme_rank_df.to_excel(writer, sheet_name='테마순위추이', index=False)
+            if snapshot_diff_df is not None:
+                snapshot_diff_df.to_excel(writer, sheet_name='전일대비변화', index=False)
             krx_df.to_excel(writer, sheet_name='주식종목', index=False)
             krx_100_df.to_excel(writer, sheet_name='거래상위100종목', index=False)
             stock_dtl_df.to_excel(writer, sheet_name='주식종목상세', index=False)
@@ -77,7 +111,7 @@ def getFileSum():
             
             # 1. 조건부 서식 적용 (색상 강조)
             # 선정사유(A/B)와 테마 빈도수에 따라 셀 색상을 변경합니다.
-            apply_conditional_formatting(writer, '종목분석', stock_analysis_df)
+            apply_conditional_formatting(writer, '종목분석', stock_analysis_df, theme_index)
 
             # 2. 컬럼 너비 자동 조정
             # 글자 수에 맞춰 열 너비를 적절하게 늘려줍니다.
@@ -0,0 +1,89 @@
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from common import file_manager
+from trading_calendar import trading_days_between
+from component.krx.getKrxStockList import download_krx_stock_list, save_krx_stock_list
+from component.krx.krxReport import RateLimiter, RateLimitedSession
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: KRX 과거 시세 일괄 수집(backfill)]
+# 지정한 기간의 모든 거래일에 대해 KRX 전종목 시세(OTP 다운로드, trdDd 파라미터)를 받아
+# 각 거래일 폴더(YYYYMMDD)에 'krx_stock_list_YYYYMMDD.csv/xlsx'로 저장합니다.
+#
+# - 거래일 달력(trading_calendar)으로 주말/휴장일은 처음부터 제외합니다.
+# - 이미 저장된 날짜는 건너뜁니다.
+# - 여러 스레드로 동시에 받되, RateLimiter로 초당 요청 수를 제한해 서버에 무리를 주지 않습니다.
+#
+# 실행 예시:
+#   python3 -m component.krx.backfillKrxStockList 20250101 20251231 --workers 4 --rate 2
+# -----------------------------------------------------------------------------------------
+
+
+def is_already_stored(tradingday):
+    """해당 거래일의 KRX 시세 파일이 이미 저장되어 있는지 확인합니다."""
+    folder_path = os.path.join(file_manager.get_current_path(), tradingday)
+    return os.path.exists(os.path.join(folder_path, f'krx_stock_list_{tradingday}.csv'))
+
+
+def backfill_krx_stock_list(start, end, workers=4, rate=2.0):
+    """
+    start ~ end 기간의 거래일별 KRX 전종목 시세를 동시에 수집합니다.
+
+    Args:
+        start (str): 시작일 (YYYYMMDD)
+        end (str): 종료일 (YYYYMMDD)
+        workers (int): 동시에 실행할 스레드 수
+        rate (float): 전체 스레드 합계 초당 최대 요청 수
+    Returns:
+        dict: {'saved': [...], 'skipped': [...], 'failed': {날짜: 오류메시지}}
+    """
+    print("=" * 50)
+    print(f"KRX 전종목 시세 과거 데이터 수집: {start} ~ {end}")
+    print("=" * 50)
+
+    days = trading_days_between(start, end)
+    skipped = [day for day in days if is_already_stored(day)]
+    targets = [day for day in days if not is_already_stored(day)]
+    print(f"거래일 {len(days)}일 중 이미 저장된 {len(skipped)}일을 건너뛰고 {len(targets)}일을 수집합니다.")
+
+    limiter = RateLimiter(rate)
+    local = threading.local()
+
+    def fetch_and_save(day):
+        # 스레드마다 세션 하나를 만들어 연결(keep-alive)을 재사용합니다.
+        if not hasattr(local, 'session'):
+            local.session = RateLimitedSession(limiter)
+        df = download_krx_stock_list(day, session=local.session)
+        folder_path = file_manager.make_folder(day)
+        save_krx_stock_list(df, day, folder_path)
+        return len(df)
+
+    saved, failed = [], {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch_and_save, day): day for day in targets}
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                count = future.result()
+                saved.append(day)
+                print(f"[{len(saved) + len(failed)}/{len(targets)}] {day} 저장 완료 ({count}개 종목)")
+            except Exception as e:
+                failed[day] = str(e)
+                print(f"[{len(saved) + len(failed)}/{len(targets)}] {day} 수집 실패: {e}")
+
+    print(f"\n완료: 저장 {len(saved)}일 / 건너뜀 {len(skipped)}일 / 실패 {len(failed)}일")
+    return {'saved': sorted(saved), 'skipped': skipped, 'failed': failed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KRX 전종목 시세 과거 데이터 수집")
+    parser.add_argument('start', help="시작일 (YYYYMMDD)")
+    parser.add_argument('end', help="종료일 (YYYYMMDD)")
+    parser.add_argument('--workers', type=int, default=4, help="동시 실행 스레드 수 (기본 4)")
+    parser.add_argument('--rate', type=float, default=2.0, help="초당 최대 요청 수 (기본 2)")
+    args = parser.parse_args()
+
+    backfill_krx_stock_list(args.start, args.end, workers=args.workers, rate=args.rate)
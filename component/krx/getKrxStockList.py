@@ -5,13 +5,11 @@ import pandas as pd
 import time
 import os
 from common import file_manager, get_daily_folder_path, get_today_str, get_last_trading_day_str,get_trading_day_folder_path, KRX_DATA_DOWNLOAD_URL, KRX_OTP_GENERATE_URL, DEFAULT_HEADERS
-import pyperclip
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
+from component import raw_archive
+from component.krx import krxReport
+from component.compute_cache import cached_computation
+# selenium, pyperclip은 브라우저로 받는 selenium_get_file()에서만 필요하므로 그 안에서 임포트합니다.
+# (설치되어 있지 않아도 HTTP로 받는 함수들(get_krx_100, download_krx_stock_list 등)은 그대로 동작)
 import glob
 import json
 
@@ -35,7 +33,65 @@ def load_config():
     
     return config
 
+# 브라우저 다운로드 폴더 (get_latest_file이 이 폴더에서 방금 받은 파일을 찾습니다)
+DOWNLOAD_PATH = os.environ.get('KRX_DOWNLOAD_DIR', os.path.join('/Users/hyunjongkim', 'Downloads'))
+
+# 상주 작업 프로세스(component.warm_worker)가 미리 띄워 둔 브라우저. 있으면 새로 띄우지 않고 재사용합니다.
+_warm_driver = None
+
+
+def chrome_options():
+    """
+    KRX 다운로드에 쓰는 크롬 옵션을 만듭니다. (selenium_get_file과 warm_worker가 같은 옵션을 씁니다)
+    로그인 정보를 클립보드 붙여넣기로 입력하므로 화면이 있는(headless가 아닌) 브라우저여야 합니다.
+    """
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    # 2. 브라우저 꺼짐 방지 옵션 추가 (이게 핵심!)
+    options.add_experimental_option("detach", True)
+    # 다운로드 폴더를 명시해서 get_latest_file이 찾는 폴더와 항상 같게 합니다.
+    os.makedirs(DOWNLOAD_PATH, exist_ok=True)
+    options.add_experimental_option("prefs", {
+        "download.default_directory": DOWNLOAD_PATH,
+        "download.prompt_for_download": False,
+    })
+
+    # 크롬 창을 최대화해서 실행
+    # options.add_argument("--start-maximized")
+    return options
+
+
+def set_warm_driver(driver):
+    """미리 띄워 둔 브라우저를 등록합니다. (None이면 해제)"""
+    global _warm_driver
+    _warm_driver = driver
+
+
+def open_driver(options):
+    """
+    등록된 브라우저가 있으면 그것을, 없으면 새 크롬을 반환합니다.
+    등록된 브라우저는 이전 실행의 로그인 상태가 남아 있을 수 있으므로(로그아웃 전에 실패한 경우 등)
+    쿠키를 지워 항상 로그인 전 상태에서 시작합니다.
+    """
+    if _warm_driver is not None:
+        _warm_driver.get("https://data.krx.co.kr/contents/MDC/COMS/client/MDCCOMS001.cmd")
+        _warm_driver.delete_all_cookies()
+        return _warm_driver
+    from selenium import webdriver
+    return webdriver.Chrome(options=options)
+
+
+def close_driver(driver):
+    """새로 띄운 브라우저만 종료합니다. (미리 띄워 둔 브라우저는 다음 실행을 위해 남겨 둠)"""
+    if driver is not _warm_driver:
+        driver.quit()
+
+
 def selenium_get_file():
+    import pyperclip
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
 
     config = load_config()
     user_id = config['user_id']
@@ -50,15 +106,10 @@ def selenium_get_file():
 
 
     # ====== 크롬 옵션 설정 ======
-    options = Options()
-    # 2. 브라우저 꺼짐 방지 옵션 추가 (이게 핵심!)
-    options.add_experimental_option("detach", True)
-
-    # 크롬 창을 최대화해서 실행
-    # options.add_argument("--start-maximized")
+    options = chrome_options()
 
     # ====== 크롬 브라우저 실행 ======
-    driver = webdriver.Chrome(options=options)
+    driver = open_driver(options)
 
     # 최대 10초까지 요소가 나타날 때까지 기다리기 위한 객체
     # wait = WebDriverWait(driver, 10)
@@ -158,7 +209,7 @@ def selenium_get_file():
     time.sleep(2)
   
 
-    driver.quit()
+    close_driver(driver)
 
 
 def file_move(filePath, fileNm):
@@ -174,22 +225,21 @@ def file_move(filePath, fileNm):
     output_filename = f'krx_stock_list_{tradingday}.csv'
     output_excel_filename = f'krx_stock_list_{tradingday}.xlsx'
     
-    # 혹시 같은 이름의 파일이 이미 있다면 삭제하여 충돌 방지
-    file_manager.check_and_delete_file(folder_path+'/'+ output_filename)
-
     # CSV와 Excel 두 가지 형식으로 저장합니다.
     # utf-8-sig 인코딩을 사용하면 엑셀에서 한글이 깨지지 않고 잘 열립니다.
-    df.to_csv(folder_path+'/'+ output_filename, index=False, encoding='utf-8-sig')
-    df.to_excel(folder_path+'/'+ output_excel_filename, index=False)
+    # 임시 파일에 쓴 뒤 한 번에 교체하므로, 중간에 중단되어도 반쯤 쓰인 파일이 남지 않습니다.
+    with file_manager.atomic_write(folder_path+'/'+ output_filename) as tmp_path:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    with file_manager.atomic_write(folder_path+'/'+ output_excel_filename) as tmp_path:
+        df.to_excel(tmp_path, index=False)
     print(f"데이터가 {output_filename}로 저장되었습니다.")
     print(f"데이터가 {output_excel_filename}로 저장되었습니다.")
     # temp -----end
 
 
 def get_latest_file():
-    # 1. 사용자의 다운로드 폴더 경로 설정 (윈도우 기준)
-    # download_path = os.path.join(os.path.expanduser('~'), 'Downloads')
-    download_path = os.path.join('/Users/hyunjongkim', 'Downloads')
+    # 1. 브라우저 다운로드 폴더 (chrome_options에서 지정한 폴더, 환경변수 KRX_DOWNLOAD_DIR로 변경 가능)
+    download_path = DOWNLOAD_PATH
     
     # 2. 폴더 내의 모든 파일 목록을 가져옴 (*.csv 등 확장자 지정 가능)
     files = glob.glob(os.path.join(download_path, '*.csv'))
@@ -203,6 +253,55 @@ def get_latest_file():
 
 
 
+def download_krx_stock_list(tradingday, session=None):
+    """
+    KRX 정보데이터 시스템에서 특정 거래일의 전종목 시세(MDCSTAT01501)를 내려받아 DataFrame으로 반환합니다.
+
+    Args:
+        tradingday (str): 조회할 거래일자 (YYYYMMDD)
+        session (requests.Session, optional): 재사용할 세션 (없으면 requests 모듈 직접 사용)
+    Returns:
+        pd.DataFrame: 전종목 시세 데이터
+    Raises:
+        requests.exceptions.RequestException: 네트워크 요청 실패 시
+    """
+    # KRX 정보데이터 시스템은 두 단계(OTP 발급 -> CSV 다운로드)로 데이터를 내려받습니다.
+    # 실제 요청은 리포트 공통 클라이언트(krxReport.py)가 처리합니다.
+    # 이 값들은 브라우저 개발자 도구(F12) > Network 탭에서 실제 요청을 분석하여 알아낸 값들입니다.
+    query_str_params = {
+        "mktId": "ALL",         # 시장 구분 (ALL: 전체, STK: 코스피, KSQ: 코스닥 등)
+        "trdDd": tradingday,    # 조회할 날짜 (YYYYMMDD)
+    }
+    content = krxReport.download_report(krxReport.REPORT_STOCK_PRICE, query_str_params, session=session)
+
+    # --- 다운로드 받은 데이터 처리 ---
+    
+    # 다운 받은 바이너리 데이터(content)를 메모리 상의 파일처럼 다루기 위해 BytesIO를 사용합니다.
+    # 인코딩은 'EUC-KR'로 되어 있는 경우가 많으므로 지정해줍니다.
+    return pd.read_csv(BytesIO(content), encoding='EUC-KR')
+
+def save_krx_stock_list(df, tradingday, folder_path):
+    """
+    전종목 시세 데이터를 거래일 폴더에 CSV/Excel 두 형식으로 저장합니다.
+
+    Returns:
+        str: 저장된 Excel 파일 경로
+    """
+    # 저장할 파일 이름 설정
+    output_filename = f'krx_stock_list_{tradingday}.csv'
+    output_excel_filename = f'krx_stock_list_{tradingday}.xlsx'
+    
+    # CSV와 Excel 두 가지 형식으로 저장합니다.
+    # utf-8-sig 인코딩을 사용하면 엑셀에서 한글이 깨지지 않고 잘 열립니다.
+    # 임시 파일에 쓴 뒤 한 번에 교체하므로, 중간에 중단되어도 반쯤 쓰인 파일이 남지 않습니다.
+    with file_manager.atomic_write(folder_path+'/'+ output_filename) as tmp_path:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    with file_manager.atomic_write(folder_path+'/'+ output_excel_filename) as tmp_path:
+        df.to_excel(tmp_path, index=False)
+    print(f"데이터가 {output_filename}로 저장되었습니다.")
+    
+    return folder_path+'/'+ output_excel_filename
+
 def get_krx_stock_list():
     """
     KRX(한국거래소) 주식시장의 전종목 시세를 가져오는 함수입니다.
@@ -222,81 +321,18 @@ def get_krx_stock_list():
     # 2. 로그인 수행 (로그인 페이지 URL과 데이터 필요)
     # login_url = "https://data.krx.co.kr/contents/MDC/COMS/client/MDCCOMS001.cmd" # 실제 로그인 처리 URL 확인 필요
 
-    # 오늘 날짜 생성 (YYYYMMDD 형식)
-    # get_today_str() 함수를 통해 오늘 날짜를 문자열로 가져옵니다.
-    today = get_today_str()
-
     # 거래일자 설정
-    # 주말에는 장이 열리지 않으므로, 가장 최근 평일(거래일)을 계산해서 가져옵니다.
+    # 주말/휴장일에는 장이 열리지 않으므로, 가장 최근 거래일을 계산해서 가져옵니다.
     tradingday = get_last_trading_day_str()
 
     # 데이터 저장 폴더 경로 가져오기 (없으면 생성)
     folder_path = get_trading_day_folder_path()
-    
-    # --- 1단계: OTP(One-Time Password) 코드 발급 요청 ---
-    # KRX 시스템에 "이 조건으로 데이터를 받고 싶어요"라고 요청하여 코드를 받습니다.
-    
-    gen_otp_url = KRX_OTP_GENERATE_URL
-    headers = DEFAULT_HEADERS
-    
-    # 요청 보낼 데이터 파라미터 설정
-    # 이 값들은 브라우저 개발자 도구(F12) > Network 탭에서 실제 요청을 분석하여 알아낸 값들입니다.
-    query_str_params = {
-        "locale": "ko_KR",      # 언어 설정
-        "mktId": "ALL",         # 시장 구분 (ALL: 전체, STK: 코스피, KSQ: 코스닥 등)
-        "trdDd": tradingday,    # 조회할 날짜 (YYYYMMDD)
-        "share": "1",           # 주식 수
-        "money": "1",           # 금액
-        "csvxls_isNo": "false", # CSV/Excel 여부
-        "name": "fileDown",     # 요청 이름
-        "url": "dbms/MDC/STAT/standard/MDCSTAT01501" # 요청할 데이터의 내부 경로 ID
-    }
 
     try:
-        # requests 라이브러리를 사용해 GET 요청을 보냅니다.
-        res = requests.get(gen_otp_url, query_str_params, headers=headers)
-        time.sleep(1.0)  # 서버에 과부하를 주지 않기 위해 1초 대기
-        res.raise_for_status() # 요청이 실패(404, 500 등)하면 에러를 발생시킵니다.
-        
-        # 응답으로 받은 텍스트가 바로 OTP 코드입니다.
-        down_data = {"code": res.content}
-        print("OTP 코드 발급 완료")
-
-        # --- 2단계: 실제 데이터(CSV) 다운로드 요청 ---
-        # 위에서 받은 코드를 이용해 파일을 내려받습니다.
-        
-        down_url = KRX_DATA_DOWNLOAD_URL
-        down_headers = headers.copy()
-        # POST 요청을 보낼 때는 데이터 타입을 명시해야 할 수 있습니다.
-        down_headers['Content-Type'] = 'application/x-www-form-urlencoded'
-
-        # OTP 코드를 담아 POST 요청을 보냅니다.
-        # 이제 session은 로그인 쿠키를 기억하고 있습니다.
-        down_csv = requests.post(down_url, data=down_data, headers=down_headers)
-        down_csv.raise_for_status()
+        df = download_krx_stock_list(tradingday)
         print("데이터 다운로드 완료")
-        time.sleep(1.0)
-
-        # --- 3단계: 다운로드 받은 데이터 처리 및 저장 ---
-        
-        # 다운 받은 바이너리 데이터(content)를 메모리 상의 파일처럼 다루기 위해 BytesIO를 사용합니다.
-        # 인코딩은 'EUC-KR'로 되어 있는 경우가 많으므로 지정해줍니다.
-        df = pd.read_csv(BytesIO(down_csv.content), encoding='EUC-KR')
-        
-        # 저장할 파일 이름 설정
-        output_filename = f'krx_stock_list_{tradingday}.csv'
-        output_excel_filename = f'krx_stock_list_{tradingday}.xlsx'
-        
-        # 혹시 같은 이름의 파일이 이미 있다면 삭제하여 충돌 방지
-        file_manager.check_and_delete_file(folder_path+'/'+ output_filename)
-
-        # CSV와 Excel 두 가지 형식으로 저장합니다.
-        # utf-8-sig 인코딩을 사용하면 엑셀에서 한글이 깨지지 않고 잘 열립니다.
-        df.to_csv(folder_path+'/'+ output_filename, index=False, encoding='utf-8-sig')
-        df.to_excel(folder_path+'/'+ output_excel_filename, index=False)
-        print(f"데이터가 {output_filename}로 저장되었습니다.")
-        
-        return folder_path+'/'+ output_excel_filename
+
+        return save_krx_stock_list(df, tradingday, folder_path)
     
     except requests.exceptions.RequestException as e:
         # 네트워크 요청 관련 에러 처리
@@ -307,21 +343,15 @@ def get_krx_stock_list():
         print(f"처리 중 오류가 발생했습니다: {e}")
         return None
 
-def get_krx_100():
-    """
-    저장된 KRX 주식 목록에서 거래대금 상위 100개, 등락률 상위 100개를 뽑아
-    교집합(둘 다 속하는 종목)을 추출하여 저장하는 함수입니다.
+@cached_computation(inputs=lambda krx_file: [krx_file])
+def select_krx_100(krx_file):
     """
-    # 거래일자 설정
-    # 주말에는 장이 열리지 않으므로, 가장 최근 평일(거래일)을 계산해서 가져옵니다.
-    tradingday = get_last_trading_day_str()
-
-    # 데이터 저장 폴더 경로 가져오기 (없으면 생성)
-    folder_path = get_trading_day_folder_path()
-    
-    # 1. 저장된 엑셀 파일 읽어오기
-    krx_file = folder_path +'/'+ f'krx_stock_list_{tradingday}.xlsx'
+    KRX 전종목 파일에서 거래대금 상위 100개, 등락률 상위 100개의 교집합 종목을 고릅니다.
+    입력 파일이 바뀌지 않았으면 계산 캐시(compute_cache.py)의 결과를 그대로 사용합니다.
 
+    Returns:
+        pd.DataFrame: '종목코드', '종목명' 컬럼의 교집합 종목
+    """
     df = pd.read_excel(krx_file)
     print(df.columns)
     
@@ -338,21 +368,45 @@ def get_krx_100():
     # 종목명이 같은 것끼리 연결합니다.
     top_inter = pd.merge(top_volume, top_change, how='inner', on='종목명')
     
+    # 종목코드가 중복되어 _x 등의 접미사가 붙을 수 있으므로 이름 정리
+    top_inter = top_inter.rename(columns={'종목코드_x': '종목코드'})
+    col_to_save = ['종목코드', '종목명']
+    return top_inter[col_to_save]
+
+def get_krx_100():
+    """
+    저장된 KRX 주식 목록에서 거래대금 상위 100개, 등락률 상위 100개를 뽑아
+    교집합(둘 다 속하는 종목)을 추출하여 저장하는 함수입니다.
+    입력 파일이 바뀌지 않았고 결과 파일도 완성되어 있으면 다시 만들지 않습니다.
+    """
+    # 거래일자 설정
+    # 주말에는 장이 열리지 않으므로, 가장 최근 평일(거래일)을 계산해서 가져옵니다.
+    tradingday = get_last_trading_day_str()
+
+    # 데이터 저장 폴더 경로 가져오기 (없으면 생성)
+    folder_path = get_trading_day_folder_path()
+    
+    # 1. 저장된 엑셀 파일 읽어오기
+    krx_file = folder_path +'/'+ f'krx_stock_list_{tradingday}.xlsx'
+
     # excel 파일 저장
     output_excel_filename = f'krx_top_100_{tradingday}.xlsx'
-    file_manager.check_and_delete_file(folder_path+'/'+ output_excel_filename)
 
     # csv 파일 저장
     output_csv_filename = f'krx_top_100_{tradingday}.csv'
-    file_manager.check_and_delete_file(folder_path+'/'+ output_csv_filename)
-    
-    # 종목코드가 중복되어 _x 등의 접미사가 붙을 수 있으므로 이름 정리
-    top_inter = top_inter.rename(columns={'종목코드_x': '종목코드'})
-    col_to_save = ['종목코드', '종목명']
+
+    outputs = [folder_path+'/'+ output_excel_filename, folder_path+'/'+ output_csv_filename]
+    if select_krx_100.is_cached(krx_file) and all(file_manager.is_artifact_complete(path) for path in outputs):
+        print(f"입력 파일이 바뀌지 않아 '{output_csv_filename}'을(를) 그대로 사용합니다.")
+        return
+
+    top_inter = select_krx_100(krx_file)
     
-    # 필요한 컬럼만 선택하여 저장
-    top_inter[col_to_save].to_excel(folder_path+'/'+ output_excel_filename, index=False)
-    top_inter[col_to_save].to_csv(folder_path+'/'+ output_csv_filename, index=False, encoding='utf-8-sig')
+    # 필요한 컬럼만 선택하여 저장 (임시 파일에 쓴 뒤 한 번에 교체)
+    with file_manager.atomic_write(outputs[0]) as tmp_path:
+        top_inter.to_excel(tmp_path, index=False)
+    with file_manager.atomic_write(outputs[1]) as tmp_path:
+        top_inter.to_csv(tmp_path, index=False, encoding='utf-8-sig')
 
 
 def test_file():
@@ -368,13 +422,13 @@ def test_file():
     output_filename = f'krx_stock_list_{tradingday}.csv'
     output_excel_filename = f'krx_stock_list_{tradingday}.xlsx'
     
-    # 혹시 같은 이름의 파일이 이미 있다면 삭제하여 충돌 방지
-    file_manager.check_and_delete_file(folder_path+'/'+ output_filename)
-
     # CSV와 Excel 두 가지 형식으로 저장합니다.
     # utf-8-sig 인코딩을 사용하면 엑셀에서 한글이 깨지지 않고 잘 열립니다.
-    df.to_csv(folder_path+'/'+ output_filename, index=False, encoding='utf-8-sig')
-    df.to_excel(folder_path+'/'+ output_excel_filename, index=False)
+    # 임시 파일에 쓴 뒤 한 번에 교체하므로, 중간에 중단되어도 반쯤 쓰인 파일이 남지 않습니다.
+    with file_manager.atomic_write(folder_path+'/'+ output_filename) as tmp_path:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    with file_manager.atomic_write(folder_path+'/'+ output_excel_filename) as tmp_path:
+        df.to_excel(tmp_path, index=False)
     print(f"데이터가 {output_filename}로 저장되었습니다.")
     # temp -----end
 
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pandas as pd
+import requests
+
+from common import file_manager, get_today_str, KRX_DATA_DOWNLOAD_URL, KRX_OTP_GENERATE_URL, DEFAULT_HEADERS
+from component import raw_archive
+from component.compute_cache import evict
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: KRX 통계 리포트 공통 다운로드 클라이언트]
+# KRX 정보데이터 시스템의 통계 화면(전종목 시세, 지수 시세, 개별종목 추이, 투자자별 거래실적 등)은
+# 모두 같은 두 단계로 내려받습니다.
+#   1. GenerateOTP : 리포트 ID('dbms/MDC/STAT/standard/MDCSTATxxxxx')와 조회 조건으로 일회용 코드 발급
+#   2. download    : 그 코드로 EUC-KR 인코딩의 CSV 파일 다운로드
+# 리포트 ID와 조회 조건은 브라우저 개발자 도구(F12) > Network 탭에서 확인할 수 있습니다.
+#
+# KrxReportClient는
+# - 여러 리포트 요청을 스레드로 동시에 처리하되, 모든 스레드가 하나의 RateLimiter를 공유하고
+# - 스레드마다 세션(연결)을 재사용하며
+# - CSV를 바로 DataFrame으로 읽어(종목코드는 문자열, 숫자의 쉼표 제거, 일자는 날짜형)
+# - 같은 요청(리포트 ID + 조건)의 결과는 'krx_cache/<요청 서명>.pkl'에 저장해 다시 받지 않습니다.
+#   단, 조회일(trdDd/endDd)이 없거나 오늘 이후인 요청은 결과가 아직 바뀔 수 있으므로 캐시하지 않으며,
+#   캐시 폴더가 KRX_CACHE_MAX_MB(기본 500MB)를 넘으면 가장 오래 쓰지 않은 파일부터 지웁니다.
+#
+# 사용 예:
+#   client = KrxReportClient(workers=4, rate=2)
+#   frames = client.fetch_many([
+#       (REPORT_INDEX_PRICE, {'idxIndMidclssCd': '02', 'trdDd': '20250102'}),
+#       (REPORT_ISSUE_PRICE, {'isuCd': 'KR7005930003', 'strtDd': '20250101', 'endDd': '20250131'}),
+#   ])
+# -----------------------------------------------------------------------------------------
+
+# 자주 쓰는 리포트 ID (그 밖의 리포트도 ID만 알면 그대로 받을 수 있습니다)
+REPORT_STOCK_PRICE = 'dbms/MDC/STAT/standard/MDCSTAT01501'   # 전종목 시세 (mktId, trdDd)
+REPORT_INDEX_PRICE = 'dbms/MDC/STAT/standard/MDCSTAT00101'   # 전체지수 시세 (idxIndMidclssCd, trdDd)
+REPORT_ISSUE_PRICE = 'dbms/MDC/STAT/standard/MDCSTAT01701'   # 개별종목 시세 추이 (isuCd, strtDd, endDd)
+
+# 모든 리포트에 공통으로 붙는 조회 조건
+BASE_PARAMS = {
+    "locale": "ko_KR",      # 언어 설정
+    "share": "1",           # 주식 수 단위
+    "money": "1",           # 금액 단위
+    "csvxls_isNo": "false", # CSV/Excel 여부
+    "name": "fileDown",     # 요청 이름
+}
+
+# 문자열로 읽어야 하는 컬럼 (숫자로 읽으면 앞자리 0이 사라짐)
+CODE_COLUMNS = ['종목코드', '단축코드', '표준코드', 'ISU_CD', 'ISU_SRT_CD']
+# 날짜형으로 바꿀 컬럼
+DATE_COLUMNS = ['일자', '기준일', '거래일']
+
+DEFAULT_CACHE_MAX_MB = 500
+
+
+class RateLimiter:
+    """
+    여러 스레드가 공유하는 간단한 요청 속도 제한기입니다.
+    acquire()를 호출할 때마다 직전 요청과 최소 1/rate 초 간격이 벌어지도록 대기합니다.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class RateLimitedSession(requests.Session):
+    """모든 요청 전에 RateLimiter를 거치는 requests 세션입니다."""
+
+    def __init__(self, limiter):
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, *args, **kwargs):
+        self.limiter.acquire()
+        return super().request(*args, **kwargs)
+
+
+def request_signature(report, params):
+    """리포트 ID와 조회 조건으로 만든 요청 서명 (캐시 파일 이름으로 사용)"""
+    text = json.dumps([report, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def archive_day(params):
+    """원본 응답을 보관할 거래일 (조회일 또는 조회 종료일, 없으면 최근 거래일)"""
+    return params.get('trdDd') or params.get('endDd')
+
+
+def is_cacheable(params):
+    """
+    결과를 캐시해도 되는 요청인지 확인합니다.
+    조회일이 없으면(항상 최신 데이터) 또는 오늘 이후면(장 마감 후 확정 전일 수 있음) 캐시하지 않습니다.
+    """
+    day = archive_day(params)
+    return bool(day) and day < get_today_str()
+
+
+def download_report(report, params, session=None):
+    """
+    OTP 발급 -> CSV 다운로드를 수행하고 CSV 원본(bytes)을 반환합니다.
+
+    Args:
+        report (str): 리포트 ID (예: REPORT_STOCK_PRICE)
+        params (dict): 리포트별 조회 조건 (예: {'mktId': 'ALL', 'trdDd': '20250102'})
+        session (requests.Session, optional): 재사용할 세션
+    Returns:
+        bytes: EUC-KR 인코딩의 CSV 원본
+    Raises:
+        requests.exceptions.RequestException: 네트워크 요청 실패 시
+    """
+    headers = DEFAULT_HEADERS
+    day = archive_day(params)
+
+    # 1단계: 조회 조건으로 OTP 코드 발급
+    # (RAW_ARCHIVE 모드에 따라 원본 응답을 기록하거나 보관된 응답을 재생합니다)
+    otp = raw_archive.get(raw_archive.SOURCE_KRX, KRX_OTP_GENERATE_URL, session=session, day=day,
+                          params={**BASE_PARAMS, **params, "url": report}, headers=headers)
+    otp.raise_for_status()
+
+    # 2단계: 발급받은 코드로 CSV 다운로드
+    down_headers = headers.copy()
+    down_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    down_csv = raw_archive.post(raw_archive.SOURCE_KRX, KRX_DATA_DOWNLOAD_URL, session=session, day=day,
+                                data={"code": otp.content}, headers=down_headers)
+    down_csv.raise_for_status()
+    return down_csv.content
+
+
+def decode_report(content):
+    """
+    KRX CSV 원본을 타입이 정리된 DataFrame으로 읽습니다.
+    (종목코드류는 문자열, 숫자의 천 단위 쉼표 제거, 일자 컬럼은 날짜형)
+    """
+    df = pd.read_csv(BytesIO(content), encoding='EUC-KR', thousands=',',
+                     dtype={col: str for col in CODE_COLUMNS})
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col].astype(str).str.replace('/', '-'), errors='coerce')
+    return df
+
+
+def get_krx_cache_path():
+    """리포트 캐시 폴더 경로를 반환하고, 필요하면 생성합니다."""
+    return file_manager.make_folder('krx_cache')
+
+
+class KrxReportClient:
+    """여러 KRX 리포트를 속도 제한 안에서 동시에 받아 오는 클라이언트입니다."""
+
+    def __init__(self, workers=4, rate=2.0, cache_path=None):
+        """
+        Args:
+            workers (int): 동시에 실행할 스레드 수
+            rate (float): 전체 스레드 합계 초당 최대 요청 수
+            cache_path (str, optional): 캐시 폴더 (없으면 작업 폴더의 krx_cache)
+        """
+        self.workers = workers
+        self.limiter = RateLimiter(rate)
+        self.local = threading.local()
+        self.cache_path = cache_path or get_krx_cache_path()
+
+    def session(self):
+        # 스레드마다 세션 하나를 만들어 연결(keep-alive)을 재사용합니다.
+        if not hasattr(self.local, 'session'):
+            self.local.session = RateLimitedSession(self.limiter)
+        return self.local.session
+
+    def fetch(self, report, params, use_cache=True):
+        """
+        리포트 하나를 받아 DataFrame으로 반환합니다. 같은 요청의 캐시가 있으면 그것을 씁니다.
+        (조회일이 없거나 오늘인 요청은 is_cacheable 참고, 캐시를 읽지도 쓰지도 않음)
+
+        Args:
+            report (str): 리포트 ID
+            params (dict): 조회 조건
+            use_cache (bool): False이면 캐시를 무시하고 새로 받습니다. (결과는 캐시에 저장)
+        Returns:
+            pd.DataFrame: 리포트 데이터
+        """
+        cacheable = is_cacheable(params)
+        cache_file = os.path.join(self.cache_path, f'{request_signature(report, params)}.pkl')
+        if use_cache and cacheable and os.path.exists(cache_file):
+            os.utime(cache_file)  # 최근 사용 시각 갱신 (오래 안 쓴 것부터 지우기 위해)
+            return pd.read_pickle(cache_file)
+
+        df = decode_report(download_report(report, params, session=self.session()))
+        # 빈 결과(휴장일, 잘못된 조건 등)는 캐시하지 않습니다.
+        if cacheable and not df.empty:
+            with file_manager.atomic_write(cache_file) as tmp_path:
+                df.to_pickle(tmp_path)
+            evict(self.cache_path, int(os.environ.get('KRX_CACHE_MAX_MB', DEFAULT_CACHE_MAX_MB)) * 1024 * 1024)
+        return df
+
+    def fetch_many(self, requests_list, use_cache=True):
+        """
+        여러 리포트를 동시에 받습니다.
+
+        Args:
+            requests_list (list): (리포트 ID, 조회 조건) 튜플 리스트
+            use_cache (bool): 캐시 사용 여부
+        Returns:
+            list: 요청 순서대로의 DataFrame 리스트 (실패한 요청은 None)
+        """
+        def fetch_one(request):
+            report, params = request
+            try:
+                return self.fetch(report, params, use_cache)
+            except Exception as e:
+                print(f"KRX 리포트 수집 실패 ({report.rsplit('/', 1)[-1]}, {params}): {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(fetch_one, requests_list))
@@ -12,6 +12,10 @@ from openpyxl.styles import Font
 
 from common import file_manager, get_daily_folder_path, get_today_str
 from component.excel_utils import auto_adjust_column_width
+from component import raw_archive, news_store
+from component.navernews.tokenizer import tokenize_titles
+from component.navernews.headline_cluster import cluster_headlines
+from component.navernews.mention_matcher import attach_mentions
 
 # install lxml
 
@@ -25,6 +29,9 @@ from component.excel_utils import auto_adjust_column_width
 # - pandas: CSV 저장
 # -----------------------------------------------------------------------------------------
 
+# 누적 뉴스 저장소 이름 (news_store/naver_news_YYYYMM.csv, news_store/seen_naver_news.npy)
+NEWS_STORE_NAME = 'naver_news'
+
 def request_url(url):
     """
     주어진 URL에 GET 요청을 보내고 BeautifulSoup 객체를 반환합니다.
@@ -34,7 +41,7 @@ def request_url(url):
         'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7'
     }
-    response = requests.get(url, headers=headers)
+    response = raw_archive.get(raw_archive.SOURCE_NAVER_NEWS, url, headers=headers)
     response.raise_for_status()
     # lxml 파서가 설치되어 있어야 함 (pip install lxml)
     soup = BeautifulSoup(response.text, "lxml")
@@ -75,16 +82,18 @@ def naver_news(url) -> list[Any]:
 # -----------------------------------------------------------------------------------------
 # [키워드 분석 로직]
 # 
-# 1. 자연어 처리 패키지(konlpy)가 환경에 없을 수 있으므로, 정규표현식과 불용어(Stopwords) 사전을 활용합니다.
+# 1. 자연어 처리 패키지(konlpy)가 설치되어 있으면 형태소 분석으로 명사를 추출하고,
+#    없으면 정규표현식과 불용어(Stopwords) 사전을 활용합니다. (tokenizer.py)
 # 2. 명사/대명사 위주로 추출하기 위해 조사가 붙은 단어의 끝을 잘라내는 휴리스틱(Heuristic) 방식을 일부 적용할 수 있으나,
 #    여기서는 2글자 이상의 단어를 추출하고 '의미 없는 단어'를 필터링하는 방식으로 구현합니다.
 # -----------------------------------------------------------------------------------------
 
-def analyze_keywords(news_list):
+def analyze_keywords(news_list, tokenizer=None):
     """
     뉴스 리스트를 분석하여 전체 키워드 빈도수를 계산합니다. (섹션 구분 없음)
     Args:
         news_list (list): 뉴스 정보 딕셔너리 리스트
+        tokenizer (optional): 토큰화 백엔드 (없으면 환경변수 NEWS_TOKENIZER 또는 자동 선택)
     Returns:
         pd.DataFrame: [키워드, 빈도수] 컬럼을 가진 데이터프레임
     """
@@ -102,23 +111,20 @@ def analyze_keywords(news_list):
         '논란에', '아침까지', '밝혀', '말해', '전해'  # 사용자 요청 불용어 및 유사 어휘 추가
     }
 
-    for item in news_list:
-        title = item['title']
-        
-        # 2. 정규표현식으로 한글 단어만 추출
-        # ([가-힣]+) : 한글로 된 1글자 이상의 연속된 문자열
-        words = re.findall(r'[가-힣]+', title)
-        
+    # 2. 제목을 토큰(2글자 이상 단어)으로 나누기
+    # 형태소 분석기(KoNLPy)가 설치되어 있으면 명사만, 없으면 정규표현식으로 한글 덩어리를 추출합니다.
+    # 한 번 분석한 제목은 캐시에 저장되어 다시 분석하지 않습니다. (tokenizer.py 참고)
+    token_lists = tokenize_titles([item['title'] for item in news_list], tokenizer)
+
+    for words in token_lists:
         for w in words:
-            # 3. 2글자 이상인 단어만 선택
-            if len(w) > 1:
-                # 4. 불용어 제외 (정확히 일치하거나, 불용어로 끝나는 조사 포함 단어 필터링 시도)
-                if w in stop_words:
-                    continue
-                
-                # 추가 필터링: 끝글자가 조사/어미인 경우 단순 제외보다는, stop_words에 없는 명사 파악이 어려우므로
-                # 일단 사용자 요청 단어들을 stop_words에 최대한 등록하는 방식으로 대응합니다.
-                all_words.append(w)
+            # 3. 불용어 제외 (정확히 일치하거나, 불용어로 끝나는 조사 포함 단어 필터링 시도)
+            if w in stop_words:
+                continue
+            
+            # 추가 필터링: 끝글자가 조사/어미인 경우 단순 제외보다는, stop_words에 없는 명사 파악이 어려우므로
+            # 일단 사용자 요청 단어들을 stop_words에 최대한 등록하는 방식으로 대응합니다.
+            all_words.append(w)
     
     # 5. 빈도수 계산
     # 전체 뉴스에서 가장 많이 등장한 상위 50개 키워드 추출
@@ -159,29 +165,53 @@ def getNaverNews():
         except Exception as e:
             print(f"섹션 {i} 수집 중 오류: {e}")
 
-    # 1. 뉴스 데이터프레임 생성 및 정렬
-    df_news = pd.DataFrame(total_news)
+    output_filename = f'today_news_{today}.xlsx'
+    save_path = os.path.join(folder_path, output_filename)
+
+    # 이전 실행에서 이미 모은 기사(URL)는 건너뛰고, 새 기사만 누적 저장소에 덧붙입니다. (news_store.py 참고)
+    seen = news_store.SeenSet(NEWS_STORE_NAME)
+    new_news = seen.filter_new(total_news, key=lambda item: news_store.normalize_url(item['url']))
+    print(f"수집 {len(total_news)}건 중 새 기사 {len(new_news)}건")
+    if not new_news and os.path.exists(save_path):
+        print(f"새 기사가 없어 '{output_filename}' 파일을 그대로 둡니다.")
+        return
+    news_store.append_news(NEWS_STORE_NAME, new_news, today)
+    seen.save()
+
+    # 1. 뉴스 데이터프레임 생성 및 정렬 (오늘 이전 실행에서 모은 기사 포함)
+    df_news = news_store.load_news(NEWS_STORE_NAME, today)
     
-    # 제목(Title) 기준으로 정렬하여 비슷한 내용끼리 모이게 함
+    # 비슷한 제목(같은 사건을 여러 언론사가 보도한 기사)을 묶어 클러스터 번호와 크기를 붙이고,
+    # 큰 클러스터(많이 보도된 사건)부터 보이도록 정렬합니다. (headline_cluster.py 참고)
     if not df_news.empty:
-        df_news = df_news.sort_values(by=['title'])
+        cluster_ids, cluster_sizes = cluster_headlines(df_news['title'].tolist())
+        df_news['클러스터'] = cluster_ids
+        df_news['클러스터크기'] = cluster_sizes
+        df_news = df_news.sort_values(by=['클러스터', 'title'], kind='stable')
+        print(f"뉴스 {len(df_news)}건 -> 중복 제거 후 {df_news['클러스터'].nunique()}건")
     
     # 2. 뉴스 분석(키워드 추출) 데이터프레임 생성 (섹션 구분 없이 전체 빈도)
-    df_analysis = analyze_keywords(total_news)
+    # 같은 사건이 여러 번 세어지지 않도록 클러스터마다 대표 제목 하나만 사용합니다.
+    unique_news = df_news.drop_duplicates(subset='클러스터').to_dict('records') if not df_news.empty else []
+    df_analysis = analyze_keywords(unique_news)
 
-    # 3. 엑셀 파일로 저장
-    output_filename = f'today_news_{today}.xlsx'
-    save_path = os.path.join(folder_path, output_filename)
-    
-    file_manager.check_and_delete_file(save_path)
+    # 제목에 나온 종목명/테마명을 한 번에 찾아 종목코드/테마를 붙이고 언급 수를 집계합니다. (mention_matcher.py 참고)
+    df_news, df_stock_mentions, df_theme_mentions = attach_mentions(df_news)
 
+    # 3. 엑셀 파일로 저장
     try:
-        with pd.ExcelWriter(save_path, engine='openpyxl') as writer:
+        # 임시 파일에 쓴 뒤 한 번에 교체합니다. (쓰는 도중 중단되어도 반쯤 쓰인 파일이 남지 않음)
+        with file_manager.atomic_write(save_path) as tmp_path, pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
             # 시트 1: 뉴스 목록
             df_news.to_excel(writer, sheet_name='뉴스목록', index=False)
             
             # 시트 2: 뉴스 분석
             df_analysis.to_excel(writer, sheet_name='뉴스분석', index=False)
+
+            # 시트 3, 4: 종목/테마 언급 수 (전종목 파일이 있을 때만)
+            if df_stock_mentions is not None:
+                df_stock_mentions.to_excel(writer, sheet_name='종목언급', index=False)
+                df_theme_mentions.to_excel(writer, sheet_name='테마언급', index=False)
             
             # --- 서식 적용 ---
             # 1. 자동 컬럼 너비 조정 (기본)
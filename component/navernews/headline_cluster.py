@@ -0,0 +1,115 @@
+import zlib
+
+import numpy as np
+
+from component.navernews.tokenizer import normalize_title
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 비슷한 뉴스 제목 묶기 (MinHash + LSH)]
+# 같은 사건을 다섯 언론사가 보도하면 제목이 조금씩 다릅니다.
+#   "삼성전자, 2분기 영업이익 10조 돌파"  /  "삼성전자 2분기 영업익 10조 넘어"
+# 제목으로 정렬하면 앞글자가 같은 것끼리만 모이므로, 이런 기사들은 흩어집니다.
+#
+# 1. 제목을 글자 3개씩 겹쳐 자른 조각(shingle) 집합으로 바꿉니다. ("삼성전", "성전자", ...)
+# 2. MinHash: 무작위 해시 함수 64개 각각에 대해 조각 해시의 최솟값을 기록한 '서명'을 만듭니다.
+#    두 제목의 서명이 같은 자리에서 일치할 확률 = 두 조각 집합의 자카드 유사도
+# 3. LSH: 서명을 16개 구간(band)으로 나눠, 한 구간이라도 완전히 같은 제목끼리만 후보로 삼습니다.
+#    모든 쌍을 비교(n²)하지 않고 해시 버킷만 보므로 제목 수에 거의 비례하는 시간에 끝납니다.
+# 4. 후보 쌍은 실제 자카드 유사도를 확인한 뒤 같은 묶음(cluster)으로 합칩니다. (Union-Find)
+# -----------------------------------------------------------------------------------------
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+NUM_BANDS = 16
+SIMILARITY_THRESHOLD = 0.5
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+def shingles(title, k=SHINGLE_SIZE):
+    """공백을 제거한 제목을 k글자씩 겹쳐 자른 조각 집합을 반환합니다."""
+    text = ''.join(normalize_title(title).split())
+    if len(text) <= k:
+        return {text} if text else set()
+    return {text[i:i + k] for i in range(len(text) - k + 1)}
+
+
+def minhash_signatures(shingle_sets, num_perm=NUM_PERM, seed=1):
+    """
+    조각 집합마다 MinHash 서명(길이 num_perm)을 계산합니다.
+
+    Returns:
+        np.ndarray: [제목 수 × num_perm] uint64 배열
+    """
+    rng = np.random.default_rng(seed)
+    # h, a, b가 모두 p(2^31-1) 미만이므로 a*h + b는 uint64 범위를 넘지 않습니다.
+    a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    signatures = np.full((len(shingle_sets), num_perm), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for row, items in enumerate(shingle_sets):
+        if not items:
+            continue
+        # 조각을 정수 해시로 바꾼 뒤, (a*h + b) mod p 형태의 해시 함수 num_perm개를 한 번에 적용
+        h = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in items), dtype=np.uint64, count=len(items)) % MERSENNE_PRIME
+        hashed = (np.outer(h, a) + b) % MERSENNE_PRIME
+        signatures[row] = hashed.min(axis=0)
+    return signatures
+
+
+def find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_headlines(titles, threshold=SIMILARITY_THRESHOLD, num_perm=NUM_PERM, num_bands=NUM_BANDS):
+    """
+    비슷한 제목끼리 묶어 제목별 묶음 번호와 묶음 크기를 반환합니다.
+
+    Args:
+        titles (list): 뉴스 제목 리스트
+        threshold (float): 같은 묶음으로 볼 최소 자카드 유사도
+    Returns:
+        tuple: (묶음 번호 np.ndarray, 묶음 크기 np.ndarray) 묶음 번호는 0부터 큰 묶음 순서
+    """
+    n = len(titles)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    shingle_sets = [shingles(title) for title in titles]
+    signatures = minhash_signatures(shingle_sets, num_perm)
+    rows = num_perm // num_bands
+
+    parent = list(range(n))
+    for band in range(num_bands):
+        buckets = {}
+        band_bytes = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for i in range(n):
+            if not shingle_sets[i]:
+                continue
+            buckets.setdefault(band_bytes[i].tobytes(), []).append(i)
+
+        for members in buckets.values():
+            for pos, first in enumerate(members):
+                for other in members[pos + 1:]:
+                    root_a, root_b = find(parent, first), find(parent, other)
+                    if root_a == root_b:
+                        continue
+                    # LSH 후보는 실제 자카드 유사도를 확인한 뒤 합칩니다. (우연한 충돌 제거)
+                    sa, sb = shingle_sets[first], shingle_sets[other]
+                    if len(sa & sb) / len(sa | sb) >= threshold:
+                        parent[root_b] = root_a
+
+    roots = np.array([find(parent, i) for i in range(n)])
+    unique_roots, inverse, counts = np.unique(roots, return_inverse=True, return_counts=True)
+
+    # 큰 묶음이 앞 번호를 갖도록 다시 번호를 매깁니다. (크기가 같으면 먼저 나온 제목 순)
+    first_seen = np.full(len(unique_roots), n)
+    np.minimum.at(first_seen, inverse, np.arange(n))
+    order = np.lexsort((first_seen, -counts))
+    renumber = np.empty_like(order)
+    renumber[order] = np.arange(len(order))
+
+    return renumber[inverse], counts[inverse]
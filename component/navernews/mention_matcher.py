@@ -0,0 +1,255 @@
+import os
+import pickle
+from collections import Counter, deque
+
+import pandas as pd
+
+from common import file_manager, get_last_trading_day_str, get_trading_day_folder_path
+from component.stockanalysis.theme_index import load_theme_index, normalize_codes
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 뉴스 제목 속 종목/테마 찾기 (Aho-Corasick)]
+# 뉴스 제목마다 "2,700개 종목명 + 수백 개 테마명"을 하나씩 `in`으로 찾으면
+# (제목 수 × 이름 수) 만큼 비교해야 합니다.
+#
+# Aho-Corasick 자동자는 모든 이름을 글자 단위 트리(trie)로 합친 뒤,
+# 글자가 어긋났을 때 되돌아갈 곳(fail 링크)을 미리 계산해 둡니다.
+# 덕분에 제목을 앞에서부터 한 번만 읽으면 그 안에 들어 있는 모든 이름을 찾을 수 있습니다.
+#   "삼성전자, 2차전지 투자 확대"  ->  삼성전자(005930), 2차전지 테마
+#
+# - 같은 위치에서 여러 이름이 맞으면 가장 긴 이름을 씁니다. ('삼성전자우' > '삼성전자')
+# - 이름 바로 앞 글자가 한글/영문/숫자이면 단어 중간으로 보고 버립니다. ('현대차' 안의 '대차' 등)
+# - 자동자는 거래일마다 한 번 만들어 'mention_matcher_YYYYMMDD.pkl'로 저장해 둡니다.
+# -----------------------------------------------------------------------------------------
+
+MIN_NAME_LENGTH = 2
+
+KIND_STOCK = '종목'
+KIND_THEME = '테마'
+
+
+def is_word_char(ch):
+    """한글/영문/숫자이면 True (이름 앞이 이런 글자이면 단어 중간으로 봅니다)"""
+    return ch.isalnum() or '가' <= ch <= '힣'
+
+
+class AhoCorasick:
+    """여러 문자열을 한 번의 선형 스캔으로 찾는 Aho-Corasick 자동자입니다."""
+
+    def __init__(self):
+        self.goto = [{}]    # 노드별 다음 글자 -> 노드 번호
+        self.fail = [0]     # 노드별 실패 링크
+        self.output = [[]]  # 노드별 (이름 길이, 값) 목록
+
+    def add(self, word, value):
+        """이름(word)과, 찾았을 때 돌려줄 값(value)을 추가합니다."""
+        node = 0
+        for ch in word:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[node][ch] = nxt
+            node = nxt
+        self.output[node].append((len(word), value))
+
+    def build(self):
+        """너비 우선 탐색으로 실패 링크를 계산합니다. (이름을 모두 추가한 뒤 한 번 호출)"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                # 부모의 실패 링크를 따라가며 같은 글자로 이어지는 가장 긴 접미사를 찾습니다.
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                target = self.goto[state].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                # 접미사 노드에서 끝나는 이름도 이 노드에서 함께 찾은 것으로 봅니다.
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+        return self
+
+    def iter_matches(self, text):
+        """
+        text 안의 모든 이름을 찾습니다.
+
+        Yields:
+            tuple: (시작 위치, 끝 위치, 값)
+        """
+        node = 0
+        for pos, ch in enumerate(text):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, value in self.output[node]:
+                yield pos - length + 1, pos + 1, value
+
+
+class MentionMatcher:
+    """종목명/테마명 자동자와 종목코드 -> 소속 테마 조회표를 묶은 객체입니다."""
+
+    def __init__(self, df_stocks, themes=(), theme_index=None):
+        """
+        Args:
+            df_stocks (pd.DataFrame): '종목코드', '종목명' 컬럼을 가진 전종목 목록
+            themes (iterable): 테마명 목록
+            theme_index (ThemeIndex, optional): 종목별 소속 테마 조회용
+        """
+        self.automaton = AhoCorasick()
+        self.names = {}          # 종목코드 -> 종목명
+        self.stock_themes = {}   # 종목코드 -> 소속 테마 목록
+
+        df = df_stocks[['종목코드', '종목명']].dropna().copy()
+        df['종목코드'] = normalize_codes(df['종목코드'])
+        for code, name in df.drop_duplicates(subset='종목명').itertuples(index=False):
+            name = str(name).strip()
+            if len(name) < MIN_NAME_LENGTH:
+                continue
+            self.names[code] = name
+            self.automaton.add(name, (KIND_STOCK, code))
+            if theme_index is not None:
+                self.stock_themes[code] = theme_index.themes_of(code)
+
+        for theme in themes:
+            # '2차전지(소재)'처럼 괄호가 붙은 테마는 괄호 앞부분('2차전지')으로도 찾습니다.
+            for alias in {theme, theme.split('(')[0].strip()}:
+                if len(alias) >= MIN_NAME_LENGTH:
+                    self.automaton.add(alias, (KIND_THEME, theme))
+
+        self.automaton.build()
+
+    def match(self, text):
+        """
+        제목 하나에서 종목/테마 언급을 찾습니다.
+
+        Returns:
+            tuple: (종목코드 리스트, 테마 리스트) 등장 순서, 중복 제거
+        """
+        text = str(text)
+        candidates = [(start, end, value) for start, end, value in self.automaton.iter_matches(text)
+                      if start == 0 or not is_word_char(text[start - 1])]
+
+        # 앞에서부터, 같은 위치에서는 긴 이름부터 골라 서로 겹치지 않게 선택합니다.
+        candidates.sort(key=lambda m: (m[0], m[0] - m[1]))
+        codes, themes = [], []
+        covered = 0
+        for start, end, (kind, value) in candidates:
+            if start < covered:
+                continue
+            covered = end
+            target = codes if kind == KIND_STOCK else themes
+            if value not in target:
+                target.append(value)
+        return codes, themes
+
+    def match_many(self, titles):
+        """제목 리스트 전체에 대해 match()를 적용합니다."""
+        return [self.match(title) for title in titles]
+
+
+def load_mention_matcher(tradingday=None, folder_path=None):
+    """
+    거래일의 종목/테마 자동자를 반환합니다.
+    'mention_matcher_YYYYMMDD.pkl'이 전종목/테마 파일보다 최신이면 그대로 읽고,
+    아니면 새로 만들어 저장합니다. (거래일당 한 번만 생성)
+
+    Args:
+        tradingday (str, optional): 거래일자 (YYYYMMDD). 없으면 최근 거래일
+        folder_path (str, optional): 데이터 폴더 경로. 없으면 거래일 폴더
+    Returns:
+        MentionMatcher: 자동자 (전종목 파일이 없으면 None)
+    """
+    if tradingday is None:
+        tradingday = get_last_trading_day_str()
+    if folder_path is None:
+        folder_path = get_trading_day_folder_path()
+
+    krx_file = os.path.join(folder_path, f'krx_stock_list_{tradingday}.csv')
+    theme_dtl_file = os.path.join(folder_path, f'naver_themes_dtl_list_{tradingday}.csv')
+    matcher_file = os.path.join(folder_path, f'mention_matcher_{tradingday}.pkl')
+
+    if not os.path.exists(krx_file):
+        print(f"오류: 전종목 파일이 없습니다. ({krx_file})")
+        return None
+
+    sources = [path for path in (krx_file, theme_dtl_file) if os.path.exists(path)]
+    if os.path.exists(matcher_file) and all(os.path.getmtime(matcher_file) >= os.path.getmtime(p) for p in sources):
+        with open(matcher_file, 'rb') as f:
+            return pickle.load(f)
+
+    df_stocks = pd.read_csv(krx_file, usecols=['종목코드', '종목명'], dtype={'종목코드': str})
+    theme_index = load_theme_index(tradingday, folder_path) if theme_dtl_file in sources else None
+    themes = theme_index.themes.tolist() if theme_index is not None else []
+
+    matcher = MentionMatcher(df_stocks, themes, theme_index)
+    with file_manager.atomic_write(matcher_file) as tmp_path:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"종목/테마 자동자 생성: 종목 {len(matcher.names)}개, 테마 {len(themes)}개, 노드 {len(matcher.automaton.goto)}개")
+    return matcher
+
+
+def load_selected_codes(tradingday, folder_path):
+    """당일 선정 종목(00_stock_analysis_pivoted) 종목코드 집합을 반환합니다. (파일이 없으면 빈 집합)"""
+    pivoted_file = os.path.join(folder_path, f'00_stock_analysis_pivoted_{tradingday}.xlsx')
+    if not os.path.exists(pivoted_file):
+        return set()
+    df = pd.read_excel(pivoted_file, sheet_name='종목분석', usecols=['종목코드'], dtype={'종목코드': str})
+    return set(normalize_codes(df['종목코드'].dropna()))
+
+
+def attach_mentions(df_news, tradingday=None, folder_path=None):
+    """
+    뉴스 목록에 언급된 종목/테마 컬럼을 붙이고, 종목별/테마별 언급 수를 집계합니다.
+
+    Args:
+        df_news (pd.DataFrame): 'title' 컬럼을 가진 뉴스 목록 ('클러스터'가 있으면 같은 사건은 한 번만 집계)
+        tradingday (str, optional): 거래일자 (YYYYMMDD). 없으면 최근 거래일
+        folder_path (str, optional): 데이터 폴더 경로. 없으면 거래일 폴더
+    Returns:
+        tuple: (df_news, 종목언급 DataFrame, 테마언급 DataFrame) 자동자를 만들 수 없으면 집계는 None
+    """
+    if tradingday is None:
+        tradingday = get_last_trading_day_str()
+    if folder_path is None:
+        folder_path = get_trading_day_folder_path()
+
+    matcher = load_mention_matcher(tradingday, folder_path) if not df_news.empty else None
+    if matcher is None:
+        return df_news, None, None
+
+    matches = matcher.match_many(df_news['title'].tolist())
+    df_news = df_news.copy()
+    df_news['언급종목코드'] = [', '.join(codes) for codes, _ in matches]
+    df_news['언급종목'] = [', '.join(matcher.names[c] for c in codes) for codes, _ in matches]
+    df_news['언급테마'] = [', '.join(themes) for _, themes in matches]
+
+    # 같은 사건을 여러 언론사가 보도한 경우 한 번만 셉니다.
+    if '클러스터' in df_news.columns:
+        unique_pos = ~df_news['클러스터'].duplicated().to_numpy()
+        matches = [m for m, keep in zip(matches, unique_pos) if keep]
+
+    stock_counts = Counter(code for codes, _ in matches for code in codes)
+    direct_counts = Counter(theme for _, themes in matches for theme in themes)
+    # 종목 언급은 그 종목이 속한 테마의 언급으로도 셉니다. (기사 하나에서 테마당 한 번)
+    via_stock_counts = Counter(theme for codes, _ in matches
+                               for theme in {t for code in codes for t in matcher.stock_themes.get(code, [])})
+
+    selected = load_selected_codes(tradingday, folder_path)
+    df_stock_mentions = pd.DataFrame(
+        [{'종목코드': code, '종목명': matcher.names[code], '언급수': count,
+          '선정종목': 'O' if code in selected else '', '테마': ', '.join(matcher.stock_themes.get(code, []))}
+         for code, count in stock_counts.most_common()],
+        columns=['종목코드', '종목명', '언급수', '선정종목', '테마'])
+
+    theme_rows = [{'테마': theme, '직접언급': direct_counts.get(theme, 0), '종목언급': via_stock_counts.get(theme, 0)}
+                  for theme in set(direct_counts) | set(via_stock_counts)]
+    df_theme_mentions = pd.DataFrame(theme_rows, columns=['테마', '직접언급', '종목언급'])
+    df_theme_mentions['합계'] = df_theme_mentions['직접언급'] + df_theme_mentions['종목언급']
+    df_theme_mentions = df_theme_mentions.sort_values(by=['합계', '테마'], ascending=[False, True]).reset_index(drop=True)
+
+    print(f"뉴스 언급: 종목 {len(df_stock_mentions)}개 (선정종목 {int((df_stock_mentions['선정종목'] == 'O').sum())}개), 테마 {len(df_theme_mentions)}개")
+    return df_news, df_stock_mentions, df_theme_mentions
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import re
+
+from common import file_manager
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 뉴스 제목 토큰화 + 영구 캐시]
+# 키워드 분석은 제목을 단어(토큰)로 나누는 것부터 시작합니다.
+# - regex   : 정규표현식으로 한글 덩어리만 추출 (빠르지만 조사가 붙은 채로 남음: '삼성전자가')
+# - okt     : KoNLPy의 형태소 분석기로 명사만 추출 (정확하지만 느림, pip3 install konlpy 필요)
+# - komoran : KoNLPy의 다른 형태소 분석기 (pip3 install konlpy 필요)
+# - auto    : (기본값) KoNLPy가 설치되어 있으면 okt, 없으면 regex
+#
+# 형태소 분석은 느리므로 결과를 'news_cache/tokens_<backend>.json'에 저장해 둡니다.
+# 키는 정리된 제목의 해시이므로, 같은 기사가 여러 섹션/여러 날에 나와도
+# 또는 '[속보]', '(종합)' 같은 머리말만 다른 제목이어도 한 번만 분석합니다.
+#
+# 백엔드는 환경변수 NEWS_TOKENIZER(regex/okt/komoran/auto)로 고를 수 있습니다.
+# -----------------------------------------------------------------------------------------
+
+# 제목 앞뒤의 [속보], (종합), <사진> 같은 머리말/꼬리말
+TAG_PATTERN = re.compile(r'^\s*(?:[\[\(<【][^\]\)>】]{1,10}[\]\)>】]\s*)+|(?:\s*[\[\(<【][^\]\)>】]{1,10}[\]\)>】])+\s*$')
+HANGUL_PATTERN = re.compile(r'[가-힣]+')
+
+
+def normalize_title(title):
+    """캐시 키로 쓰기 위해 머리말/꼬리말 태그와 중복 공백을 제거합니다."""
+    return ' '.join(TAG_PATTERN.sub('', str(title)).split())
+
+
+class RegexTokenizer:
+    """한글 연속 문자열 중 2글자 이상만 토큰으로 사용합니다. (기존 분석 방식)"""
+    name = 'regex'
+
+    def tokenize_many(self, titles):
+        return [[w for w in HANGUL_PATTERN.findall(title) if len(w) > 1] for title in titles]
+
+
+class KonlpyTokenizer:
+    """KoNLPy 형태소 분석기로 2글자 이상의 명사만 추출합니다."""
+
+    def __init__(self, name):
+        from konlpy import tag  # 설치되어 있을 때만 불러옵니다.
+        self.name = name
+        self.analyzer = tag.Okt() if name == 'okt' else tag.Komoran()
+
+    def tokenize_many(self, titles):
+        return [[w for w in self.analyzer.nouns(title) if len(w) > 1] for title in titles]
+
+
+def get_tokenizer(backend=None):
+    """
+    토큰화 백엔드를 생성합니다.
+
+    Args:
+        backend (str, optional): 'regex', 'okt', 'komoran', 'auto' (없으면 환경변수 NEWS_TOKENIZER, 기본 auto)
+    Returns:
+        RegexTokenizer 또는 KonlpyTokenizer
+    """
+    backend = (backend or os.environ.get('NEWS_TOKENIZER', 'auto')).lower()
+    if backend == 'regex':
+        return RegexTokenizer()
+
+    try:
+        return KonlpyTokenizer('okt' if backend == 'auto' else backend)
+    except Exception as e:
+        # konlpy 미설치, 또는 형태소 분석기에 필요한 Java가 없는 경우
+        if backend != 'auto':
+            print(f"형태소 분석기({backend})를 사용할 수 없어 정규표현식 방식으로 분석합니다: {e}")
+        return RegexTokenizer()
+
+
+def get_token_cache_path():
+    """토큰 캐시 폴더 경로를 반환하고, 필요하면 생성합니다."""
+    return file_manager.make_folder('news_cache')
+
+
+class TokenCache:
+    """정리된 제목의 해시 -> 토큰 리스트를 저장하는 영구 캐시입니다. (백엔드별 파일)"""
+
+    def __init__(self, backend_name, cache_path=None):
+        self.cache_path = cache_path or get_token_cache_path()
+        self.index_path = os.path.join(self.cache_path, f'tokens_{backend_name}.json')
+        self.dirty = False
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        else:
+            self.entries = {}
+
+    @staticmethod
+    def key(normalized_title):
+        return hashlib.sha1(normalized_title.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, tokens):
+        self.entries[key] = tokens
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        with file_manager.atomic_write(self.index_path) as tmp_path:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+        self.dirty = False
+
+
+def tokenize_titles(titles, tokenizer=None, cache=None):
+    """
+    제목 리스트를 토큰화합니다. 캐시에 없는 (중복 제거된) 제목만 분석기에 넘깁니다.
+
+    Args:
+        titles (list): 뉴스 제목 리스트
+        tokenizer (optional): get_tokenizer()로 만든 백엔드 (없으면 기본 백엔드)
+        cache (TokenCache, optional): 사용할 캐시 (없으면 백엔드 이름의 기본 캐시)
+    Returns:
+        list: 제목별 토큰 리스트 (입력 순서 유지)
+    """
+    tokenizer = tokenizer or get_tokenizer()
+    cache = cache or TokenCache(tokenizer.name)
+
+    keys = []
+    misses = {}   # 키 -> 정리된 제목 (같은 제목은 한 번만 분석)
+    for title in titles:
+        normalized = normalize_title(title)
+        key = TokenCache.key(normalized)
+        keys.append(key)
+        if cache.get(key) is None and key not in misses:
+            misses[key] = normalized
+
+    if misses:
+        for key, tokens in zip(misses, tokenizer.tokenize_many(list(misses.values()))):
+            cache.put(key, tokens)
+        cache.save()
+
+    print(f"토큰화({tokenizer.name}): 제목 {len(titles)}개 중 새로 분석 {len(misses)}개, 캐시 사용 {len(titles) - len(misses)}개")
+    return [cache.get(key) for key in keys]
@@ -5,8 +5,11 @@ import os
 import shutil
 import time
 import sys
+import datetime
 
-from common import file_manager, get_daily_folder_path, get_today_str, get_last_trading_day_str, get_trading_day_folder_path
+from common import file_manager, get_daily_folder_path, get_today_str, get_last_trading_day_str, get_trading_day_folder_path, list_previous_trading_days
+from component import raw_archive
+from component.naverstock import naverJsonApi
 
 # -----------------------------------------------------------------------------------------
 # [교육용 주석: 네이버 금융 테마 상세 정보 크롤링]
@@ -17,6 +20,7 @@ from common import file_manager, get_daily_folder_path, get_today_str, get_last_
 # 1. 오늘 날짜의 테마 목록 파일 읽기
 # 2. 각 테마의 URL에서 고유 번호 추출
 # 3. 상세 페이지 접근하여 종목 정보 수집
+#    (증분 모드: 직전 거래일과 구성 종목 수가 같은 테마는 재수집하지 않고 재사용)
 # 4. 결과 저장
 # -----------------------------------------------------------------------------------------
 
@@ -30,13 +34,17 @@ def get_theme_detail(themeNm, themeRate, theme_no):
     Returns:
         list: 해당 테마에 속한 종목들의 상세 정보 리스트
     """
+    # NAVER_BACKEND=json 이면 같은 종목 목록을 모바일 JSON API로 받습니다. (naverJsonApi.py 참고)
+    if naverJsonApi.get_backend() == naverJsonApi.BACKEND_JSON:
+        return naverJsonApi.get_theme_detail(themeNm, themeRate, theme_no)
+
     theme_nm = themeNm
     theme_rate = themeRate
     
     # 테마 상세 페이지 URL 구성
     url = f"https://finance.naver.com/sise/sise_group_detail.naver?type=theme&no={theme_no}"
     
-    response = requests.get(url)
+    response = raw_archive.get(raw_archive.SOURCE_NAVER_THEME_DTL, url)
     response.encoding = 'euc-kr'
     soup = BeautifulSoup(response.text, 'html.parser')
     
@@ -81,8 +89,86 @@ def get_theme_detail(themeNm, themeRate, theme_no):
                 })
     return stocks_data
 
-def naverThemeDtl():
-    """메인 실행 함수"""
+# 증분 수집 시, 이 일수보다 오래된 테마 상세 캐시는 변경 여부와 관계없이 다시 수집합니다.
+THEME_CACHE_MAX_AGE_DAYS = 7
+
+def get_theme_member_count(row):
+    """테마 목록의 상승/보합/하락 종목 수 합계(= 구성 종목 수)를 반환합니다. (정보가 없으면 None)"""
+    try:
+        return int(row['상승']) + int(row['보합']) + int(row['하락'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def load_previous_theme_detail(tradingday):
+    """
+    직전 거래일의 테마 상세 데이터와 수집 상태 파일을 읽어옵니다.
+    직전 거래일 폴더에 두 파일이 없으면(그날 수집을 건너뛴 경우 등) 두 파일이 모두 있는 가장 가까운 거래일까지 거슬러 올라갑니다.
+    (THEME_CACHE_MAX_AGE_DAYS보다 오래된 데이터는 어차피 다시 수집하므로 그만큼만 찾습니다)
+    Returns:
+        tuple: (테마 상세 DataFrame, 수집 상태 DataFrame) 또는 (None, None)
+    """
+    for day in list_previous_trading_days(tradingday, THEME_CACHE_MAX_AGE_DAYS):
+        prev_folder = os.path.join(file_manager.get_current_path(), day)
+        dtl_file = os.path.join(prev_folder, f'naver_themes_dtl_list_{day}.csv')
+        state_file = os.path.join(prev_folder, f'naver_themes_dtl_state_{day}.csv')
+
+        if os.path.exists(dtl_file) and os.path.exists(state_file):
+            print(f"직전 거래일({day}) 테마 상세 데이터를 재사용합니다.")
+            prev_dtl_df = pd.read_csv(dtl_file, dtype={'종목코드': str})
+            prev_state_df = pd.read_csv(state_file, dtype={'테마번호': str, '수집일': str})
+            return prev_dtl_df, prev_state_df
+
+    return None, None
+
+# 재사용 시 오늘 시세로 다시 채우는 컬럼
+QUOTE_COLUMNS = ['전일비', '등락률', '거래량']
+
+def refresh_reused_prices(reused_df, folder_path, tradingday):
+    """
+    재사용한 테마 상세 행의 시세 컬럼(전일비, 등락률, 거래량)을 오늘 KRX 시세로 갱신합니다.
+    구성 종목은 어제와 같아도 가격은 매일 바뀌기 때문입니다.
+    """
+    krx_file = os.path.join(folder_path, f'krx_stock_list_{tradingday}.csv')
+    if reused_df.empty or not os.path.exists(krx_file):
+        if not reused_df.empty:
+            print(f"경고: KRX 시세 파일이 없어 재사용 테마의 시세는 직전 거래일 값입니다. ({krx_file})")
+        return reused_df
+
+    krx_df = pd.read_csv(krx_file, usecols=['종목코드', '대비', '등락률', '거래량'], dtype={'종목코드': str})
+    krx_df['종목코드'] = krx_df['종목코드'].str.zfill(6)
+    krx_df = krx_df.drop_duplicates(subset='종목코드').set_index('종목코드')
+
+    quotes = krx_df.reindex(reused_df['종목코드'].str.zfill(6))
+    has_quote = quotes['등락률'].notna().to_numpy()
+
+    # 테마 상세 페이지와 같은 표기('+1,234', '-500', '0')로 맞춥니다.
+    diff = quotes['대비'].fillna(0).astype('int64')
+    diff_text = diff.map(lambda x: f'{x:+,}' if x != 0 else '0')
+
+    # 직전 파일에서 숫자로 읽힌 컬럼(float64 등)에는 문자열을 넣을 수 없으므로 object로 바꿔 둡니다.
+    reused_df = reused_df.astype({col: object for col in QUOTE_COLUMNS})
+    reused_df.loc[has_quote, '전일비'] = diff_text[has_quote].to_numpy()
+    reused_df.loc[has_quote, '등락률'] = quotes['등락률'][has_quote].map(lambda x: f'{x:+.2f}').to_numpy()
+    reused_df.loc[has_quote, '거래량'] = quotes['거래량'][has_quote].astype('int64').astype(str).to_numpy()
+    return reused_df
+
+def save_theme_state(state_rows, folder_path, tradingday):
+    """
+    테마별 수집 상태(테마, 테마번호, 종목수, 수집일)를 'naver_themes_dtl_state_YYYYMMDD.csv'로 저장합니다.
+    다음 거래일의 증분 수집(load_previous_theme_detail)이 이 파일로 재사용 여부를 판단합니다.
+    """
+    state_path = os.path.join(folder_path, f'naver_themes_dtl_state_{tradingday}.csv')
+    with file_manager.atomic_write(state_path) as tmp_path:
+        pd.DataFrame(state_rows).to_csv(tmp_path, index=False, encoding='utf-8-sig')
+
+def naverThemeDtl(incremental=True, max_age_days=THEME_CACHE_MAX_AGE_DAYS):
+    """
+    메인 실행 함수
+
+    Args:
+        incremental (bool): True이면 직전 거래일 데이터를 재사용하고 바뀐 테마만 다시 수집합니다.
+        max_age_days (int): 캐시된 테마 상세를 재사용할 수 있는 최대 일수
+    """
     print("="*50)
     print("네이버 금융 테마 상세 정보(종목 및 편입사유) 수집을 시작합니다.")
     print("="*50)
@@ -109,7 +195,18 @@ def naverThemeDtl():
     theme_df = pd.read_csv(theme_list_file)
     print(f"총 {len(theme_df)}개의 테마에 대한 상세 정보를 수집합니다.")
 
-    all_stocks_data = []
+    # 증분 모드: 직전 거래일의 테마 상세와 수집 상태(테마번호, 종목수, 수집일)를 불러옵니다.
+    prev_dtl_df, prev_state_df = (None, None)
+    if incremental:
+        prev_dtl_df, prev_state_df = load_previous_theme_detail(tradingday)
+    prev_state = {} if prev_state_df is None else prev_state_df.set_index('테마번호').to_dict('index')
+    prev_groups = {} if prev_dtl_df is None else dict(tuple(prev_dtl_df.groupby('테마', sort=False)))
+
+    today_date = datetime.datetime.strptime(tradingday, "%Y%m%d").date()
+
+    theme_frames = []
+    state_rows = []
+    crawled_count = 0
     
     # 3. 각 테마별 상세 정보 수집
     # iterrows()는 데이터프레임의 각 행을 반복합니다.
@@ -121,27 +218,64 @@ def naverThemeDtl():
         if theme_url:
             # URL에서 'no=' 뒤의 숫자(테마 번호) 추출
             theme_no = theme_url.split('no=')[1]
-            
-            # 진행상황 출력
-            print(f"[{idx + 1}/{len(theme_df)}] 테마 정보 수집 중: {theme_nm}")
-            
-            stocks_data = get_theme_detail(theme_nm, theme_rate, theme_no)
-            all_stocks_data.extend(stocks_data)
-            
-            time.sleep(0.5)  # 서버 부하 방지
+            member_count = get_theme_member_count(row)
+
+            # 재사용 조건: 직전 데이터가 있고, 구성 종목 수가 같고, 캐시가 오래되지 않은 경우
+            cached = prev_state.get(theme_no)
+            cached_df = prev_groups.get(theme_nm)
+            reuse = False
+            if cached is not None and cached_df is not None:
+                cached_date = datetime.datetime.strptime(cached['수집일'], "%Y%m%d").date()
+                count_same = member_count is not None and member_count == cached['종목수']
+                fresh = (today_date - cached_date).days < max_age_days
+                reuse = count_same and fresh
+
+            if reuse:
+                stocks_df = cached_df.copy()
+                stocks_df['테마등락률'] = theme_rate
+                collected_day = cached['수집일']
+                stocks_df['_재사용'] = True
+            else:
+                # 진행상황 출력
+                print(f"[{idx + 1}/{len(theme_df)}] 테마 정보 수집 중: {theme_nm}")
+
+                stocks_data = get_theme_detail(theme_nm, theme_rate, theme_no)
+                stocks_df = pd.DataFrame(stocks_data)
+                stocks_df['_재사용'] = False
+                collected_day = tradingday
+                crawled_count += 1
+                
+                raw_archive.polite_sleep(0.5)  # 서버 부하 방지 (replay 모드에서는 대기 생략)
+
+            theme_frames.append(stocks_df)
+            state_rows.append({
+                '테마': theme_nm,
+                '테마번호': theme_no,
+                '종목수': member_count if member_count is not None else len(stocks_df),
+                '수집일': collected_day,
+            })
+
+    print(f"상세 페이지 수집: {crawled_count}개 테마 / 재사용: {len(state_rows) - crawled_count}개 테마")
+
+    # 재사용한 행은 오늘 시세로 가격 컬럼을 갱신합니다.
+    df = pd.concat(theme_frames, ignore_index=True) if theme_frames else pd.DataFrame()
+    if not df.empty:
+        reused_mask = df['_재사용'].astype(bool)
+        df = df.astype({col: object for col in QUOTE_COLUMNS})
+        df.loc[reused_mask] = refresh_reused_prices(df[reused_mask], folder_path, tradingday)
+        df = df.drop(columns=['_재사용'])
     
     # 4. 결과 저장
     output_filename = f'naver_themes_dtl_list_{tradingday}.csv'
     save_path = os.path.join(folder_path, output_filename)
 
-    # 동일 파일 삭제
-    file_manager.check_and_delete_file(save_path)
-    
-    # DataFrame 생성 및 CSV 저장
-    df = pd.DataFrame(all_stocks_data)
-    df.to_csv(save_path, index=False, encoding='utf-8-sig')
+    # DataFrame CSV 저장 (수집 상태 파일은 다음 거래일의 증분 수집에 사용됩니다)
+    # 임시 파일에 쓴 뒤 한 번에 교체합니다. (쓰는 도중 중단되어도 반쯤 쓰인 파일이 남지 않음)
+    with file_manager.atomic_write(save_path) as tmp_path:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    save_theme_state(state_rows, folder_path, tradingday)
     
     print(f"성공: 테마 상세 정보가 '{output_filename}' 파일로 저장되었습니다.")
 
 if __name__ == "__main__":
-    naverThemeDtl()
\ No newline at end of file
+    naverThemeDtl()
@@ -6,6 +6,8 @@ import os
 import sys
 
 from common import file_manager, get_daily_folder_path, get_today_str
+from component import raw_archive
+from component.naverstock import naverJsonApi
 
 # -----------------------------------------------------------------------------------------
 # [교육용 주석: 네이버 금융 테마 크롤링]
@@ -18,19 +20,25 @@ from common import file_manager, get_daily_folder_path, get_today_str
 # 3. pandas: 수집한 데이터를 엑셀이나 CSV 파일로 쉽게 저장하기 위해 사용합니다.
 # -----------------------------------------------------------------------------------------
 
-def get_theme_data(page_num):
+def get_theme_data(page_num, session=None):
     """
     특정 페이지의 테마 정보를 수집하여 리스트로 반환하는 함수입니다.
     Args:
         page_num (int): 수집할 페이지 번호
+        session (requests.Session, optional): 재사용할 세션 (없으면 매번 새 연결)
     Returns:
         list: 테마 정보(딕셔너리)가 담긴 리스트
     """
+    # NAVER_BACKEND=json 이면 같은 페이지를 모바일 JSON API로 받습니다. (naverJsonApi.py 참고)
+    if naverJsonApi.get_backend() == naverJsonApi.BACKEND_JSON:
+        return naverJsonApi.get_theme_data(page_num, session)
+
     url_basic = "https://finance.naver.com/sise"
     url = f"https://finance.naver.com/sise/theme.naver?&page={page_num}"
     
     # 웹 서버에 요청을 보냅니다.
-    response = requests.get(url)
+    # (RAW_ARCHIVE 모드에 따라 원본 응답을 기록하거나 보관된 응답을 재생합니다)
+    response = raw_archive.get(raw_archive.SOURCE_NAVER_THEME, url, session=session)
     
     # 네이버 금융은 오래된 사이트라 인코딩이 'euc-kr'로 되어 있는 경우가 많습니다.
     # 한글 깨짐을 방지하기 위해 인코딩을 명시해줍니다.
@@ -63,11 +71,20 @@ def get_theme_data(page_num):
             theme_name = link_tag.text.strip()
             change_rate = cols[1].text.strip()
             
-            themes_data.append({
+            theme_item = {
                 '테마명': theme_name,
                 '전일대비': change_rate,
                 '상세url': theme_url,
-            })
+            }
+
+            # 전일대비 등락현황 (상승/보합/하락 종목 수)
+            # 세 값의 합이 테마 구성 종목 수이므로, 상세 페이지 재수집 여부 판단에 사용합니다.
+            if len(cols) > 5:
+                theme_item['상승'] = cols[3].text.strip()
+                theme_item['보합'] = cols[4].text.strip()
+                theme_item['하락'] = cols[5].text.strip()
+
+            themes_data.append(theme_item)
     
     return themes_data
 
@@ -96,15 +113,14 @@ def naverTheme():
     # 3. 파일 저장
     output_filename = f'naver_themes_list_{today}.csv'
     
-    # 이미 파일이 있다면 삭제
-    file_manager.check_and_delete_file(os.path.join(folder_path, output_filename))
-
     # 데이터프레임 생성 및 CSV 저장
     df = pd.DataFrame(all_themes_data)
     
     # utf-8-sig: 엑셀에서 한글이 깨지지 않게 하는 인코딩
+    # 임시 파일에 쓴 뒤 한 번에 교체합니다. (쓰는 도중 중단되어도 반쯤 쓰인 파일이 남지 않음)
     save_path = os.path.join(folder_path, output_filename)
-    df.to_csv(save_path, index=False, encoding='utf-8-sig')
+    with file_manager.atomic_write(save_path) as tmp_path:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
     
     print(f"성공: 테마 목록이 '{output_filename}' 파일로 저장되었습니다.")
 
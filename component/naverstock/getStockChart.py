@@ -84,11 +84,9 @@ def generate_chart_urls():
     output_filename = f'naver_stock_chart_{tradingday}.xlsx'
     output_filepath = os.path.join(folder_path, output_filename)
     
-    # 기존 파일 삭제
-    file_manager.check_and_delete_file(output_filepath)
-    
     try:
-        with pd.ExcelWriter(output_filepath, engine='openpyxl') as writer:
+        # 임시 파일에 쓴 뒤 한 번에 교체합니다. (쓰는 도중 중단되어도 반쯤 쓰인 파일이 남지 않음)
+        with file_manager.atomic_write(output_filepath) as tmp_path, pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
             # 시트명: 종목차트
             output_df.to_excel(writer, sheet_name='종목차트', index=False)
             
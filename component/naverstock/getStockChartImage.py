@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+from openpyxl.utils import get_column_letter
+
+from common import file_manager, get_last_trading_day_str, get_trading_day_folder_path
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 차트 이미지 미리 받기 + 내용 기반(content-addressed) 캐시]
+# getStockChart.py가 만든 'naver_stock_chart_YYYYMMDD.xlsx'의 차트 URL(3개월/1년/3년)을
+# 여러 스레드로 동시에 내려받아 'chart_cache' 폴더에 저장합니다.
+#
+# - 이미지 파일 이름은 내용의 SHA-256 해시입니다. 내용이 같으면 같은 파일이므로
+#   날짜가 바뀌어도 차트가 그대로인 종목은 디스크에 한 번만 저장됩니다.
+# - 이전에 받은 URL은 ETag/Last-Modified를 기억해 두었다가 조건부 요청을 보내고,
+#   서버가 304(Not Modified)를 주면 다시 받지 않습니다.
+# - 결과는 엑셀 썸네일 시트(Pillow 설치 시) 및 HTML 보고서로 만들 수 있습니다.
+# -----------------------------------------------------------------------------------------
+
+CHART_PERIODS = {'3개월': 'month3', '1년': 'year', '3년': 'year3'}
+CHART_URL = "https://ssl.pstatic.net/imgfinance/chart/item/area/{period}/{code}.png"
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36',
+    'Referer': 'https://finance.naver.com',
+}
+
+
+def get_chart_cache_path():
+    """차트 이미지 캐시 폴더 경로를 반환하고, 필요하면 생성합니다."""
+    return file_manager.make_folder('chart_cache')
+
+
+class ChartImageCache:
+    """
+    내용 해시로 이미지를 저장하는 캐시입니다.
+    - objects/<해시 앞 2자리>/<해시>.png : 이미지 파일
+    - index.json : URL -> {hash, etag, last_modified}
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path or get_chart_cache_path()
+        self.index_path = os.path.join(self.cache_path, 'index.json')
+        self.lock = threading.Lock()
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    def object_path(self, digest):
+        return os.path.join(self.cache_path, 'objects', digest[:2], f'{digest}.png')
+
+    def put(self, content):
+        """이미지 내용을 저장하고 해시를 반환합니다. (이미 있으면 쓰지 않음)"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return digest
+
+    def fetch(self, session, url):
+        """
+        URL의 이미지를 캐시를 거쳐 가져옵니다.
+        Returns:
+            tuple: (해시, 상태) 상태는 'downloaded' / 'not_modified'
+        """
+        with self.lock:
+            entry = dict(self.index.get(url, {}))
+
+        headers = dict(HEADERS)
+        if entry.get('hash') and os.path.exists(self.object_path(entry['hash'])):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, headers=headers, timeout=10)
+        if response.status_code == 304:
+            return entry['hash'], 'not_modified'
+        response.raise_for_status()
+
+        digest = self.put(response.content)
+        with self.lock:
+            self.index[url] = {
+                'hash': digest,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+        return digest, 'downloaded'
+
+    def save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+
+def prefetch_chart_images(chart_df, cache=None, workers=8):
+    """
+    종목별 차트 이미지(3개월/1년/3년)를 동시에 내려받아 캐시에 저장합니다.
+
+    Args:
+        chart_df (pd.DataFrame): '종목코드', '종목명' 컬럼을 가진 데이터프레임
+        cache (ChartImageCache, optional): 사용할 캐시
+        workers (int): 동시에 실행할 스레드 수
+    Returns:
+        pd.DataFrame: 종목코드, 종목명, 기간, 해시, 이미지경로 컬럼을 가진 데이터프레임
+    """
+    cache = cache or ChartImageCache()
+    local = threading.local()
+
+    def fetch(url):
+        # 스레드마다 세션 하나를 만들어 연결(keep-alive)을 재사용합니다.
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return cache.fetch(local.session, url)
+
+    tasks = []
+    for _, row in chart_df.iterrows():
+        code = str(row['종목코드']).zfill(6)
+        for label, period in CHART_PERIODS.items():
+            tasks.append((code, row['종목명'], label, CHART_URL.format(period=period, code=code)))
+
+    results, status_count = {}, {'downloaded': 0, 'not_modified': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fetch, task[3]): task for task in tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                digest, status = future.result()
+                results[task] = digest
+                status_count[status] += 1
+            except Exception as e:
+                status_count['failed'] += 1
+                print(f"  - 차트 이미지 수집 실패 ({task[1]} {task[2]}): {e}")
+
+    cache.save_index()
+    print(f"차트 이미지: 신규 {status_count['downloaded']}개 / 변경없음 {status_count['not_modified']}개 / 실패 {status_count['failed']}개")
+
+    rows = []
+    for task in tasks:
+        digest = results.get(task)
+        rows.append({
+            '종목코드': task[0],
+            '종목명': task[1],
+            '기간': task[2],
+            '해시': digest,
+            '이미지경로': cache.object_path(digest) if digest else None,
+        })
+    return pd.DataFrame(rows)
+
+
+def has_image(path):
+    """이미지 경로가 있는지 확인합니다. (다운로드에 실패한 칸은 None, CSV에서 다시 읽으면 NaN)"""
+    return isinstance(path, str) and bool(path)
+
+
+def write_html_report(image_df, output_filepath):
+    """차트 이미지를 종목별 한 줄(3개월/1년/3년)로 보여주는 HTML 보고서를 만듭니다."""
+    base_dir = os.path.dirname(output_filepath)
+    lines = [
+        '<!DOCTYPE html>',
+        '<html><head><meta charset="utf-8"><title>종목 차트</title>',
+        '<style>body{font-family:sans-serif} td{padding:4px;vertical-align:top} img{width:280px}</style>',
+        '</head><body><table>',
+        '<tr><th>종목</th>' + ''.join(f'<th>{label}</th>' for label in CHART_PERIODS) + '</tr>',
+    ]
+    for (code, name), group in image_df.groupby(['종목코드', '종목명'], sort=False):
+        cells = []
+        for label in CHART_PERIODS:
+            path = group.loc[group['기간'] == label, '이미지경로'].iloc[0]
+            cells.append(f'<td><img src="{os.path.relpath(path, base_dir)}"></td>' if has_image(path) else '<td>-</td>')
+        lines.append(f'<tr><td>{name}<br>{code}</td>' + ''.join(cells) + '</tr>')
+    lines.append('</table></body></html>')
+
+    with open(output_filepath, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def embed_thumbnails(image_df, output_filepath, width=240):
+    """
+    차트 이미지를 엑셀 '차트이미지' 시트에 썸네일로 넣습니다.
+    openpyxl의 이미지 기능은 Pillow가 필요하므로, 설치되어 있지 않으면 건너뜁니다.
+    """
+    try:
+        import PIL  # noqa: F401 (openpyxl 이미지 삽입에 필요)
+    except ImportError:
+        print("Pillow가 설치되어 있지 않아 엑셀 썸네일 삽입을 건너뜁니다. (pip3 install pillow)")
+        return False
+    from openpyxl import Workbook
+    from openpyxl.drawing.image import Image
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = '차트이미지'
+    ws.append(['종목코드', '종목명'] + list(CHART_PERIODS))
+
+    for row_idx, ((code, name), group) in enumerate(image_df.groupby(['종목코드', '종목명'], sort=False), start=2):
+        ws.cell(row=row_idx, column=1, value=code)
+        ws.cell(row=row_idx, column=2, value=name)
+        for col_idx, label in enumerate(CHART_PERIODS, start=3):
+            path = group.loc[group['기간'] == label, '이미지경로'].iloc[0]
+            if not has_image(path):
+                continue
+            image = Image(path)
+            # 가로 width 픽셀로 비율을 유지하며 축소
+            ratio = width / image.width
+            image.width, image.height = width, int(image.height * ratio)
+            ws.add_image(image, f'{get_column_letter(col_idx)}{row_idx}')
+            ws.row_dimensions[row_idx].height = image.height * 0.75  # 픽셀 -> 포인트
+            ws.column_dimensions[get_column_letter(col_idx)].width = width / 7
+
+    wb.save(output_filepath)
+    return True
+
+
+def prefetchStockCharts(workers=8, embed_excel=True, html=True):
+    """메인 실행 함수: 차트 URL 파일의 종목 차트 이미지를 미리 받아 보고서를 만듭니다."""
+    print("=" * 50)
+    print("네이버 주식 차트 이미지 미리 받기를 시작합니다.")
+    print("=" * 50)
+
+    # 거래일자 설정
+    # 주말/휴장일에는 장이 열리지 않으므로, 가장 최근 거래일을 계산해서 가져옵니다.
+    tradingday = get_last_trading_day_str()
+
+    # 데이터 저장 폴더 경로 가져오기 (없으면 생성)
+    folder_path = get_trading_day_folder_path()
+
+    input_filepath = os.path.join(folder_path, f'naver_stock_chart_{tradingday}.xlsx')
+    if not os.path.exists(input_filepath):
+        print(f"오류: 입력 파일을 찾을 수 없습니다. ({input_filepath})")
+        print("getStockChart.py가 먼저 실행되었는지 확인해주세요.")
+        return None
+
+    chart_df = pd.read_excel(input_filepath, sheet_name='종목차트', dtype={'종목코드': str})
+    image_df = prefetch_chart_images(chart_df, workers=workers)
+
+    # 종목/기간별 이미지 해시 목록 (어느 날짜에 어떤 이미지였는지 기록)
+    manifest_filepath = os.path.join(folder_path, f'naver_stock_chart_images_{tradingday}.csv')
+    with file_manager.atomic_write(manifest_filepath) as tmp_path:
+        image_df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+
+    if html:
+        html_filepath = os.path.join(folder_path, f'naver_stock_chart_{tradingday}.html')
+        with file_manager.atomic_write(html_filepath) as tmp_path:
+            # 이미지 상대 경로는 최종 파일 위치(같은 폴더) 기준으로 계산됩니다.
+            write_html_report(image_df, tmp_path)
+        print(f"HTML 보고서 저장: {html_filepath}")
+
+    if embed_excel:
+        # Pillow가 없으면 embed_thumbnails가 아무것도 쓰지 않고 False를 반환합니다. (atomic_write는 그대로 넘어감)
+        thumb_filepath = os.path.join(folder_path, f'naver_stock_chart_images_{tradingday}.xlsx')
+        with file_manager.atomic_write(thumb_filepath) as tmp_path:
+            embedded = embed_thumbnails(image_df, tmp_path)
+        if embedded:
+            print(f"썸네일 엑셀 저장: {thumb_filepath}")
+
+    return image_df
+
+
+if __name__ == "__main__":
+    prefetchStockCharts()
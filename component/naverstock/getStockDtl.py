@@ -6,6 +6,10 @@ import time
 import sys
 
 from common import file_manager, get_daily_folder_path, get_today_str, get_last_trading_day_str, get_trading_day_folder_path
+from urllib.parse import parse_qs, urlsplit
+
+from component import raw_archive
+from component.naverstock import naverJsonApi
 
 # -----------------------------------------------------------------------------------------
 # [교육용 주석: 네이버 금융 시가총액 정보 크롤링]
@@ -15,15 +19,29 @@ from common import file_manager, get_daily_folder_path, get_today_str, get_last_
 # 이 데이터는 종목별 재무 상태나 시장 관심도를 파악하는 기초 데이터로 활용됩니다.
 # -----------------------------------------------------------------------------------------
 
-def get_market_cap_info(gubun, url):
+def get_market_cap_info(gubun, url, session=None):
     """
     네이버 금융 시가총액 페이지의 표 데이터를 크롤링합니다.
     Args:
         gubun (int): 0(=코스피), 1(=코스닥)
         url (str): 크롤링할 대상 URL
+        session (requests.Session, optional): 재사용할 세션 (없으면 매번 새 연결)
     Returns:
         list: 종목 정보 딕셔너리의 리스트
     """
+    # NAVER_BACKEND=json 이면 같은 페이지를 모바일 JSON API로 받습니다. (naverJsonApi.py 참고)
+    if naverJsonApi.get_backend() == naverJsonApi.BACKEND_JSON:
+        try:
+            page = int(parse_qs(urlsplit(url).query).get('page', ['1'])[0])
+            return naverJsonApi.get_market_cap_info(gubun, page, session)
+        except requests.RequestException as e:
+            print(f"네트워크 요청 중 오류 발생: {str(e)}")
+            return None
+        except Exception as e:
+            # 응답 형식이 바뀐 경우(KeyError, ValueError 등)도 HTML 수집과 같이 None을 돌려줍니다.
+            print(f"데이터 처리 중 오류 발생: {str(e)}")
+            return None
+
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
         'Referer': 'https://finance.naver.com',
@@ -35,7 +53,7 @@ def get_market_cap_info(gubun, url):
         gubunNm = "코스닥"
 
     try:
-        response = requests.get(url, headers=headers)
+        response = raw_archive.get(raw_archive.SOURCE_NAVER_MARKET_SUM, url, session=session, headers=headers)
         response.raise_for_status()
         response.encoding = 'euc-kr'
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -136,12 +154,11 @@ def stockDtl():
     output_filename = f'stock_dtl_list_{tradingday}.csv'
     save_path = os.path.join(folder_path, output_filename)
 
-    # 동일 파일 삭제
-    file_manager.check_and_delete_file(save_path)
-    
     # DataFrame 생성 및 CSV 저장
+    # 임시 파일에 쓴 뒤 한 번에 교체합니다. (쓰는 도중 중단되어도 반쯤 쓰인 파일이 남지 않음)
     df = pd.DataFrame(all_stocks_data)
-    df.to_csv(save_path, index=False, encoding='utf-8-sig')
+    with file_manager.atomic_write(save_path) as tmp_path:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
     
     print(f"\n성공: 종목 상세 정보가 '{output_filename}' 파일로 저장되었습니다. (총 {len(df)}개 종목)")
 
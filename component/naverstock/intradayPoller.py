@@ -0,0 +1,256 @@
+import argparse
+import datetime
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import requests
+
+from common import file_manager
+from trading_calendar import is_trading_day
+from component.naverstock.getStockDtl import get_market_cap_info
+from component.naverstock.getNaverTheme import get_theme_data
+from component.stockanalysis.daily_analysis_stocks import MIN_FLUCTUATION_RATE, MIN_TRADING_AMOUNT
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 장중 폴링 데몬]
+# main_stock.py를 다시 실행하면 모든 단계를 처음부터 다시 합니다.
+# 이 모듈은 프로세스를 계속 띄워 두고, 장중(09:00~15:30, KRX 거래일)에만
+# 몇 분 간격으로 시가총액 페이지와 테마 목록만 다시 읽습니다.
+#
+# - 세션(HTTP 연결), 종목 시세, 테마 순위를 메모리에 계속 보관합니다.
+# - 새로 읽은 행 중 값이 바뀐 종목만 반영합니다.
+# - 변화(새 A/B 선정 종목, 테마 순위 급변)가 생기면 바로 출력하고
+#   'intraday_deltas_YYYYMMDD.csv'에 이어서 기록합니다.
+#
+# 장중 B 조건은 고가/저가가 없으므로 변동폭 조건을 빼고,
+# 거래대금을 현재가 × 거래량으로 추정하여 판단합니다.
+#
+# 실행 예시:
+#   python3 -m component.naverstock.intradayPoller --interval 180
+# -----------------------------------------------------------------------------------------
+
+KST = ZoneInfo('Asia/Seoul')
+MARKET_OPEN = datetime.time(9, 0)
+MARKET_CLOSE = datetime.time(15, 30)
+MARKET_SUM_URL = 'https://finance.naver.com/sise/sise_market_sum.naver?sosok={sosok}&page={page}'
+MAX_MARKET_PAGES = 49
+THEME_PAGES = 8
+
+# 테마 순위가 이 이상 바뀌거나, 상위 TOP_THEME_RANK 안으로 새로 들어오면 알립니다.
+THEME_RANK_MOVE = 10
+TOP_THEME_RANK = 10
+
+
+def to_number(text):
+    """'+1,234', '3.25%', 'N/A' 같은 문자열을 숫자로 변환합니다. (변환할 수 없으면 None)"""
+    try:
+        return float(str(text).replace(',', '').replace('%', '').replace('+', ''))
+    except ValueError:
+        return None
+
+
+def is_market_open(now=None):
+    """지금이 KRX 정규장 시간인지 확인합니다."""
+    now = now or datetime.datetime.now(KST)
+    return is_trading_day(now.date()) and MARKET_OPEN <= now.time() <= MARKET_CLOSE
+
+
+def seconds_until_open(now=None):
+    """다음 정규장 시작까지 남은 초를 계산합니다."""
+    now = now or datetime.datetime.now(KST)
+    day = now.date()
+    if now.time() > MARKET_OPEN:
+        day += datetime.timedelta(days=1)
+    while not is_trading_day(day):
+        day += datetime.timedelta(days=1)
+    next_open = datetime.datetime.combine(day, MARKET_OPEN, tzinfo=KST)
+    return max(0.0, (next_open - now).total_seconds())
+
+
+class IntradayPoller:
+    """장중 시세/테마 상태를 메모리에 보관하며 변화분만 반영하는 폴러입니다."""
+
+    def __init__(self, workers=8):
+        self.workers = workers
+        self.local = threading.local()
+
+        # 메모리 상태
+        self.stocks = {}         # 종목코드 -> 시세 딕셔너리
+        self.selected = {}       # 종목코드 -> 선정사유 (A/B)
+        self.theme_ranks = {}    # 테마명 -> 순위
+        self.last_pages = {0: MAX_MARKET_PAGES, 1: MAX_MARKET_PAGES}  # 시장별 마지막 페이지
+
+    def session(self):
+        # 스레드마다 세션 하나를 만들어 연결(keep-alive)을 재사용합니다.
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    # --- 수집 ----------------------------------------------------------------------
+
+    def fetch_market_pages(self):
+        """코스피/코스닥 시가총액 페이지를 동시에 읽습니다."""
+        tasks = [(sosok, page) for sosok in (0, 1) for page in range(1, self.last_pages[sosok] + 2)
+                 if page <= MAX_MARKET_PAGES]
+
+        def fetch(task):
+            sosok, page = task
+            return task, get_market_cap_info(sosok, MARKET_SUM_URL.format(sosok=sosok, page=page), self.session())
+
+        rows = []
+        last_pages = {0: 0, 1: 0}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for (sosok, page), data in executor.map(fetch, tasks):
+                if data:
+                    rows.extend(data)
+                    last_pages[sosok] = max(last_pages[sosok], page)
+
+        # 다음 주기에는 실제 데이터가 있던 페이지(+1)까지만 요청합니다.
+        for sosok, page in last_pages.items():
+            if page:
+                self.last_pages[sosok] = page
+        return rows
+
+    def fetch_themes(self):
+        """테마 목록 전체 페이지를 동시에 읽습니다."""
+        def fetch(page):
+            try:
+                return get_theme_data(page, self.session())
+            except Exception as e:
+                print(f"  - 테마 {page} 페이지 수집 실패: {e}")
+                return []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return [item for page_data in executor.map(fetch, range(1, THEME_PAGES + 1)) for item in page_data]
+
+    # --- 변화 반영 -----------------------------------------------------------------
+
+    def classify(self, row):
+        """장중 시세 한 행의 선정사유를 판단합니다. (A, B 또는 '')"""
+        change = to_number(row.get('등락률'))
+        price = to_number(row.get('현재가'))
+        volume = to_number(row.get('거래량'))
+        if change is None:
+            return ''
+        if change >= MIN_FLUCTUATION_RATE:
+            return 'A'
+        if change > 0 and price and volume and price * volume >= MIN_TRADING_AMOUNT:
+            return 'B'
+        return ''
+
+    def apply_stocks(self, rows, now):
+        """바뀐 종목만 반영하고, 새로 선정되거나 빠진 종목의 변화 기록을 반환합니다."""
+        deltas = []
+        changed = 0
+        for row in rows:
+            code = row['종목코드']
+            if self.stocks.get(code) == row:
+                continue
+            changed += 1
+            self.stocks[code] = row
+
+            reason = self.classify(row)
+            previous = self.selected.get(code, '')
+            if reason == previous:
+                continue
+            if reason:
+                self.selected[code] = reason
+                deltas.append(self.delta(now, '선정', code, row['종목명'], f"{previous or '-'} -> {reason} (등락률 {row['등락률']})"))
+            else:
+                del self.selected[code]
+                deltas.append(self.delta(now, '선정해제', code, row['종목명'], f"{previous} -> - (등락률 {row['등락률']})"))
+
+        print(f"  - 시세 {len(rows)}개 중 변경 {changed}개 반영")
+        return deltas
+
+    def apply_themes(self, themes, now):
+        """테마를 전일대비 기준으로 순위를 매기고, 순위가 크게 바뀐 테마의 변화 기록을 반환합니다."""
+        scored = [(to_number(item['전일대비']), item['테마명']) for item in themes]
+        scored = sorted((item for item in scored if item[0] is not None), key=lambda x: -x[0])
+        ranks = {name: rank for rank, (_, name) in enumerate(scored, start=1)}
+
+        deltas = []
+        if self.theme_ranks:
+            for name, rank in ranks.items():
+                previous = self.theme_ranks.get(name)
+                if previous is None:
+                    continue
+                entered_top = rank <= TOP_THEME_RANK < previous
+                if entered_top or abs(previous - rank) >= THEME_RANK_MOVE:
+                    deltas.append(self.delta(now, '테마순위', '', name, f"{previous}위 -> {rank}위"))
+
+        self.theme_ranks = ranks
+        return deltas
+
+    @staticmethod
+    def delta(now, kind, code, name, detail):
+        return {'시각': now.strftime('%H:%M:%S'), '구분': kind, '종목코드': code, '대상': name, '내용': detail}
+
+    # --- 실행 ----------------------------------------------------------------------
+
+    def poll_once(self):
+        """한 번의 갱신 주기를 실행하고 변화 기록 리스트를 반환합니다."""
+        now = datetime.datetime.now(KST)
+        started = time.monotonic()
+
+        deltas = self.apply_stocks(self.fetch_market_pages(), now)
+        deltas += self.apply_themes(self.fetch_themes(), now)
+
+        for item in deltas:
+            print(f"[{item['시각']}] {item['구분']} {item['대상']} {item['종목코드']} : {item['내용']}")
+        print(f"  - 갱신 완료 ({time.monotonic() - started:.1f}초, 변화 {len(deltas)}건)")
+
+        if deltas:
+            self.save_deltas(now, deltas)
+        return deltas
+
+    def save_deltas(self, now, deltas):
+        """변화 기록을 당일 폴더의 CSV 파일 끝에 이어서 저장합니다."""
+        tradingday = now.strftime('%Y%m%d')
+        folder_path = file_manager.make_folder(tradingday)
+        save_path = os.path.join(folder_path, f'intraday_deltas_{tradingday}.csv')
+        # 이어 쓰기는 교체가 아니므로, 잠금을 잡아 다른 프로세스의 기록과 섞이지 않게 합니다.
+        with file_manager.artifact_lock(save_path):
+            pd.DataFrame(deltas).to_csv(save_path, mode='a', index=False, encoding='utf-8-sig',
+                                        header=not os.path.exists(save_path))
+
+    def run(self, interval=180, max_cycles=None):
+        """
+        장중에는 interval초마다 갱신하고, 장이 끝나면 다음 장 시작까지 기다립니다.
+
+        Args:
+            interval (int): 갱신 간격 (초)
+            max_cycles (int, optional): 최대 갱신 횟수 (없으면 계속 실행)
+        """
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            if not is_market_open():
+                wait = seconds_until_open()
+                print(f"장 마감 상태입니다. 다음 장 시작까지 {wait / 3600:.1f}시간 대기합니다.")
+                time.sleep(wait)
+                continue
+
+            started = time.monotonic()
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"갱신 중 오류 발생: {e}")
+            cycles += 1
+
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="장중 시세/테마 폴링 데몬")
+    parser.add_argument('--interval', type=int, default=180, help="갱신 간격 (초, 기본 180)")
+    parser.add_argument('--workers', type=int, default=8, help="동시 요청 스레드 수 (기본 8)")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("장중 폴링을 시작합니다. (종료: Ctrl+C)")
+    print("=" * 50)
+    IntradayPoller(workers=args.workers).run(interval=args.interval)
@@ -0,0 +1,215 @@
+import os
+
+from component import raw_archive
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 네이버 모바일 JSON API 수집 백엔드]
+# 기존 수집기(getStockDtl, getNaverTheme, getNaverThemDtl)는 수십 KB짜리 PC용 HTML 페이지를 받아
+# BeautifulSoup으로 표를 찾아 읽습니다. 같은 정보를 네이버 모바일 증권이 쓰는 JSON API로 받으면
+# 응답 크기가 훨씬 작고, HTML 파싱 없이 json 한 번으로 끝납니다.
+#
+# 이 모듈의 함수들은 기존 HTML 수집 함수와 '같은 컬럼, 같은 표기'의 행을 만들어 돌려주므로
+# 뒤의 분석 단계는 어느 백엔드로 수집했는지 몰라도 됩니다.
+#
+# 백엔드는 환경변수로 고릅니다.
+#   NAVER_BACKEND=json python3 main_stock.py stockDtl naverTheme naverThemeDtl
+#   (기본값 html: 기존 방식 그대로)
+# 테스트나 오프라인 개발 때는 NAVER_API_BASE로 로컬 대역(stand-in) 서버 주소를 지정할 수 있습니다.
+#   NAVER_API_BASE=http://127.0.0.1:8000 NAVER_BACKEND=json python3 main_stock.py stockDtl
+#
+# API 응답의 필드 이름은 아래 *_FIELDS 상수에 모아 두었습니다. (API가 바뀌면 여기만 고치면 됨)
+# -----------------------------------------------------------------------------------------
+
+BACKEND_HTML, BACKEND_JSON = 'html', 'json'
+
+DEFAULT_API_BASE = 'https://m.stock.naver.com'
+THEME_DETAIL_URL = 'https://finance.naver.com/sise/sise_group_detail.naver?type=theme&no={no}'
+
+# HTML 페이지와 같은 단위로 나눠 받아야 호출하는 쪽의 페이지 반복문이 그대로 동작합니다.
+MARKET_PAGE_SIZE = 50
+THEME_PAGE_SIZE = 40
+THEME_DETAIL_PAGE_SIZE = 100
+
+MARKET_TYPES = {0: ('KOSPI', '코스피'), 1: ('KOSDAQ', '코스닥')}
+
+# 전일 대비 부호 코드 (1: 상한, 2: 상승, 3: 보합, 4: 하한, 5: 하락)
+RISING_CODES = {'1', '2'}
+FALLING_CODES = {'4', '5'}
+
+STOCK_FIELDS = {
+    'code': 'itemCode',
+    'name': 'stockName',
+    'price': 'closePrice',
+    'diff': 'compareToPreviousClosePrice',
+    'direction': 'compareToPreviousPrice',
+    'ratio': 'fluctuationsRatio',
+    'volume': 'accumulatedTradingVolume',
+    'per': 'per',
+    'reason': 'themeReason',
+}
+
+THEME_FIELDS = {
+    'no': 'no',
+    'name': 'name',
+    'ratio': 'changeRate',
+    'rise': 'riseCount',
+    'steady': 'steadyCount',
+    'fall': 'fallCount',
+}
+
+
+def get_backend():
+    """현재 수집 백엔드를 반환합니다. (환경변수 NAVER_BACKEND, 기본 html)"""
+    backend = os.environ.get('NAVER_BACKEND', BACKEND_HTML).lower()
+    return backend if backend == BACKEND_JSON else BACKEND_HTML
+
+
+def api_url(path):
+    return os.environ.get('NAVER_API_BASE', DEFAULT_API_BASE).rstrip('/') + path
+
+
+def get_json(path, params, session=None):
+    """API를 호출해 JSON을 반환합니다. (raw_archive를 거치므로 기록/재생 모드도 그대로 동작)"""
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148',
+        'Accept': 'application/json',
+    }
+    response = raw_archive.get(raw_archive.SOURCE_NAVER_API, api_url(path), session=session,
+                               params=params, headers=headers, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def sign_of(item):
+    """전일 대비 방향을 '+', '-', '' 중 하나로 반환합니다."""
+    direction = item.get(STOCK_FIELDS['direction']) or {}
+    code = str(direction.get('code', '')) if isinstance(direction, dict) else str(direction)
+    if code in RISING_CODES:
+        return '+'
+    if code in FALLING_CODES:
+        return '-'
+    return ''
+
+
+def unsigned(value):
+    """'-1,500' / '+0.70' 같은 값에서 부호를 떼어낸 문자열을 반환합니다."""
+    return str(value if value is not None else '0').strip().lstrip('+-')
+
+
+def get_market_cap_info(gubun, page, session=None):
+    """
+    시가총액 순위 한 페이지를 JSON API로 받아 getStockDtl.get_market_cap_info와 같은 행으로 반환합니다.
+
+    Args:
+        gubun (int): 0(=코스피), 1(=코스닥)
+        page (int): 페이지 번호 (한 페이지 50종목, HTML 페이지와 같음)
+        session (requests.Session, optional): 재사용할 세션
+    Returns:
+        list: 종목 정보 딕셔너리의 리스트 (마지막 페이지를 넘으면 빈 리스트)
+    """
+    market, gubunNm = MARKET_TYPES[gubun]
+    data = get_json(f'/api/stocks/marketValue/{market}', {'page': page, 'pageSize': MARKET_PAGE_SIZE}, session)
+
+    return [stock_row(item, gubunNm) for item in data.get('stocks', [])]
+
+
+def stock_row(item, gubunNm):
+    """
+    API의 종목 항목 하나를 시가총액 페이지(stock_dtl_list)와 같은 행으로 바꿉니다.
+    응답에 없는 시세 값은 None으로 둡니다. (관심 종목 갱신 시 DataFrame.update가 None은 건너뛰어 기존 값을 유지)
+    """
+    sign = sign_of(item)
+    diff = item.get(STOCK_FIELDS['diff'])
+    ratio = item.get(STOCK_FIELDS['ratio'])
+    if diff is not None:
+        diff = sign + unsigned(diff) if sign else unsigned(diff)
+    return {
+        '종목코드': item[STOCK_FIELDS['code']],
+        '종목명': item[STOCK_FIELDS['name']],
+        '구분': gubunNm,
+        '현재가': item.get(STOCK_FIELDS['price']),
+        '전일비': diff,
+        '등락률': f"{sign}{unsigned(ratio)}%" if ratio is not None else None,
+        '거래량': item.get(STOCK_FIELDS['volume']),
+        # 목록 API에 PER이 없으면 HTML 페이지와 같은 'N/A'로 표기합니다.
+        'PER': item.get(STOCK_FIELDS['per']) or 'N/A',
+    }
+
+
+def get_stock_basic(code, gubunNm='', session=None):
+    """
+    종목 하나의 현재 시세를 받아 시가총액 페이지(stock_dtl_list)와 같은 행으로 반환합니다.
+    (관심 종목만 갱신할 때 시가총액 페이지 전체를 받지 않기 위해 사용합니다)
+
+    Args:
+        code (str): 종목코드 (6자리)
+        gubunNm (str): '코스피' 또는 '코스닥' (기존 행의 값을 그대로 넘김)
+        session (requests.Session, optional): 재사용할 세션
+    Returns:
+        dict: 종목 정보 딕셔너리
+    """
+    item = get_json(f'/api/stock/{code}/basic', None, session)
+    item.setdefault(STOCK_FIELDS['code'], code)
+    return stock_row(item, gubunNm)
+
+
+def get_theme_data(page_num, session=None):
+    """
+    테마 목록 한 페이지를 JSON API로 받아 getNaverTheme.get_theme_data와 같은 행으로 반환합니다.
+
+    Args:
+        page_num (int): 페이지 번호
+        session (requests.Session, optional): 재사용할 세션
+    Returns:
+        list: 테마 정보(딕셔너리)가 담긴 리스트
+    """
+    data = get_json('/api/stocks/theme', {'page': page_num, 'pageSize': THEME_PAGE_SIZE}, session)
+
+    themes_data = []
+    for group in data.get('groups', []):
+        ratio = float(group.get(THEME_FIELDS['ratio']) or 0)
+        themes_data.append({
+            '테마명': group[THEME_FIELDS['name']],
+            '전일대비': f'{ratio:+.2f}%' if ratio else '0.00%',
+            # 다음 단계(테마 상세)가 'no=' 뒤의 번호를 읽으므로 HTML 수집과 같은 주소를 넣습니다.
+            '상세url': THEME_DETAIL_URL.format(no=group[THEME_FIELDS['no']]),
+            '상승': str(group.get(THEME_FIELDS['rise'], '')),
+            '보합': str(group.get(THEME_FIELDS['steady'], '')),
+            '하락': str(group.get(THEME_FIELDS['fall'], '')),
+        })
+    return themes_data
+
+
+def get_theme_detail(themeNm, themeRate, theme_no, session=None):
+    """
+    테마 구성 종목을 JSON API로 받아 getNaverThemDtl.get_theme_detail과 같은 행으로 반환합니다.
+
+    Args:
+        themeNm (str): 테마 이름
+        themeRate (str): 테마 평균 등락률
+        theme_no (str): 테마 고유 번호
+        session (requests.Session, optional): 재사용할 세션
+    Returns:
+        list: 해당 테마에 속한 종목들의 상세 정보 리스트
+    """
+    stocks_data = []
+    page = 1
+    while True:
+        data = get_json(f'/api/stocks/theme/{theme_no}', {'page': page, 'pageSize': THEME_DETAIL_PAGE_SIZE}, session)
+        stocks = data.get('stocks', [])
+        for item in stocks:
+            sign = sign_of(item)
+            diff = unsigned(item.get(STOCK_FIELDS['diff']))
+            stocks_data.append({
+                '테마': themeNm,
+                '테마등락률': themeRate,
+                '종목코드': item[STOCK_FIELDS['code']],
+                '종목명': item[STOCK_FIELDS['name']],
+                '전일비': sign + diff if sign else diff,
+                '등락률': sign + unsigned(item.get(STOCK_FIELDS['ratio'])),
+                '거래량': str(item.get(STOCK_FIELDS['volume'], '')).replace(',', ''),
+                '편입사유': (item.get(STOCK_FIELDS['reason']) or '').strip(),
+            })
+        if len(stocks) < THEME_DETAIL_PAGE_SIZE:
+            return stocks_data
+        page += 1
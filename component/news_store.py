@@ -0,0 +1,138 @@
+import hashlib
+import os
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+import pandas as pd
+
+from common import file_manager
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 이미 수집한 기사 건너뛰기 (증분 수집)]
+# 뉴스는 하루에도 여러 번 수집하지만, 대부분의 기사는 이전 실행(또는 전날)에 이미 모은 것입니다.
+# 매번 전부 다시 가공/저장하면 새 기사가 몇 건뿐이어도 전체 작업을 반복하게 됩니다.
+#
+# - SeenSet  : 수집한 기사 URL을 64비트 해시로 바꿔 정렬된 배열로 보관합니다. (기사 하나에 8바이트)
+#              'news_store/seen_<이름>.npy' 에 저장되며, 새 URL인지는 이진 탐색으로 확인합니다.
+#              64비트 해시끼리 우연히 겹칠 확률은 기사 수백만 건에서도 사실상 0 입니다.
+# - append_news : 새 기사만 월별 누적 파일 'news_store/<이름>_YYYYMM.csv' 끝에 이어 씁니다.
+# - load_news   : 누적 파일에서 특정 날짜에 수집된 기사만 다시 읽습니다. (당일 엑셀 생성용)
+#
+# URL은 utm_* 같은 추적용 파라미터와 '#' 뒤를 지운 뒤 해시하므로,
+# 같은 기사가 조금 다른 주소로 다시 나와도 한 번만 수집됩니다.
+# -----------------------------------------------------------------------------------------
+
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')
+
+
+def get_news_store_path():
+    """누적 뉴스 저장 폴더 경로를 반환하고, 필요하면 생성합니다."""
+    return file_manager.make_folder('news_store')
+
+
+def normalize_url(url):
+    """추적용 쿼리 파라미터와 '#' 뒤를 제거한 URL을 반환합니다."""
+    parts = urlsplit(str(url).strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith(TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ''))
+
+
+def url_hashes(keys):
+    """키(정리된 URL 등) 리스트를 64비트 정수 해시 배열로 변환합니다."""
+    return np.fromiter((int.from_bytes(hashlib.blake2b(str(k).encode('utf-8'), digest_size=8).digest(), 'little')
+                        for k in keys), dtype=np.uint64, count=len(keys))
+
+
+class SeenSet:
+    """이미 수집한 기사 키의 64비트 해시를 정렬된 배열로 보관하는 영구 집합입니다."""
+
+    def __init__(self, name, store_path=None):
+        self.store_path = store_path or get_news_store_path()
+        self.path = os.path.join(self.store_path, f'seen_{name}.npy')
+        self.hashes = np.load(self.path) if os.path.exists(self.path) else np.zeros(0, dtype=np.uint64)
+        self.pending = []
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contains(self, hashes):
+        """해시 배열 각각이 이미 집합에 있는지 bool 배열로 반환합니다. (이진 탐색)"""
+        if len(self.hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        pos = np.searchsorted(self.hashes, hashes)
+        return self.hashes[np.minimum(pos, len(self.hashes) - 1)] == hashes
+
+    def filter_new(self, records, key):
+        """
+        처음 보는 레코드만 골라내고, 골라낸 레코드를 집합에 추가합니다. (save() 전까지는 메모리에만 반영)
+
+        Args:
+            records (list): 기사 딕셔너리 리스트
+            key (callable): 레코드 -> 키 문자열 (예: lambda r: normalize_url(r['url']))
+        Returns:
+            list: 새 기사 레코드 리스트 (입력 순서 유지, 같은 실행 안의 중복도 제거)
+        """
+        if not records:
+            return []
+        hashes = url_hashes([key(r) for r in records])
+        _, first = np.unique(hashes, return_index=True)
+        is_first = np.zeros(len(hashes), dtype=bool)
+        is_first[first] = True
+
+        is_new = is_first & ~self.contains(hashes)
+        self.pending.append(hashes[is_new])
+        return [r for r, new in zip(records, is_new) if new]
+
+    def save(self):
+        """추가된 해시를 합쳐 정렬한 뒤 파일에 저장합니다."""
+        if not self.pending:
+            return
+        with file_manager.artifact_lock(self.path):
+            # 다른 프로세스가 그사이 저장했을 수 있으므로 파일을 다시 읽어 합칩니다.
+            stored = np.load(self.path) if os.path.exists(self.path) else np.zeros(0, dtype=np.uint64)
+            self.hashes = np.union1d(stored, np.concatenate(self.pending))
+            tmp_path = f'{self.path}.{os.getpid()}.tmp.npy'
+            np.save(tmp_path, self.hashes)
+            os.replace(tmp_path, self.path)
+        self.pending = []
+
+
+def store_file(name, day, store_path=None):
+    """누적 뉴스 파일 경로 (월별: <이름>_YYYYMM.csv)"""
+    return os.path.join(store_path or get_news_store_path(), f'{name}_{day[:6]}.csv')
+
+
+def append_news(name, records, day, store_path=None):
+    """
+    새 기사를 월별 누적 파일 끝에 이어서 저장합니다. ('수집일' 컬럼 추가)
+
+    Args:
+        name (str): 저장소 이름 (예: 'naver_news')
+        records (list): 새 기사 딕셔너리 리스트
+        day (str): 수집일 (YYYYMMDD)
+    """
+    if not records:
+        return
+    save_path = store_file(name, day, store_path)
+    df = pd.DataFrame(records)
+    df.insert(0, '수집일', day)
+    # 이어 쓰기는 교체가 아니므로, 잠금을 잡아 다른 프로세스의 기록과 섞이지 않게 합니다.
+    with file_manager.artifact_lock(save_path):
+        is_new_file = not os.path.exists(save_path)
+        df.to_csv(save_path, mode='a', index=False, header=is_new_file,
+                  encoding='utf-8-sig' if is_new_file else 'utf-8')
+
+
+def load_news(name, day, store_path=None, dtype=None):
+    """
+    누적 파일에서 해당 날짜에 수집된 기사를 읽습니다.
+
+    Returns:
+        pd.DataFrame: 수집일 컬럼을 제외한 기사 목록 (없으면 빈 DataFrame)
+    """
+    save_path = store_file(name, day, store_path)
+    if not os.path.exists(save_path):
+        return pd.DataFrame()
+    df = pd.read_csv(save_path, dtype={'수집일': str, **(dtype or {})}, encoding='utf-8-sig')
+    return df[df['수집일'] == day].drop(columns='수집일').reset_index(drop=True)
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from common import file_manager, list_previous_trading_days
+from component.artifact_loader import load_artifacts
+from component.stockanalysis.theme_index import load_theme_index, normalize_codes
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 최신 거래일 조회 서버 (읽기 전용, 로컬 HTTP/JSON)]
+# 종목 하나의 테마나 오늘의 A/B 종목을 보려고 8개 시트짜리 'total_YYYYMMDD.xlsx'를 엑셀로 여는 데
+# 몇 초씩 걸립니다. 이 서버는 가장 최근에 완성된 거래일의 데이터를 메모리에 올려 두고
+# 미리 만든 딕셔너리(색인)로 바로 찾아 JSON으로 돌려줍니다. (외부 서비스 필요 없음)
+#
+#   GET /health                 현재 거래일, 불러온 시각, 건수
+#   GET /stock/005930           종목 시세 + 소속 테마 + 선정사유
+#   GET /theme/반도체            테마 구성 종목 (+ 테마 강도 지표가 있으면 함께)
+#   GET /selected?reason=A      선정 종목 목록 (reason 없으면 전체)
+#   GET /search?q=삼성           종목명/테마명 검색
+#
+# 'total_YYYYMMDD.xlsx'가 manifest에 완성으로 기록된 가장 최근 거래일을 읽으며,
+# 주기적으로(기본 30초) 확인해서 새 거래일이 완성되거나, 같은 거래일의 종합 파일이 다시 만들어지면
+# (fileSum 재실행, watchlist --rebuild 등. manifest의 체크섬으로 판단) 백그라운드에서 다시 읽어 교체합니다.
+#
+# 실행 예시:
+#   python3 -m component.query_server --port 8765
+#   curl http://127.0.0.1:8765/stock/005930
+# -----------------------------------------------------------------------------------------
+
+DEFAULT_PORT = 8765
+RELOAD_INTERVAL = 30
+SEARCH_LIMIT = 50
+
+KRX_COLUMNS = ['종목코드', '종목명', '시장구분', '종가', '대비', '등락률', '거래량', '거래대금', '시가총액']
+
+
+def find_latest_complete_day(lookback=10):
+    """종합 파일(total_YYYYMMDD.xlsx)이 완성된 가장 최근 거래일을 반환합니다. (없으면 None)"""
+    base_path = file_manager.get_current_path()
+    for day in list_previous_trading_days('99999999', lookback):
+        if file_manager.is_artifact_complete(os.path.join(base_path, day, f'total_{day}.xlsx')):
+            return day
+    return None
+
+
+def artifact_version(day):
+    """거래일 종합 파일의 manifest 체크섬 (같은 거래일에 다시 만들어졌는지 판단하는 데 사용)"""
+    folder_path = os.path.join(file_manager.get_current_path(), day)
+    entry = file_manager.read_manifest(folder_path).get(f'total_{day}.xlsx') or {}
+    return entry.get('sha256')
+
+
+def to_records(df):
+    """DataFrame을 JSON으로 바로 보낼 수 있는 딕셔너리 리스트로 바꿉니다. (NaN -> None)"""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+class Snapshot:
+    """한 거래일의 데이터와 조회용 색인을 메모리에 보관합니다. (만든 뒤에는 읽기만 합니다)"""
+
+    def __init__(self, day, version=None):
+        self.day = day
+        self.version = version
+        self.loaded_at = time.strftime('%Y-%m-%d %H:%M:%S')
+        folder_path = os.path.join(file_manager.get_current_path(), day)
+
+        code_dtype = {'종목코드': str}
+        frames = load_artifacts({
+            'krx': {'path': os.path.join(folder_path, f'krx_stock_list_{day}.csv'), 'usecols': KRX_COLUMNS, 'dtype': code_dtype},
+            'selected': {'path': os.path.join(folder_path, f'00_stock_analysis_pivoted_{day}.xlsx'),
+                         'sheet_name': '종목분석', 'dtype': code_dtype},
+            'theme_analytics': {'path': os.path.join(folder_path, f'theme_analytics_{day}.csv'), 'optional': True},
+        })
+        theme_index = load_theme_index(day, folder_path)
+
+        df_krx = frames['krx']
+        df_krx['종목코드'] = normalize_codes(df_krx['종목코드'])
+        df_selected = frames['selected']
+        df_selected['종목코드'] = normalize_codes(df_selected['종목코드'])
+        reasons = dict(zip(df_selected['종목코드'], df_selected['선정사유']))
+
+        # 종목코드 -> 종목 정보 (테마와 선정사유까지 미리 붙여 둡니다)
+        self.stocks = {}
+        for record in to_records(df_krx):
+            code = record['종목코드']
+            record['테마'] = theme_index.themes_of(code) if theme_index is not None else []
+            record['선정사유'] = reasons.get(code) or ''
+            self.stocks[code] = record
+
+        # 선정사유 -> 선정 종목 목록 (분석 파일의 정렬 순서 유지)
+        self.selected = {}
+        for record in to_records(df_selected[[c for c in df_selected.columns if not c.startswith('테마_')]]):
+            self.selected.setdefault(record['선정사유'], []).append(record)
+
+        # 테마명 -> 구성 종목코드 목록, 테마 지표
+        self.themes = {}
+        if theme_index is not None:
+            for theme in theme_index.themes.tolist():
+                self.themes[theme] = theme_index.stocks_of(theme)
+        self.theme_metrics = {}
+        if frames['theme_analytics'] is not None:
+            self.theme_metrics = {record['테마']: record for record in to_records(frames['theme_analytics'])}
+
+        # 검색용 (이름, 종류, 키) 목록
+        self.names = [(record['종목명'], 'stock', code) for code, record in self.stocks.items()]
+        self.names += [(theme, 'theme', theme) for theme in self.themes]
+
+    def summary(self):
+        return {'day': self.day, 'loaded_at': self.loaded_at, 'stocks': len(self.stocks),
+                'themes': len(self.themes), 'selected': sum(len(v) for v in self.selected.values())}
+
+    def stock(self, code):
+        return self.stocks.get(code.zfill(6))
+
+    def theme(self, name):
+        codes = self.themes.get(name)
+        if codes is None:
+            return None
+        members = [self.stocks.get(code, {'종목코드': code}) for code in codes]
+        return {'테마': name, '지표': self.theme_metrics.get(name), '종목': members}
+
+    def selected_list(self, reason=None):
+        if reason:
+            return self.selected.get(reason.upper(), [])
+        return [record for key in sorted(self.selected) for record in self.selected[key]]
+
+    def search(self, keyword, limit=SEARCH_LIMIT):
+        keyword = keyword.strip().lower()
+        if not keyword:
+            return []
+        hits = []
+        for name, kind, key in self.names:
+            if keyword in str(name).lower():
+                hits.append({'종류': kind, '이름': name, '키': key})
+                if len(hits) >= limit:
+                    break
+        return hits
+
+
+class QueryServer(ThreadingHTTPServer):
+    """현재 Snapshot을 들고 있는 HTTP 서버입니다. 새 거래일이 완성되면 Snapshot을 통째로 교체합니다."""
+
+    daemon_threads = True
+
+    def __init__(self, address, reload_interval=RELOAD_INTERVAL):
+        super().__init__(address, QueryHandler)
+        self.snapshot = None
+        self.reload_interval = reload_interval
+        self.reload()
+
+    def reload(self):
+        """가장 최근 완성된 거래일이 바뀌었거나, 같은 거래일의 종합 파일이 다시 만들어졌으면 새로 읽습니다."""
+        day = find_latest_complete_day()
+        if day is None:
+            return
+        version = artifact_version(day)
+        if self.snapshot is not None and (self.snapshot.day, self.snapshot.version) == (day, version):
+            return
+        try:
+            started = time.monotonic()
+            snapshot = Snapshot(day, version)
+            # 참조 하나만 바꾸므로, 읽고 있던 요청은 이전 Snapshot으로 끝까지 처리됩니다.
+            self.snapshot = snapshot
+            print(f"조회 서버: {day} 데이터 로드 완료 ({time.monotonic() - started:.1f}초) {snapshot.summary()}")
+        except Exception as e:
+            print(f"조회 서버: {day} 데이터 로드 실패: {e}")
+
+    def watch(self):
+        """백그라운드에서 주기적으로 reload()를 호출합니다."""
+        def loop():
+            while True:
+                time.sleep(self.reload_interval)
+                self.reload()
+        threading.Thread(target=loop, daemon=True).start()
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET 요청을 Snapshot 조회로 연결합니다."""
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 로그를 찍지 않습니다.
+
+    def send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        snapshot = self.server.snapshot
+        if snapshot is None:
+            self.send_json(503, {'error': '완성된 거래일 데이터가 없습니다.'})
+            return
+
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        segments = [unquote(s) for s in parts.path.strip('/').split('/', 1)]
+        route, arg = segments[0], (segments[1] if len(segments) > 1 else '')
+
+        if route == 'health':
+            result = snapshot.summary()
+        elif route == 'stock':
+            result = snapshot.stock(arg)
+        elif route == 'theme':
+            result = snapshot.theme(arg)
+        elif route == 'selected':
+            result = snapshot.selected_list(query.get('reason'))
+        elif route == 'search':
+            result = snapshot.search(query.get('q', ''))
+        else:
+            self.send_json(404, {'error': f'알 수 없는 경로: {parts.path}'})
+            return
+
+        if result is None:
+            self.send_json(404, {'error': f'찾을 수 없습니다: {arg}', 'day': snapshot.day})
+        else:
+            self.send_json(200, {'day': snapshot.day, 'result': result})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="최신 거래일 조회 서버 (읽기 전용)")
+    parser.add_argument('--host', default='127.0.0.1', help="바인드 주소 (기본 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"포트 (기본 {DEFAULT_PORT})")
+    parser.add_argument('--reload-interval', type=float, default=RELOAD_INTERVAL, help="새 거래일 확인 주기(초)")
+    args = parser.parse_args()
+
+    server = QueryServer((args.host, args.port), args.reload_interval)
+    server.watch()
+    print(f"조회 서버 실행 중: http://{args.host}:{args.port}/health")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,254 @@
+import argparse
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from common import file_manager, get_last_trading_day_str
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 원본 응답 기록/재생 (record / replay)]
+# 크롤러가 받은 웹 페이지 원본은 저장하지 않고 가공된 CSV만 남기기 때문에,
+# 파싱/선정 로직을 고친 뒤 과거 날짜에 다시 적용해 볼 방법이 없었습니다.
+#
+# 이 모듈은 모든 크롤러의 HTTP 요청이 거쳐 가는 통로입니다.
+# - off    : (기본값) 그냥 요청만 보냅니다.
+# - record : 요청을 보내고, 받은 응답 원본을 '거래일 폴더/raw/<출처>.jsonl.gz'에 덧붙여 저장합니다.
+# - replay : 네트워크를 전혀 사용하지 않고, 보관된 응답을 그대로 돌려줍니다.
+#
+# 모드는 환경변수 RAW_ARCHIVE(record/replay)로 정합니다. 예:
+#   RAW_ARCHIVE=record python3 main_stock.py
+#   python3 -m component.raw_archive replay 20250102 20250131   # 한 달 재처리 (네트워크 없음, 뉴스 수집 제외)
+#
+# 압축은 zstandard 패키지가 설치되어 있으면 zstd(.zst), 없으면 gzip(.gz)을 사용합니다.
+# 파일 하나에 응답 하나씩 압축 블록(frame)을 이어 붙이므로, 여러 스레드가 동시에 기록해도 됩니다.
+# -----------------------------------------------------------------------------------------
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MODE_OFF, MODE_RECORD, MODE_REPLAY = 'off', 'record', 'replay'
+
+# 크롤러별 출처 이름 (보관 파일 이름으로 사용)
+SOURCE_NAVER_THEME = 'naver_theme'
+SOURCE_NAVER_THEME_DTL = 'naver_theme_dtl'
+SOURCE_NAVER_MARKET_SUM = 'naver_market_sum'
+SOURCE_NAVER_NEWS = 'naver_news'
+SOURCE_GOOGLE_NEWS_RSS = 'google_news_rss'
+SOURCE_KRX = 'krx'
+SOURCE_NAVER_API = 'naver_api'
+
+_write_lock = threading.Lock()
+_replay_lock = threading.Lock()
+_replay_index = {}   # (거래일, 출처) -> {요청 키: 기록}
+
+
+class ArchiveMissError(requests.RequestException):
+    """replay 모드에서 보관된 응답이 없을 때 발생합니다. (네트워크 오류처럼 처리됩니다)"""
+
+
+def get_mode():
+    """현재 기록/재생 모드를 반환합니다. (환경변수 RAW_ARCHIVE)"""
+    mode = os.environ.get('RAW_ARCHIVE', MODE_OFF).lower()
+    return mode if mode in (MODE_RECORD, MODE_REPLAY) else MODE_OFF
+
+
+def set_mode(mode):
+    """기록/재생 모드를 변경합니다. (off / record / replay)"""
+    os.environ['RAW_ARCHIVE'] = mode
+
+
+def polite_sleep(seconds):
+    """서버 부하 방지용 대기. replay 모드에서는 서버에 요청하지 않으므로 기다리지 않습니다."""
+    if get_mode() != MODE_REPLAY:
+        time.sleep(seconds)
+
+
+def get_archive_folder(day):
+    return os.path.join(file_manager.get_current_path(), day, 'raw')
+
+
+def archive_path(day, source, compressed_ext=None):
+    ext = compressed_ext or ('zst' if zstandard else 'gz')
+    return os.path.join(get_archive_folder(day), f'{source}.jsonl.{ext}')
+
+
+def compress(data):
+    return zstandard.ZstdCompressor().compress(data) if zstandard else gzip.compress(data)
+
+
+def decompress_file(path):
+    """압축 블록이 여러 개 이어 붙은 파일 전체를 풀어 반환합니다."""
+    with open(path, 'rb') as f:
+        if path.endswith('.zst'):
+            if zstandard is None:
+                raise ImportError(f"zstd 보관 파일을 읽으려면 zstandard 패키지가 필요합니다. ({path})")
+            return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True).read()
+        # gzip은 이어 붙인 블록(member)을 자동으로 모두 풉니다.
+        return gzip.decompress(f.read())
+
+
+def request_key(method, url, params=None, data=None):
+    """같은 요청인지 판단하는 키 (메서드, URL, 파라미터, 본문)"""
+    def text(value):
+        return value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+    return json.dumps([method.upper(), url, params, data], sort_keys=True, ensure_ascii=False, default=text)
+
+
+def record(day, source, key, response):
+    """응답 하나를 보관 파일 끝에 덧붙입니다."""
+    entry = {
+        'key': key,
+        'url': response.url,
+        'status': response.status_code,
+        'encoding': response.encoding,
+        'headers': {k: response.headers[k] for k in ('Content-Type', 'ETag', 'Last-Modified') if k in response.headers},
+        'body': base64.b64encode(response.content).decode('ascii'),
+    }
+    block = compress((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    path = archive_path(day, source)
+    with _write_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(block)
+
+
+def load_replay_index(day, source):
+    """거래일/출처의 보관 파일을 한 번만 읽어 요청 키 -> 기록 딕셔너리로 만듭니다."""
+    with _replay_lock:
+        if (day, source) in _replay_index:
+            return _replay_index[(day, source)]
+
+        index = {}
+        for ext in ('zst', 'gz'):
+            path = archive_path(day, source, ext)
+            if not os.path.exists(path):
+                continue
+            for line in decompress_file(path).splitlines():
+                if line:
+                    entry = json.loads(line)
+                    index[entry['key']] = entry  # 같은 요청이 여러 번 있으면 마지막 응답 사용
+        _replay_index[(day, source)] = index
+        return index
+
+
+def build_response(entry):
+    """보관된 기록을 requests.Response 객체로 되살립니다. (.text, .content, .raise_for_status 사용 가능)"""
+    response = requests.Response()
+    response._content = base64.b64decode(entry['body'])
+    response.status_code = entry['status']
+    response.url = entry['url']
+    response.encoding = entry['encoding']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    return response
+
+
+# 세션을 넘기지 않은 요청이 함께 쓸 세션. 상주 작업 프로세스(component.warm_worker)가 등록하면
+# 실행이 바뀌어도 같은 연결(keep-alive)을 계속 재사용합니다. 없으면 요청마다 새 연결을 맺습니다.
+_shared_session = None
+
+
+def set_shared_session(session):
+    """세션을 지정하지 않은 요청이 쓸 공용 세션을 등록합니다. (None이면 해제)"""
+    global _shared_session
+    _shared_session = session
+
+
+def fetch(source, method, url, session=None, day=None, **kwargs):
+    """
+    크롤러의 HTTP 요청 통로. 모드에 따라 요청/기록/재생을 수행합니다.
+
+    Args:
+        source (str): 출처 이름 (보관 파일 이름)
+        method (str): 'GET' 또는 'POST'
+        url (str): 요청 URL
+        session (requests.Session, optional): 재사용할 세션
+        day (str, optional): 보관할 거래일자 (YYYYMMDD, 없으면 최근 거래일)
+        **kwargs: requests에 그대로 전달할 인자 (params, data, headers, timeout 등)
+    Returns:
+        requests.Response: 응답 객체
+    Raises:
+        ArchiveMissError: replay 모드에서 보관된 응답이 없는 경우
+    """
+    mode = get_mode()
+    if mode == MODE_OFF:
+        return (session or _shared_session or requests).request(method, url, **kwargs)
+
+    day = day or get_last_trading_day_str()
+    key = request_key(method, url, kwargs.get('params'), kwargs.get('data'))
+
+    if mode == MODE_REPLAY:
+        entry = load_replay_index(day, source).get(key)
+        if entry is None:
+            raise ArchiveMissError(f"보관된 응답이 없습니다: {day}/{source} {method} {url}")
+        return build_response(entry)
+
+    response = (session or _shared_session or requests).request(method, url, **kwargs)
+    record(day, source, key, response)
+    return response
+
+
+def get(source, url, session=None, day=None, **kwargs):
+    return fetch(source, 'GET', url, session=session, day=day, **kwargs)
+
+
+def post(source, url, session=None, day=None, **kwargs):
+    return fetch(source, 'POST', url, session=session, day=day, **kwargs)
+
+
+def replay_days(start, end):
+    """
+    보관된 원본 응답만으로 [start, end] 기간의 크롤링 파싱/분석 단계를 다시 실행합니다.
+    (네트워크를 사용하지 않으며, 각 거래일 폴더의 산출물을 새로 만듭니다.)
+
+    뉴스 수집(getNaverNewsList, getStockNews)은 재처리하지 않습니다. 두 수집기는 거래일이 아닌
+    오늘 날짜 폴더에 저장하고, 누적 저장소(news_store)의 '이미 모은 기사' 목록으로 걸러내므로
+    과거 날짜를 재생해도 그날의 뉴스 파일을 다시 만들 수 없기 때문입니다.
+    (naver_news, google_news_rss 원본은 보관만 되며 직접 읽어 분석할 수 있습니다)
+    """
+    import main_stock
+    from trading_calendar import trading_days_between
+
+    stages = ['naverTheme', 'naverThemeDtl', 'stockDtl', 'daily_analysis_stock', 'themeAnalytics']
+
+    # 중간에 예외가 나도 호출한 쪽의 환경(모드, 거래일 지정)이 바뀐 채로 남지 않도록 되돌립니다.
+    saved_env = {key: os.environ.get(key) for key in ('RAW_ARCHIVE', 'TRADING_DAY')}
+    set_mode(MODE_REPLAY)
+    try:
+        for day in trading_days_between(start, end):
+            if not os.path.isdir(get_archive_folder(day)):
+                print(f"{day}: 보관된 원본 응답이 없어 건너뜁니다.")
+                continue
+
+            print("=" * 50)
+            print(f"{day} 재처리를 시작합니다.")
+            print("=" * 50)
+            # 각 단계가 최근 거래일 대신 이 날짜를 사용하도록 지정합니다.
+            os.environ['TRADING_DAY'] = day
+            started = time.monotonic()
+            main_stock.run_stages(stages)
+            print(f"{day} 재처리 완료 ({time.monotonic() - started:.1f}초)")
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="원본 응답 보관소 재생")
+    parser.add_argument('command', choices=['replay'], help="replay: 보관된 응답으로 기간 재처리")
+    parser.add_argument('start', help="시작 거래일 (YYYYMMDD)")
+    parser.add_argument('end', nargs='?', help="종료 거래일 (YYYYMMDD, 없으면 시작일과 동일)")
+    args = parser.parse_args()
+
+    replay_days(args.start, args.end or args.start)
@@ -0,0 +1,322 @@
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import file_manager, get_last_trading_day_str
+from file_manager import fsync_dir
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 메모리 맵(memmap) 기반 일별 시세 큐브]
+# 여러 날짜에 걸친 분석(N일 수익률, 20일 평균 거래량 대비, 신고가 등)을 할 때마다
+# 날짜별 CSV를 하나씩 읽어 이어 붙이는 대신, 모든 거래일의 KRX 시세를
+# [날짜 × 종목 × 항목] 모양의 float32 3차원 배열 하나로 디스크에 저장합니다.
+#
+# - history/cube.f32       : 실제 숫자 데이터 (np.memmap 으로 필요한 부분만 메모리에 올림)
+# - history/cube_meta.json : 날짜 축(dates), 종목 축(symbols), 항목(fields), 데이터 파일 세대(generation) 정보
+#
+# 날짜가 가장 바깥 축이므로 새 거래일은 파일 끝에 이어 쓰기만 하면 되고,
+# "최근 20일"처럼 최근 구간만 읽으면 해당 페이지만 디스크에서 읽습니다.
+# 종목 축은 여유 공간(stock_capacity)을 두어 신규 상장 종목이 생겨도 파일을 다시 쓰지 않습니다.
+#
+# 파일을 통째로 다시 써야 할 때(종목 축 확장, 과거 날짜 끼워 넣기)는 새 세대 파일(cube.<N>.f32)에 쓰고,
+# 메타가 새 파일을 가리키도록 교체합니다. 메타 교체 한 번으로 바뀌므로 중간에 중단되어도 기존 데이터는 그대로입니다.
+# 쓰기(append_day)는 메타 파일 잠금(file_manager.artifact_lock) 안에서만 하며, 이전 중단의 흔적 정리도 이때 합니다.
+# (읽기만 하는 쪽은 파일을 고치지 않습니다)
+# -----------------------------------------------------------------------------------------
+
+CUBE_FIELDS = ['시가', '고가', '저가', '종가', '대비', '등락률', '거래량', '거래대금', '시가총액', '상장주식수']
+DEFAULT_STOCK_CAPACITY = 4096
+
+
+def get_history_folder_path():
+    """시세 큐브 저장 폴더 경로를 반환하고, 필요하면 생성합니다."""
+    return file_manager.make_folder('history')
+
+
+def get_cube_meta_path(folder_path=None):
+    """시세 큐브 메타 파일 경로를 반환합니다. (큐브를 열지 않으므로 캐시 키 등에 사용)"""
+    return os.path.join(folder_path or get_history_folder_path(), 'cube_meta.json')
+
+
+def data_file_name(generation):
+    """세대 번호에 해당하는 데이터 파일 이름 (0세대는 기존과 같은 'cube.f32')"""
+    return 'cube.f32' if generation == 0 else f'cube.{generation}.f32'
+
+
+def fsync_file(path):
+    """파일 내용을 디스크에 확실히 기록합니다."""
+    with open(path, 'rb+') as f:
+        os.fsync(f.fileno())
+
+
+class HistoryCube:
+    """
+    [날짜 × 종목 × 항목] float32 시세 큐브입니다. 값이 없는 칸은 NaN입니다.
+    """
+
+    def __init__(self, folder_path=None):
+        self.folder_path = folder_path or get_history_folder_path()
+        self.meta_path = get_cube_meta_path(self.folder_path)
+        self._load_meta()
+
+    def _load_meta(self):
+        """디스크의 메타 파일을 읽습니다. (파일은 고치지 않음)"""
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        else:
+            meta = {'fields': CUBE_FIELDS, 'symbols': [], 'dates': [], 'stock_capacity': DEFAULT_STOCK_CAPACITY}
+
+        self.fields = meta['fields']
+        self.symbols = meta['symbols']
+        self.dates = meta['dates']
+        self.stock_capacity = meta['stock_capacity']
+        self.generation = meta.get('generation', 0)
+
+        self.field_index = {name: i for i, name in enumerate(self.fields)}
+        self.symbol_index = pd.Index(self.symbols)
+        self.date_index = pd.Index(self.dates)
+        self._data = None
+
+    def _repair(self):
+        """
+        (append_day에서 잠금을 잡은 상태로 호출) 이전 쓰기가 중단된 흔적을 정리합니다.
+          - 메타가 가리키지 않는 데이터 파일(다시 쓰다 중단된 새 세대, 교체 전 세대) 삭제
+          - 데이터 파일이 메타보다 길면 메타 기준 길이로 자르기
+            (이어 쓰기 직후 메타 저장 전에 중단된 경우. 그대로 두면 다음 이어 쓰기가 엉뚱한 위치에 붙습니다)
+        """
+        current = os.path.basename(self.data_path)
+        for name in os.listdir(self.folder_path):
+            if re.fullmatch(r'cube(\.\d+)?\.f32', name) and name != current:
+                os.remove(os.path.join(self.folder_path, name))
+
+        if not os.path.exists(self.data_path):
+            return
+        expected = int(np.prod(self.shape)) * np.dtype(np.float32).itemsize
+        if os.path.getsize(self.data_path) > expected:
+            print(f"시세 큐브: 메타에 기록되지 않은 데이터를 잘라냅니다. ({self.data_path})")
+            with open(self.data_path, 'r+b') as f:
+                f.truncate(expected)
+
+    # --- 저장 구조 -----------------------------------------------------------------
+
+    @property
+    def data_path(self):
+        return os.path.join(self.folder_path, data_file_name(self.generation))
+
+    @property
+    def shape(self):
+        return (len(self.dates), self.stock_capacity, len(self.fields))
+
+    @property
+    def data(self):
+        """큐브 전체를 읽기 전용 memmap으로 반환합니다. (실제 읽기는 접근하는 부분만 일어남)"""
+        if self._data is None and self.dates:
+            self._data = np.memmap(self.data_path, dtype=np.float32, mode='r', shape=self.shape)
+        return self._data
+
+    def _save_meta(self):
+        meta = {
+            'fields': self.fields,
+            'symbols': self.symbols,
+            'dates': self.dates,
+            'stock_capacity': self.stock_capacity,
+            'generation': self.generation,
+        }
+        # 임시 파일에 쓴 뒤 교체하여, 중간에 중단되어도 메타 파일이 깨지지 않게 합니다.
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.meta_path)
+        fsync_dir(self.folder_path)
+
+        self.symbol_index = pd.Index(self.symbols)
+        self.date_index = pd.Index(self.dates)
+        self._data = None
+
+    def _grow_stock_capacity(self, required):
+        """
+        종목 수가 여유 공간을 넘으면 종목 축을 두 배로 늘려 새 세대 파일에 다시 씁니다. (드물게 발생)
+        새 파일은 append_day 끝에서 메타를 저장해야 사용됩니다.
+        """
+        new_capacity = self.stock_capacity
+        while new_capacity < required:
+            new_capacity *= 2
+
+        if not self.dates:
+            # 아직 저장된 날짜가 없으면 크기만 바꾸면 됩니다.
+            self.stock_capacity = new_capacity
+            return
+
+        old = self.data
+        new_path = os.path.join(self.folder_path, data_file_name(self.generation + 1))
+        new = np.memmap(new_path, dtype=np.float32, mode='w+',
+                        shape=(len(self.dates), new_capacity, len(self.fields)))
+        new[:] = np.nan
+        new[:, :self.stock_capacity, :] = old
+        new.flush()
+        del new, old
+        fsync_file(new_path)
+        self._data = None
+        self.generation += 1
+        self.stock_capacity = new_capacity
+
+    def _build_slab(self, df_krx):
+        """하루치 KRX 시세를 [종목 × 항목] 배열로 변환합니다. (신규 종목은 종목 축에 추가)"""
+        df = df_krx.copy()
+        df['종목코드'] = df['종목코드'].astype(str).str.zfill(6)
+        df = df.drop_duplicates(subset='종목코드')
+
+        new_symbols = df.loc[~df['종목코드'].isin(self.symbol_index), '종목코드'].tolist()
+        if new_symbols:
+            if len(self.symbols) + len(new_symbols) > self.stock_capacity:
+                self._grow_stock_capacity(len(self.symbols) + len(new_symbols))
+            self.symbols.extend(new_symbols)
+            self.symbol_index = pd.Index(self.symbols)
+
+        slab = np.full((self.stock_capacity, len(self.fields)), np.nan, dtype=np.float32)
+        rows = self.symbol_index.get_indexer(df['종목코드'])
+        for i, name in enumerate(self.fields):
+            if name in df.columns:
+                slab[rows, i] = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float32)
+        return slab
+
+    # --- 쓰기 ----------------------------------------------------------------------
+
+    def append_day(self, tradingday, df_krx):
+        """
+        한 거래일의 KRX 시세를 큐브에 추가합니다.
+        이미 있는 날짜면 덮어쓰고, 마지막 날짜보다 이전 날짜면 정렬 순서를 유지하도록 끼워 넣습니다.
+        메타 파일 잠금 안에서 디스크의 최신 메타를 다시 읽은 뒤 씁니다. (다른 프로세스가 먼저 추가했을 수 있음)
+
+        Args:
+            tradingday (str): 거래일자 (YYYYMMDD)
+            df_krx (pd.DataFrame): KRX 전종목 시세 데이터
+        """
+        with file_manager.artifact_lock(self.meta_path):
+            self._load_meta()
+            self._repair()
+            self._append_day(tradingday, df_krx)
+
+    def _append_day(self, tradingday, df_krx):
+        slab = self._build_slab(df_krx)
+
+        if tradingday in self.date_index:
+            # 같은 날짜는 해당 위치만 덮어쓰기
+            pos = self.date_index.get_loc(tradingday)
+            data = np.memmap(self.data_path, dtype=np.float32, mode='r+', shape=self.shape)
+            data[pos] = slab
+            data.flush()
+            del data
+        elif not self.dates or tradingday > self.dates[-1]:
+            # 가장 최근 날짜면 파일 끝에 이어 쓰기
+            # 데이터가 디스크에 확실히 기록된(fsync) 뒤에만 날짜 수를 늘린 메타를 저장합니다.
+            # (그 사이 중단되면 다음 append_day의 _repair가 남은 행을 잘라냄)
+            with open(self.data_path, 'ab') as f:
+                f.write(slab.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self.dates.append(tradingday)
+        else:
+            # 과거 날짜 끼워 넣기: 뒤쪽 날짜들을 한 칸씩 밀어서 새 세대 파일에 다시 씁니다.
+            pos = int(np.searchsorted(self.dates, tradingday))
+            old = np.array(self.data)
+            self._data = None
+            new = np.concatenate([old[:pos], slab[np.newaxis], old[pos:]])
+            new_path = os.path.join(self.folder_path, data_file_name(self.generation + 1))
+            new.tofile(new_path)
+            fsync_file(new_path)
+            self.generation += 1
+            self.dates.insert(pos, tradingday)
+
+        self._save_meta()
+
+    # --- 읽기 ----------------------------------------------------------------------
+
+    def field(self, name, last_n=None, end=None):
+        """
+        특정 항목의 [날짜 × 종목] 2차원 배열을 반환합니다.
+
+        Args:
+            name (str): 항목명 (예: '종가', '거래량')
+            last_n (int, optional): end 기준 최근 N개 거래일만 반환
+            end (str, optional): 마지막 거래일자 (YYYYMMDD, 없으면 큐브의 마지막 날짜)
+        Returns:
+            np.ndarray: shape = (날짜 수, 종목 수)
+        """
+        if not self.dates:
+            return np.empty((0, len(self.symbols)), dtype=np.float32)
+
+        stop = len(self.dates) if end is None else int(np.searchsorted(self.dates, end, side='right'))
+        start = 0 if last_n is None else max(0, stop - last_n)
+        return self.data[start:stop, :len(self.symbols), self.field_index[name]]
+
+    def dates_of(self, last_n=None, end=None):
+        """field()와 같은 조건으로 잘라낸 날짜 축을 반환합니다."""
+        stop = len(self.dates) if end is None else int(np.searchsorted(self.dates, end, side='right'))
+        start = 0 if last_n is None else max(0, stop - last_n)
+        return self.dates[start:stop]
+
+    def to_frame(self, name, last_n=None, end=None):
+        """특정 항목을 날짜(행) × 종목코드(열) DataFrame으로 반환합니다."""
+        values = self.field(name, last_n, end)
+        return pd.DataFrame(np.asarray(values), index=self.dates_of(last_n, end), columns=self.symbols)
+
+
+def append_krx_snapshot(tradingday=None):
+    """
+    거래일 폴더의 'krx_stock_list_YYYYMMDD.csv'를 시세 큐브에 추가합니다.
+    (KRX 시세 수집 단계 직후에 호출합니다)
+    """
+    if tradingday is None:
+        tradingday = get_last_trading_day_str()
+
+    krx_file = os.path.join(file_manager.get_current_path(), tradingday, f'krx_stock_list_{tradingday}.csv')
+    if not os.path.exists(krx_file):
+        print(f"오류: KRX 주식 목록 파일이 없습니다. ({krx_file})")
+        return None
+
+    df_krx = pd.read_csv(krx_file, dtype={'종목코드': str})
+    cube = HistoryCube()
+    cube.append_day(tradingday, df_krx)
+    print(f"시세 큐브에 {tradingday} 추가 완료 (총 {len(cube.dates)}일 × {len(cube.symbols)}개 종목)")
+    return cube
+
+
+def rebuild_from_folders():
+    """
+    작업 폴더의 모든 거래일 폴더에 있는 KRX 시세 파일로 시세 큐브를 처음부터 다시 만듭니다.
+    (과거 데이터 일괄 수집(backfill) 후에 사용합니다)
+    """
+    base_path = file_manager.get_current_path()
+    days = sorted(name for name in os.listdir(base_path)
+                  if re.fullmatch(r'\d{8}', name)
+                  and os.path.exists(os.path.join(base_path, name, f'krx_stock_list_{name}.csv')))
+
+    folder_path = get_history_folder_path()
+    for filename in os.listdir(folder_path):
+        if re.fullmatch(r'cube(\.\d+)?\.f32', filename) or filename == 'cube_meta.json':
+            file_manager.check_and_delete_file(os.path.join(folder_path, filename))
+
+    cube = HistoryCube(folder_path)
+    for day in days:
+        df_krx = pd.read_csv(os.path.join(base_path, day, f'krx_stock_list_{day}.csv'), dtype={'종목코드': str})
+        cube.append_day(day, df_krx)
+
+    print(f"시세 큐브 재생성 완료 (총 {len(cube.dates)}일 × {len(cube.symbols)}개 종목)")
+    return cube
+
+
+if __name__ == "__main__":
+    # python3 -m component.stockanalysis.history_cube rebuild  : 전체 재생성
+    # python3 -m component.stockanalysis.history_cube [YYYYMMDD] : 해당 거래일 추가
+    if len(sys.argv) > 1 and sys.argv[1] == 'rebuild':
+        rebuild_from_folders()
+    else:
+        append_krx_snapshot(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,154 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from common import file_manager, get_last_trading_day_str, get_trading_day_folder_path
+from component.stockanalysis.history_cube import HistoryCube
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 기술적 지표 계산 엔진]
+# 일별 시세 큐브(history_cube)에서 최근 N일 구간을 [날짜 × 종목] 배열로 꺼내
+# 전 종목(약 2,700개)의 지표를 한 번의 NumPy 연산으로 계산합니다. (종목별 반복문 없음)
+#
+# 계산 지표:
+# - 이동평균(MA5, MA20, MA60), 20일 이격도(종가 / MA20)
+# - 거래량비율 : 오늘 거래량 / 직전 20일 평균 거래량
+# - 20일/60일 신고가 : 직전 N일 고가의 최댓값, 오늘 종가가 이를 넘으면 돌파
+# - 연속상승일 : 오늘부터 거슬러 올라가며 등락률 > 0 인 날이 연속된 일수
+#
+# 결과는 거래일 폴더에 'indicators_YYYYMMDD.csv'로 저장해 두고 다시 계산하지 않습니다.
+# -----------------------------------------------------------------------------------------
+
+MA_WINDOWS = (5, 20, 60)
+VOLUME_WINDOW = 20
+HIGH_WINDOWS = (20, 60)
+LOOKBACK_DAYS = max(max(MA_WINDOWS), VOLUME_WINDOW, max(HIGH_WINDOWS)) + 1
+
+# 지표 기반 선정사유 (A/B에 해당하지 않는 종목에만 부여)
+# C: 거래량 급증 (직전 20일 평균의 5배 이상, 상승 마감)
+# D: 60일 신고가 돌파
+MIN_VOLUME_RATIO = 5
+BREAKOUT_WINDOW = 60
+
+
+def rolling_mean_last(values, window):
+    """[날짜 × 종목] 배열에서 마지막 날 기준 window일 평균을 계산합니다. (데이터가 부족하면 NaN)"""
+    if values.shape[0] < window:
+        return np.full(values.shape[1], np.nan)
+    tail = values[-window:]
+    count = np.sum(~np.isnan(tail), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count == window, np.nansum(tail, axis=0) / window, np.nan)
+
+
+def consecutive_true_last(mask):
+    """
+    [날짜 × 종목] 불리언 배열에서 마지막 날부터 거꾸로 True가 몇 번 연속되는지 셉니다.
+    뒤집은 배열의 누적곱(cumprod)은 처음 False가 나오는 순간부터 0이 되므로, 합계가 곧 연속 일수입니다.
+    """
+    if mask.shape[0] == 0:
+        return np.zeros(mask.shape[1], dtype=np.int64)
+    return np.cumprod(mask[::-1].astype(np.int64), axis=0).sum(axis=0)
+
+
+def compute_indicators(cube, end=None):
+    """
+    시세 큐브에서 전 종목의 기술적 지표를 계산합니다.
+
+    Args:
+        cube (HistoryCube): 일별 시세 큐브
+        end (str, optional): 기준 거래일자 (YYYYMMDD, 없으면 큐브의 마지막 날짜)
+    Returns:
+        pd.DataFrame: 종목코드별 지표 (기준일에 시세가 없는 종목은 제외)
+    """
+    close = np.asarray(cube.field('종가', LOOKBACK_DAYS, end), dtype=np.float64)
+    high = np.asarray(cube.field('고가', LOOKBACK_DAYS, end), dtype=np.float64)
+    volume = np.asarray(cube.field('거래량', LOOKBACK_DAYS, end), dtype=np.float64)
+    change = np.asarray(cube.field('등락률', LOOKBACK_DAYS, end), dtype=np.float64)
+
+    result = pd.DataFrame({'종목코드': cube.symbols})
+    if close.shape[0] == 0:
+        return result.iloc[0:0]
+
+    today_close = close[-1]
+    for window in MA_WINDOWS:
+        result[f'MA{window}'] = np.round(rolling_mean_last(close, window), 1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['이격도20'] = np.round(today_close / result['MA20'].to_numpy() * 100, 1)
+
+        # 오늘을 제외한 직전 VOLUME_WINDOW일 평균 거래량 대비
+        prev_volume = rolling_mean_last(volume[:-1], VOLUME_WINDOW)
+        result['거래량비율'] = np.round(volume[-1] / np.where(prev_volume > 0, prev_volume, np.nan), 2)
+
+    for window in HIGH_WINDOWS:
+        # 오늘을 제외한 직전 window일의 최고가
+        prev_high = high[:-1][-window:]
+        if prev_high.shape[0] < window:
+            high_n = np.full(close.shape[1], np.nan)
+        else:
+            # fmax는 NaN을 무시하고 최댓값을 구합니다. (모두 NaN이면 NaN)
+            high_n = np.fmax.reduce(prev_high, axis=0)
+        result[f'{window}일고가'] = high_n
+        result[f'{window}일신고가'] = today_close > high_n
+
+    result['연속상승일'] = consecutive_true_last(change > 0)
+
+    # 기준일에 시세가 있는 종목만 남깁니다.
+    return result[~np.isnan(today_close)].reset_index(drop=True)
+
+
+def load_indicators(tradingday=None, folder_path=None):
+    """
+    거래일의 지표를 반환합니다. 'indicators_YYYYMMDD.csv'가 시세 큐브보다 최신이면 그대로 읽고,
+    아니면 새로 계산해서 저장합니다. (거래일당 한 번만 계산)
+
+    Returns:
+        pd.DataFrame: 종목코드별 지표 (시세 큐브에 기준일이 없으면 None)
+    """
+    if tradingday is None:
+        tradingday = get_last_trading_day_str()
+    if folder_path is None:
+        folder_path = get_trading_day_folder_path()
+
+    cube = HistoryCube()
+    if tradingday not in cube.dates:
+        print(f"경고: 시세 큐브에 {tradingday} 데이터가 없어 지표를 계산하지 않습니다.")
+        return None
+
+    cache_file = os.path.join(folder_path, f'indicators_{tradingday}.csv')
+    if os.path.exists(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(cube.meta_path):
+        return pd.read_csv(cache_file, dtype={'종목코드': str})
+
+    indicators_df = compute_indicators(cube, tradingday)
+
+    with file_manager.atomic_write(cache_file) as tmp_path:
+        indicators_df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    print(f"기술적 지표 계산 완료: {len(indicators_df)}개 종목 ({cube.dates_of(LOOKBACK_DAYS, tradingday)[0]} ~ {tradingday})")
+    return indicators_df
+
+
+def classify_indicator_selection(df_krx, indicators_df):
+    """
+    지표 기반 선정사유(C, D)를 df_krx의 '선정사유'가 비어 있는 종목에 부여하고 해당 마스크를 반환합니다.
+    지표 컬럼(거래량비율, 연속상승일, 신고가 여부)도 df_krx에 함께 붙입니다.
+
+    Args:
+        df_krx (pd.DataFrame): classify_selection을 거친 KRX 전종목 데이터
+        indicators_df (pd.DataFrame): load_indicators 결과
+    Returns:
+        pd.Series: C 또는 D로 선정된 종목이면 True인 불리언 마스크
+    """
+    cols = ['거래량비율', '연속상승일', f'{BREAKOUT_WINDOW}일신고가']
+    indicators = indicators_df.set_index('종목코드')[cols].reindex(df_krx['종목코드'])
+    for col in cols:
+        df_krx[col] = indicators[col].to_numpy()
+
+    breakout = df_krx[f'{BREAKOUT_WINDOW}일신고가'].fillna(False).astype(bool)
+    surge = (df_krx['거래량비율'] >= MIN_VOLUME_RATIO) & (df_krx['등락률'] > 0)
+    empty = df_krx['선정사유'] == ''
+
+    df_krx.loc[empty & breakout, '선정사유'] = 'D'
+    df_krx.loc[empty & surge, '선정사유'] = 'C'
+    return empty & (surge | breakout)
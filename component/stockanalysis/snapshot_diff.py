@@ -0,0 +1,209 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from common import file_manager, get_last_trading_day_str, list_previous_trading_days
+from component.artifact_loader import load_artifacts
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 전일 대비 스냅샷 비교 엔진]
+# 두 거래일의 산출물을 키(종목코드 또는 (테마, 종목코드))로 해시 조인(pd.merge)하여
+# 추가/삭제/변경된 레코드를 한 번에 찾습니다.
+#
+# - 추가 : 오늘만 있는 키 (예: 테마에 새로 편입된 종목, 새 A/B 선정 종목)
+# - 삭제 : 전일에만 있는 키 (예: 테마에서 빠진 종목, 상장폐지)
+# - 변경 : 양쪽에 다 있지만 비교 필드 값이 다른 키 (필드별로 한 행씩, 숫자는 변화량 포함)
+#
+# 비교는 컬럼 단위 벡터 연산이므로 전종목(약 2,700개) × 여러 필드도 금방 끝납니다.
+# 결과는 'snapshot_diff_YYYYMMDD.csv'로 저장되고, getFileSum에서 '전일대비변화' 시트로 합쳐집니다.
+#
+# 실행 예시:
+#   python3 -m component.stockanalysis.snapshot_diff            # 최근 거래일 vs 직전 거래일
+#   python3 -m component.stockanalysis.snapshot_diff 20250103 20250102
+# -----------------------------------------------------------------------------------------
+
+DIFF_COLUMNS = ['대상', '구분', '테마', '종목코드', '종목명', '필드', '이전값', '현재값', '변화량']
+
+# 비교 대상 산출물 정의
+# - file: 거래일 폴더 안의 파일 이름 (tradingday로 채움)
+# - keys: 조인 키 / fields: 값을 비교할 컬럼 / label: 표시용 컬럼 (비교하지 않음)
+SNAPSHOT_SPECS = {
+    '테마편입': {
+        'file': 'naver_themes_dtl_list_{tradingday}.csv',
+        'keys': ['테마', '종목코드'],
+        'fields': [],
+        'label': '종목명',
+    },
+    '선정종목': {
+        'file': '00_stock_analysis_pivoted_{tradingday}.xlsx',
+        'sheet_name': '종목분석',
+        'keys': ['종목코드'],
+        'fields': ['선정사유'],
+        'label': '종목명',
+    },
+    '거래상위100': {
+        'file': 'krx_top_100_{tradingday}.csv',
+        'keys': ['종목코드'],
+        'fields': ['순위'],
+        'label': '종목명',
+    },
+    '전종목': {
+        'file': 'krx_stock_list_{tradingday}.csv',
+        'keys': ['종목코드'],
+        'fields': ['시장구분', '상장주식수'],
+        'label': '종목명',
+    },
+}
+
+
+def diff_frames(prev_df, curr_df, keys, fields, label=None):
+    """
+    두 데이터프레임을 키로 조인하여 추가/삭제/변경 레코드를 반환합니다.
+
+    Args:
+        prev_df (pd.DataFrame): 전일 데이터
+        curr_df (pd.DataFrame): 당일 데이터
+        keys (list): 조인 키 컬럼 리스트
+        fields (list): 값을 비교할 컬럼 리스트
+        label (str, optional): 결과에 함께 보여줄 이름 컬럼 (예: '종목명')
+    Returns:
+        pd.DataFrame: keys + [label] + 구분, 필드, 이전값, 현재값, 변화량 컬럼
+    """
+    extra = [label] if label else []
+    cols = keys + extra + fields
+    prev = prev_df[[c for c in cols if c in prev_df.columns]].drop_duplicates(subset=keys)
+    curr = curr_df[[c for c in cols if c in curr_df.columns]].drop_duplicates(subset=keys)
+
+    merged = pd.merge(prev, curr, on=keys, how='outer', suffixes=('_이전', '_현재'), indicator=True)
+    if label:
+        # 이름은 오늘 값을 우선 사용하고, 삭제된 종목은 전일 이름을 사용합니다.
+        merged[label] = merged[f'{label}_현재'].fillna(merged[f'{label}_이전'])
+
+    out_cols = keys + extra + ['구분', '필드', '이전값', '현재값', '변화량']
+    parts = []
+
+    for kind, flag in (('추가', 'right_only'), ('삭제', 'left_only')):
+        rows = merged.loc[merged['_merge'] == flag, keys + extra].copy()
+        rows['구분'] = kind
+        parts.append(rows)
+
+    both = merged[merged['_merge'] == 'both']
+    for field in fields:
+        if f'{field}_이전' not in both.columns or f'{field}_현재' not in both.columns:
+            continue
+        before, after = both[f'{field}_이전'], both[f'{field}_현재']
+        changed = (before != after) & ~(before.isna() & after.isna())
+        if not changed.any():
+            continue
+
+        rows = both.loc[changed, keys + extra].copy()
+        rows['구분'] = '변경'
+        rows['필드'] = field
+        rows['이전값'] = before[changed].to_numpy()
+        rows['현재값'] = after[changed].to_numpy()
+        if pd.api.types.is_numeric_dtype(before) and pd.api.types.is_numeric_dtype(after):
+            rows['변화량'] = (after[changed] - before[changed]).to_numpy()
+        parts.append(rows)
+
+    result = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    return result.reindex(columns=out_cols)
+
+
+def snapshot_artifact(name, tradingday):
+    """SNAPSHOT_SPECS의 산출물을 artifact_loader 형식의 파일 정보로 변환합니다. (없으면 건너뜀)"""
+    spec = SNAPSHOT_SPECS[name]
+    folder_path = os.path.join(file_manager.get_current_path(), tradingday)
+    artifact = {
+        'path': os.path.join(folder_path, spec['file'].format(tradingday=tradingday)),
+        'dtype': {'종목코드': str},
+        'optional': True,
+    }
+    if 'sheet_name' in spec:
+        artifact['sheet_name'] = spec['sheet_name']
+    return artifact
+
+
+def prepare_snapshot(name, df):
+    """비교 전에 산출물별로 필요한 컬럼을 만듭니다."""
+    if name == '거래상위100':
+        # 거래상위100 파일은 거래대금 순으로 저장되어 있으므로 행 순서가 곧 순위입니다.
+        df = df.copy()
+        df['순위'] = np.arange(1, len(df) + 1)
+    return df
+
+
+def compute_snapshot_diff(tradingday, prev_day):
+    """
+    두 거래일의 산출물 전체를 비교합니다.
+
+    Args:
+        tradingday (str): 당일 거래일자 (YYYYMMDD)
+        prev_day (str): 비교할 이전 거래일자 (YYYYMMDD)
+    Returns:
+        pd.DataFrame: DIFF_COLUMNS 형식의 변화 목록
+    """
+    specs = {}
+    for name in SNAPSHOT_SPECS:
+        specs[(name, 'prev')] = snapshot_artifact(name, prev_day)
+        specs[(name, 'curr')] = snapshot_artifact(name, tradingday)
+    frames = load_artifacts(specs)
+
+    results = []
+    for name, spec in SNAPSHOT_SPECS.items():
+        prev_df, curr_df = frames[(name, 'prev')], frames[(name, 'curr')]
+        if prev_df is None or curr_df is None:
+            print(f"  - {name}: 비교할 파일이 없어 건너뜁니다.")
+            continue
+
+        prev_df, curr_df = prepare_snapshot(name, prev_df), prepare_snapshot(name, curr_df)
+        diff_df = diff_frames(prev_df, curr_df, spec['keys'], spec['fields'], spec['label'])
+        diff_df.insert(0, '대상', name)
+        results.append(diff_df)
+
+        counts = diff_df['구분'].value_counts()
+        print(f"  - {name}: 추가 {counts.get('추가', 0)} / 삭제 {counts.get('삭제', 0)} / 변경 {counts.get('변경', 0)}")
+
+    if not results:
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+
+    diff_df = pd.concat(results, ignore_index=True).reindex(columns=DIFF_COLUMNS)
+
+    # 순위 변화는 크게 움직인 종목이 먼저 보이도록 정렬합니다.
+    diff_df['_크기'] = pd.to_numeric(diff_df['변화량'], errors='coerce').abs()
+    diff_df = diff_df.sort_values(['대상', '구분', '_크기'], ascending=[True, True, False], kind='stable')
+    return diff_df.drop(columns='_크기').reset_index(drop=True)
+
+
+def snapshotDiff(tradingday=None, prev_day=None):
+    """메인 실행 함수: 직전 거래일 대비 변화 내역을 계산하여 저장합니다."""
+    print("=" * 50)
+    print("전일 대비 변화 분석을 시작합니다.")
+    print("=" * 50)
+
+    # 거래일자 설정
+    # 주말/휴장일에는 장이 열리지 않으므로, 가장 최근 거래일을 계산해서 가져옵니다.
+    tradingday = tradingday or get_last_trading_day_str()
+    if prev_day is None:
+        previous = list_previous_trading_days(tradingday, 1)
+        if not previous:
+            print(f"오류: {tradingday} 이전 거래일 폴더가 없어 비교할 수 없습니다.")
+            return None
+        prev_day = previous[0]
+
+    print(f"비교 대상: {prev_day} -> {tradingday}")
+    diff_df = compute_snapshot_diff(tradingday, prev_day)
+
+    folder_path = file_manager.make_folder(tradingday)
+    output_filename = f'snapshot_diff_{tradingday}.csv'
+    save_path = os.path.join(folder_path, output_filename)
+    with file_manager.atomic_write(save_path) as tmp_path:
+        diff_df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+
+    print(f"성공: 변화 {len(diff_df)}건이 '{output_filename}' 파일로 저장되었습니다.")
+    return diff_df
+
+
+if __name__ == "__main__":
+    snapshotDiff(*sys.argv[1:3])
@@ -0,0 +1,169 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from common import file_manager, get_last_trading_day_str, get_trading_day_folder_path, list_previous_trading_days
+from component.stockanalysis.theme_index import load_theme_index, normalize_codes
+from component.stockanalysis.daily_analysis_stocks import classify_selection
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 테마 강도 / 확산도 분석]
+# 네이버 테마 목록의 '전일대비' 문자열 하나만 보는 대신,
+# KRX 전종목 시세와 종목×테마 인덱스를 이용해 모든 테마의 지표를 한 번에 계산합니다.
+#
+# 계산 방식:
+# - 인덱스의 (종목, 테마) 쌍 배열에 종목별 값을 붙인 뒤,
+#   np.bincount(theme_id, weights=값) 으로 테마별 합계를 구합니다. (groupby 1회에 해당)
+# - 테마가 수백 개, 연결이 수천 개 수준이므로 밀리초 단위로 끝납니다.
+#
+# 산출 지표:
+# - 시총가중등락률 : Σ(시가총액×등락률) / Σ시가총액
+# - 거래대금가중등락률 : Σ(거래대금×등락률) / Σ거래대금
+# - 상승/하락/보합 종목수, 상승비율 (breadth)
+# - 거래대금합계, A/B 선정 종목수
+# -----------------------------------------------------------------------------------------
+
+RANK_COLUMN = '시총가중등락률'
+
+
+def compute_theme_analytics(df_krx, theme_index):
+    """
+    모든 테마의 강도/확산도 지표를 한 번의 그룹 연산으로 계산합니다.
+
+    Args:
+        df_krx (pd.DataFrame): KRX 전종목 시세 데이터
+        theme_index (ThemeIndex): 종목×테마 인덱스
+    Returns:
+        pd.DataFrame: 테마별 지표 (시총가중등락률 내림차순 정렬, '순위' 컬럼 포함)
+    """
+    df = df_krx.copy()
+    df['종목코드'] = normalize_codes(df['종목코드'])
+    if '선정사유' not in df.columns:
+        classify_selection(df)
+    df = df.drop_duplicates(subset='종목코드').set_index('종목코드')
+
+    # 인덱스의 stock_id 순서에 맞춰 종목별 값을 정렬합니다. (시세가 없는 종목은 NaN)
+    stock_df = df.reindex(theme_index.codes)
+    has_quote = stock_df['등락률'].notna().to_numpy()
+
+    rate = stock_df['등락률'].fillna(0).to_numpy(dtype=np.float64)
+    cap = stock_df['시가총액'].fillna(0).to_numpy(dtype=np.float64)
+    amount = stock_df['거래대금'].fillna(0).to_numpy(dtype=np.float64)
+    reason = stock_df['선정사유'].fillna('').to_numpy()
+
+    # (종목, 테마) 쌍 단위 값으로 펼치기
+    pair_stock, pair_theme = theme_index.pair_stock, theme_index.pair_theme
+    n_themes = len(theme_index.themes)
+
+    def theme_sum(values):
+        return np.bincount(pair_theme, weights=values[pair_stock], minlength=n_themes)
+
+    members = theme_sum(has_quote.astype(np.float64))
+    cap_sum = theme_sum(cap)
+    amount_sum = theme_sum(amount)
+    advancers = theme_sum((has_quote & (rate > 0)).astype(np.float64))
+    decliners = theme_sum((has_quote & (rate < 0)).astype(np.float64))
+    count_a = theme_sum((reason == 'A').astype(np.float64))
+    count_b = theme_sum((reason == 'B').astype(np.float64))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cap_weighted = theme_sum(cap * rate) / cap_sum
+        amount_weighted = theme_sum(amount * rate) / amount_sum
+        breadth = advancers / members
+
+    result = pd.DataFrame({
+        '테마': theme_index.themes,
+        '종목수': members.astype(np.int64),
+        RANK_COLUMN: np.round(cap_weighted, 2),
+        '거래대금가중등락률': np.round(amount_weighted, 2),
+        '상승종목수': advancers.astype(np.int64),
+        '하락종목수': decliners.astype(np.int64),
+        '보합종목수': (members - advancers - decliners).astype(np.int64),
+        '상승비율': np.round(breadth * 100, 1),
+        # 거래대금 억원 단위로 변환
+        '거래대금합계': np.round(amount_sum / 100000000, 1),
+        'A선정수': count_a.astype(np.int64),
+        'B선정수': count_b.astype(np.int64),
+    })
+
+    result = result.sort_values(by=[RANK_COLUMN, '거래대금합계'], ascending=[False, False], na_position='last')
+    result['순위'] = np.arange(1, len(result) + 1)
+    return result.reset_index(drop=True)
+
+
+def compute_rolling_ranks(today_df, tradingday, window=5):
+    """
+    최근 거래일들의 테마 순위를 모아 테마별 순위 추이와 평균 순위를 계산합니다.
+
+    Args:
+        today_df (pd.DataFrame): 오늘의 테마 지표 (compute_theme_analytics 결과)
+        tradingday (str): 오늘 거래일자 (YYYYMMDD)
+        window (int): 포함할 거래일 수 (오늘 포함)
+    Returns:
+        pd.DataFrame: 테마별 일자별 순위, 평균순위, 순위변화(전일 대비 상승폭)
+    """
+    base_path = file_manager.get_current_path()
+    ranks = {tradingday: today_df.set_index('테마')['순위']}
+
+    for day in list_previous_trading_days(tradingday, window - 1):
+        path = os.path.join(base_path, day, f'theme_analytics_{day}.csv')
+        if os.path.exists(path):
+            ranks[day] = pd.read_csv(path, usecols=['테마', '순위']).set_index('테마')['순위']
+
+    # 열: 날짜(오래된 순), 행: 테마
+    rank_df = pd.DataFrame(ranks)[sorted(ranks)]
+    rank_df['평균순위'] = rank_df.mean(axis=1).round(1)
+
+    days = sorted(ranks)
+    if len(days) >= 2:
+        # 양수면 순위가 올라간 것 (숫자가 작아짐)
+        rank_df['순위변화'] = rank_df[days[-2]] - rank_df[days[-1]]
+    else:
+        rank_df['순위변화'] = np.nan
+
+    return rank_df.sort_values(by=tradingday).rename_axis('테마').reset_index()
+
+
+def themeAnalytics(window=5):
+    """메인 실행 함수: 테마 강도 지표와 순위 추이를 계산하여 저장합니다."""
+    print("=" * 50)
+    print("테마 강도/확산도 분석을 시작합니다.")
+    print("=" * 50)
+
+    # 거래일자 설정
+    # 주말에는 장이 열리지 않으므로, 가장 최근 평일(거래일)을 계산해서 가져옵니다.
+    tradingday = get_last_trading_day_str()
+
+    # 데이터 저장 폴더 경로 가져오기 (없으면 생성)
+    folder_path = get_trading_day_folder_path()
+
+    krx_file = os.path.join(folder_path, f'krx_stock_list_{tradingday}.csv')
+    if not os.path.exists(krx_file):
+        print(f"오류: KRX 주식 목록 파일이 없습니다. ({krx_file})")
+        return None
+
+    theme_index = load_theme_index(tradingday, folder_path)
+    if theme_index is None:
+        return None
+
+    df_krx = pd.read_csv(krx_file, usecols=['종목코드', '고가', '저가', '등락률', '거래대금', '시가총액'],
+                         dtype={'종목코드': str})
+
+    analytics_df = compute_theme_analytics(df_krx, theme_index)
+    rank_df = compute_rolling_ranks(analytics_df, tradingday, window)
+
+    # 결과 저장 (다음 거래일의 순위 추이 계산에도 사용됩니다)
+    output_filename = f'theme_analytics_{tradingday}.csv'
+    rank_filename = f'theme_rank_{tradingday}.csv'
+    for filename, df in ((output_filename, analytics_df), (rank_filename, rank_df)):
+        save_path = os.path.join(folder_path, filename)
+        with file_manager.atomic_write(save_path) as tmp_path:
+            df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+
+    print(f"성공: {len(analytics_df)}개 테마 분석 결과가 '{output_filename}', '{rank_filename}' 파일로 저장되었습니다.")
+    return analytics_df
+
+
+if __name__ == "__main__":
+    themeAnalytics()
@@ -0,0 +1,232 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from common import get_last_trading_day_str, get_trading_day_folder_path
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 종목×테마 소속 인덱스]
+# 'naver_themes_dtl_list_YYYYMMDD.csv'는 (테마, 종목) 한 쌍이 한 줄인 긴 형식의 파일입니다.
+# 매번 이 파일을 merge/melt 하는 대신, 하루에 한 번 정수 ID 기반의 희소 행렬(CSR 형식)로 만들어 둡니다.
+#
+# - 종목코드 -> 정수 ID (stock_id), 테마명 -> 정수 ID (theme_id)
+# - stock_indptr / stock_themes : 종목별 소속 테마 목록 (CSR)
+# - theme_indptr / theme_stocks : 테마별 소속 종목 목록 (CSR, 전치 행렬)
+#
+# 덕분에 "이 종목의 테마", "이 테마의 종목", "종목 집합 안의 테마 빈도수",
+# "종목 간 공통 테마 수" 를 모두 NumPy 벡터 연산으로 바로 구할 수 있습니다.
+# -----------------------------------------------------------------------------------------
+
+
+def normalize_codes(codes):
+    """종목코드를 6자리 문자열로 통일합니다. (엑셀에서 읽으면 숫자로 바뀌는 문제 방지)"""
+    return pd.Series(codes, dtype=object).astype(str).str.zfill(6).to_numpy()
+
+
+class ThemeIndex:
+    """
+    종목×테마 소속 관계를 정수 ID 기반 희소 행렬로 보관하는 인덱스입니다.
+    """
+
+    def __init__(self, codes, themes, pair_stock, pair_theme):
+        """
+        Args:
+            codes (array-like): stock_id 순서의 종목코드 배열
+            themes (array-like): theme_id 순서의 테마명 배열
+            pair_stock (array-like): (종목, 테마) 쌍의 stock_id 배열
+            pair_theme (array-like): (종목, 테마) 쌍의 theme_id 배열 (pair_stock과 같은 길이)
+        """
+        self.codes = np.asarray(codes, dtype=str)
+        self.themes = np.asarray(themes, dtype=str)
+        self.pair_stock = np.asarray(pair_stock, dtype=np.int32)
+        self.pair_theme = np.asarray(pair_theme, dtype=np.int32)
+
+        # 코드/테마명 -> 정수 ID 조회용 (pandas Index는 해시 기반 get_indexer로 일괄 조회 가능)
+        self._code_index = pd.Index(self.codes)
+        self._theme_index = pd.Index(self.themes)
+
+        n_stocks, n_themes = len(self.codes), len(self.themes)
+
+        # 종목 기준 CSR: 안정 정렬(stable)로 원본 CSV의 테마 순서를 그대로 유지합니다.
+        order = np.argsort(self.pair_stock, kind='stable')
+        self.stock_themes = self.pair_theme[order]
+        self.stock_indptr = np.concatenate(([0], np.cumsum(np.bincount(self.pair_stock, minlength=n_stocks))))
+
+        # 테마 기준 CSR (전치)
+        order = np.argsort(self.pair_theme, kind='stable')
+        self.theme_stocks = self.pair_stock[order]
+        self.theme_indptr = np.concatenate(([0], np.cumsum(np.bincount(self.pair_theme, minlength=n_themes))))
+
+        self._dense = None
+
+    # --- 생성 / 저장 ---------------------------------------------------------------
+
+    @classmethod
+    def from_frame(cls, df_themes):
+        """
+        테마 상세 데이터프레임('테마', '종목코드' 컬럼)으로부터 인덱스를 생성합니다.
+        """
+        df = df_themes[['테마', '종목코드']].dropna().copy()
+        df['종목코드'] = normalize_codes(df['종목코드'])
+        df = df.drop_duplicates()
+
+        # factorize: 처음 등장한 순서대로 0, 1, 2... 정수 ID를 부여합니다.
+        stock_ids, codes = pd.factorize(df['종목코드'])
+        theme_ids, themes = pd.factorize(df['테마'])
+        return cls(codes, themes, stock_ids, theme_ids)
+
+    def save(self, path):
+        """인덱스를 .npz 파일로 저장합니다."""
+        np.savez_compressed(path, codes=self.codes, themes=self.themes,
+                            pair_stock=self.pair_stock, pair_theme=self.pair_theme)
+
+    @classmethod
+    def load(cls, path):
+        """.npz 파일에서 인덱스를 읽어옵니다."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['codes'], data['themes'], data['pair_stock'], data['pair_theme'])
+
+    # --- ID 변환 -------------------------------------------------------------------
+
+    def stock_ids(self, codes):
+        """종목코드 배열을 stock_id 배열로 변환합니다. (인덱스에 없는 종목은 -1)"""
+        return self._code_index.get_indexer(normalize_codes(codes))
+
+    def theme_ids(self, themes):
+        """테마명 배열을 theme_id 배열로 변환합니다. (인덱스에 없는 테마는 -1)"""
+        return self._theme_index.get_indexer(pd.Index(themes))
+
+    @property
+    def dense(self):
+        """종목×테마 0/1 행렬 (uint8). 처음 사용할 때 한 번만 만듭니다."""
+        if self._dense is None:
+            dense = np.zeros((len(self.codes), len(self.themes)), dtype=np.uint8)
+            dense[self.pair_stock, self.pair_theme] = 1
+            self._dense = dense
+        return self._dense
+
+    # --- 조회 ----------------------------------------------------------------------
+
+    def themes_of(self, code):
+        """특정 종목이 속한 테마 목록을 반환합니다."""
+        sid = self.stock_ids([code])[0]
+        if sid < 0:
+            return []
+        return self.themes[self.stock_themes[self.stock_indptr[sid]:self.stock_indptr[sid + 1]]].tolist()
+
+    def stocks_of(self, theme):
+        """특정 테마에 속한 종목코드 목록을 반환합니다."""
+        tid = self.theme_ids([theme])[0]
+        if tid < 0:
+            return []
+        return self.codes[self.theme_stocks[self.theme_indptr[tid]:self.theme_indptr[tid + 1]]].tolist()
+
+    def theme_sizes(self):
+        """테마별 전체 구성 종목 수를 반환합니다."""
+        return pd.Series(np.diff(self.theme_indptr), index=self.themes, name='종목갯수')
+
+    def theme_counts(self, codes):
+        """
+        주어진 종목 집합 안에서 테마별 등장 빈도수를 계산합니다.
+
+        Args:
+            codes (array-like): 종목코드 목록 (중복이 있으면 중복된 만큼 집계)
+        Returns:
+            pd.Series: 테마명 -> 종목갯수 (0인 테마는 제외, 내림차순 정렬)
+        """
+        sids = self.stock_ids(codes)
+        sids = sids[sids >= 0]
+
+        # 선택된 종목들이 가진 (종목, 테마) 쌍의 개수를 stock_id별로 더해 theme_id별 빈도를 구합니다.
+        weights = np.bincount(sids, minlength=len(self.codes))
+        counts = np.bincount(self.pair_theme, weights=weights[self.pair_stock], minlength=len(self.themes))
+        counts = counts.astype(np.int64)
+
+        mask = counts > 0
+        series = pd.Series(counts[mask], index=self.themes[mask], name='종목갯수')
+        return series.sort_values(ascending=False, kind='stable')
+
+    def co_membership(self, codes=None):
+        """
+        종목 간 공통 테마 수 행렬을 계산합니다.
+
+        Args:
+            codes (array-like, optional): 대상 종목코드 목록 (없으면 전체 종목)
+        Returns:
+            pd.DataFrame: 종목코드×종목코드 공통 테마 수
+        """
+        if codes is None:
+            labels = self.codes
+            matrix = self.dense
+        else:
+            labels = normalize_codes(codes)
+            sids = self.stock_ids(labels)
+            matrix = np.zeros((len(sids), len(self.themes)), dtype=np.uint8)
+            valid = sids >= 0
+            matrix[valid] = self.dense[sids[valid]]
+
+        # 0/1 행렬 M 에 대해 M @ M.T 의 (i, j) 값이 두 종목의 공통 테마 수가 됩니다.
+        matrix = matrix.astype(np.int32)
+        return pd.DataFrame(matrix @ matrix.T, index=labels, columns=labels)
+
+    def to_wide(self, codes):
+        """
+        종목별 테마를 '테마_1', '테마_2', ... 컬럼으로 펼친 데이터프레임을 만듭니다.
+
+        Args:
+            codes (array-like): 종목코드 목록
+        Returns:
+            pd.DataFrame: 인덱스가 '종목코드'이고 테마 컬럼들을 가진 데이터프레임
+        """
+        labels = normalize_codes(codes)
+        sids = self.stock_ids(labels)
+
+        # 종목별 테마 개수와 최대 개수로 2차원 표의 크기를 정합니다.
+        starts = np.where(sids >= 0, self.stock_indptr[np.maximum(sids, 0)], 0)
+        lengths = np.where(sids >= 0, self.stock_indptr[np.maximum(sids, 0) + 1] - starts, 0)
+        width = int(lengths.max()) if len(lengths) else 0
+
+        table = np.full((len(labels), width), None, dtype=object)
+        if width:
+            # 행 번호/열 번호를 한 번에 만들어 CSR 값을 표에 흩뿌립니다(scatter).
+            rows = np.repeat(np.arange(len(labels)), lengths)
+            cols = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            table[rows, cols] = self.themes[self.stock_themes[np.repeat(starts, lengths) + cols]]
+
+        columns = [f'테마_{i + 1}' for i in range(width)]
+        return pd.DataFrame(table, index=pd.Index(labels, name='종목코드'), columns=columns)
+
+
+def load_theme_index(tradingday=None, folder_path=None):
+    """
+    거래일의 테마 인덱스를 반환합니다.
+    'theme_index_YYYYMMDD.npz'가 테마 상세 CSV보다 최신이면 그대로 읽고,
+    아니면 CSV로부터 새로 만들어 저장합니다. (거래일당 한 번만 생성)
+
+    Args:
+        tradingday (str, optional): 거래일자 (YYYYMMDD). 없으면 최근 거래일
+        folder_path (str, optional): 데이터 폴더 경로. 없으면 거래일 폴더
+    Returns:
+        ThemeIndex: 테마 인덱스 (테마 상세 파일이 없으면 None)
+    """
+    if tradingday is None:
+        tradingday = get_last_trading_day_str()
+    if folder_path is None:
+        folder_path = get_trading_day_folder_path()
+
+    theme_dtl_file = os.path.join(folder_path, f'naver_themes_dtl_list_{tradingday}.csv')
+    index_file = os.path.join(folder_path, f'theme_index_{tradingday}.npz')
+
+    if not os.path.exists(theme_dtl_file):
+        print(f"오류: 테마 상세 파일이 없습니다. ({theme_dtl_file})")
+        return None
+
+    if os.path.exists(index_file) and os.path.getmtime(index_file) >= os.path.getmtime(theme_dtl_file):
+        return ThemeIndex.load(index_file)
+
+    df_themes = pd.read_csv(theme_dtl_file, usecols=['테마', '종목코드'], dtype={'종목코드': str})
+    index = ThemeIndex.from_frame(df_themes)
+    index.save(index_file)
+    print(f"테마 인덱스 생성: {len(index.codes)}개 종목 × {len(index.themes)}개 테마 ({len(index.pair_stock)}개 연결)")
+    return index
@@ -1,13 +1,14 @@
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
 import os
 import time
 import random
 from urllib.parse import quote
+from xml.etree import ElementTree
 
 from common import file_manager, get_daily_folder_path, get_today_str
 from component.excel_utils import auto_adjust_column_width
+from component import raw_archive, news_store
 
 # -----------------------------------------------------------------------------------------
 # [교육용 주석: 구글 뉴스 RSS 크롤링]
@@ -17,9 +18,49 @@ from component.excel_utils import auto_adjust_column_width
 # RSS URL 예시: https://news.google.com/rss/search?q={검색어}&hl=ko&gl=KR&ceid=KR:ko
 # -----------------------------------------------------------------------------------------
 
-def search_google_news_rss(query):
+# 누적 뉴스 저장소 이름 (news_store/stock_news_YYYYMM.csv, news_store/seen_stock_news.npy)
+NEWS_STORE_NAME = 'stock_news'
+
+# 피드를 파서에 나눠 넣는 단위 (바이트)
+RSS_CHUNK_SIZE = 8192
+
+def parse_rss_items(content, max_items=2):
+    """
+    RSS 본문에서 앞쪽 <item> max_items개만 읽고 멈춥니다.
+    피드 전체(보통 100개)로 트리를 만들지 않고 조금씩 파서에 넣으면서,
+    다 읽은 <item>은 바로 비워 메모리를 돌려줍니다. (종목당 비용이 피드 크기와 무관)
+
+    Args:
+        content (bytes): RSS XML 본문
+        max_items (int): 읽을 최대 기사 수
+    Returns:
+        list: [{'media', 'title', 'url'}, ...]
+    """
+    parser = ElementTree.XMLPullParser(events=('end',))
+    news_results = []
+    for start in range(0, len(content), RSS_CHUNK_SIZE):
+        parser.feed(content[start:start + RSS_CHUNK_SIZE])
+        for _, elem in parser.read_events():
+            if elem.tag != 'item':
+                continue
+            # RSS에서 source 태그가 매체명임
+            news_results.append({
+                'media': elem.findtext('source') or "Google News",
+                'title': elem.findtext('title', ''),
+                'url': elem.findtext('link', ''),
+            })
+            elem.clear()
+            if len(news_results) >= max_items:
+                return news_results
+    return news_results
+
+def search_google_news_rss(query, max_items=2):
     """
-    구글 뉴스 RSS를 검색하여 최신 뉴스 (최대 2~3개)를 반환합니다.
+    구글 뉴스 RSS를 검색하여 최신 뉴스 (기본 2개)를 반환합니다.
+
+    Args:
+        query (str): 검색어 (종목명)
+        max_items (int): 가져올 최대 기사 수 (너무 많으면 엑셀이 복잡해짐. 필요시 조정 가능)
     """
     # URL 인코딩 (한글 검색어 처리)
     encoded_query = quote(query)
@@ -30,27 +71,11 @@ def search_google_news_rss(query):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
         }
-        response = requests.get(rss_url, headers=headers, timeout=5)
+        response = raw_archive.get(raw_archive.SOURCE_GOOGLE_NEWS_RSS, rss_url, headers=headers, timeout=5)
         
         if response.status_code == 200:
-            # XML 파싱
-            soup = BeautifulSoup(response.content, 'xml')
-            items = soup.find_all('item')
-            
-            news_results = []
-            # 상위 2개 뉴스만 가져오기 (너무 많으면 엑셀이 복잡해짐. 필요시 조정 가능)
-            for item in items[:2]: 
-                title = item.title.text
-                link = item.link.text
-                # RSS에서 source 태그가 매체명임
-                source = item.source.text if item.source else "Google News"
-                
-                news_results.append({
-                    'media': source,
-                    'title': title,
-                    'url': link
-                })
-            return news_results
+            # XML 파싱 (앞쪽 기사 max_items개만 읽고 중단)
+            return parse_rss_items(response.content, max_items)
         else:
             print(f"  - RSS 요청 실패 ({response.status_code})")
             return []
@@ -85,6 +110,8 @@ def getStockNews():
         return
 
     all_news_data = []
+    # 같은 기사라도 종목이 다르면 따로 기록하므로, (종목코드, URL) 조합으로 이미 모은 기사인지 확인합니다.
+    seen = news_store.SeenSet(NEWS_STORE_NAME)
     
     print(f"총 {len(df)}개 종목에 대해 뉴스를 검색합니다. (시간이 조금 걸릴 수 있습니다)")
     
@@ -97,6 +124,9 @@ def getStockNews():
         # 뉴스 검색
         news_items = search_google_news_rss(name)
         
+        # 이전 실행에서 이미 모은 기사는 건너뜁니다. (news_store.py 참고)
+        news_items = seen.filter_new(news_items, key=lambda news: f"{code}|{news_store.normalize_url(news['url'])}")
+
         if news_items:
             for news in news_items:
                 all_news_data.append({
@@ -115,19 +145,38 @@ def getStockNews():
         time.sleep(random.uniform(0.5, 1.0))
 
     # 2. 결과 저장
+    save_stock_news(all_news_data, seen, today, folder_path)
+
+def save_stock_news(all_news_data, seen, today, folder_path):
+    """
+    새 기사를 누적 저장소에 덧붙이고, 오늘 모은 기사 전체로 'stock_find_news_YYYYMMDD.xlsx'를 다시 만듭니다.
+
+    Args:
+        all_news_data (list): 새 기사 행 리스트 (번호, 종목코드, 종목명, 뉴스매체, 뉴스내용, url)
+        seen (news_store.SeenSet): 이미 모은 기사 집합 (새 기사가 반영된 상태)
+        today (str): 날짜 (YYYYMMDD)
+        folder_path (str): 저장 폴더
+    """
     output_filename = f'stock_find_news_{today}.xlsx'
     output_filepath = os.path.join(folder_path, output_filename)
     
-    file_manager.check_and_delete_file(output_filepath)
-    
-    if not all_news_data:
-        print("검색된 뉴스가 하나도 없습니다.")
+    print(f"새 기사 {len(all_news_data)}건")
+    if not all_news_data and os.path.exists(output_filepath):
+        print(f"새 기사가 없어 '{output_filename}' 파일을 그대로 둡니다.")
         return
 
-    df_result = pd.DataFrame(all_news_data)
+    # 새 기사만 누적 저장소에 덧붙인 뒤, 오늘 모은 기사 전체(이전 실행분 포함)로 엑셀을 만듭니다.
+    news_store.append_news(NEWS_STORE_NAME, all_news_data, today)
+    seen.save()
+    df_result = news_store.load_news(NEWS_STORE_NAME, today, dtype={'종목코드': str})
+
+    if df_result.empty:
+        print("검색된 뉴스가 하나도 없습니다.")
+        return
     
     try:
-        with pd.ExcelWriter(output_filepath, engine='openpyxl') as writer:
+        # 임시 파일에 쓴 뒤 한 번에 교체합니다. (쓰는 도중 중단되어도 반쯤 쓰인 파일이 남지 않음)
+        with file_manager.atomic_write(output_filepath) as tmp_path, pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
             df_result.to_excel(writer, sheet_name='종목뉴스', index=False)
             
             # [서식 적용]
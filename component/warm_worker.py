@@ -0,0 +1,269 @@
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from component import raw_archive
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 상주 작업 프로세스 (warm worker)]
+# 'python3 main_stock.py stockChart'처럼 단계 하나만 다시 실행해도 매번
+#   1. 파이썬 인터프리터 시작
+#   2. pandas / openpyxl / BeautifulSoup / selenium 임포트
+#   3. 새 HTTP 연결(TLS 핸드셰이크), 새 크롬 브라우저 실행
+# 비용을 치릅니다. 하루에 여러 번 단계를 다시 돌리면 실제 작업보다 이 준비 시간이 더 깁니다.
+#
+# 이 모듈은 위 준비를 한 번만 해 두고 계속 떠 있는 프로세스를 띄웁니다.
+#   - 모든 컴포넌트를 미리 임포트
+#   - 세션을 지정하지 않은 요청이 함께 쓰는 공용 세션(연결 풀)을 raw_archive에 등록
+#   - (--browser) KRX 다운로드 단계와 같은 옵션으로 크롬을 미리 띄워 그 단계가 재사용
+#     (로그인을 클립보드 붙여넣기로 하므로 화면이 있는 브라우저입니다. 실행마다 쿠키를 지우고 로그인부터 다시 함)
+# 그리고 로컬 소켓(127.0.0.1)으로 단계 실행 요청을 받아 main_stock.run_stages로 실행합니다.
+# 단계 출력은 요청한 쪽 터미널로 그대로 전달됩니다. 실행은 한 번에 하나씩만 합니다.
+#
+# 실행 예시:
+#   python3 -m component.warm_worker serve --browser       # 작업 프로세스 시작
+#   python3 -m component.warm_worker run stockChart fileSum
+#   python3 -m component.warm_worker run fileSum --env TRADING_DAY=20250102
+#   python3 -m component.warm_worker status
+#   python3 -m component.warm_worker stop
+#
+# 주의: 컴포넌트 코드를 고친 뒤에는 작업 프로세스를 다시 시작해야 반영됩니다. (이미 임포트된 상태이므로)
+# -----------------------------------------------------------------------------------------
+
+DEFAULT_PORT = 8766
+POOL_SIZE = 16   # 공용 세션의 호스트별 연결 수 (단계 안의 스레드 수보다 넉넉하게)
+RESULT_PREFIX = 'WORKER_RESULT '
+
+# 미리 임포트할 모듈 (main_stock의 각 단계가 실행 중에 임포트하는 모듈들)
+PRELOAD_MODULES = [
+    'pandas',
+    'openpyxl',
+    'bs4',
+    'component.krx.getKrxStockList',
+    'component.stockanalysis.history_cube',
+    'component.stockanalysis.daily_analysis_stocks',
+    'component.stockanalysis.theme_analytics',
+    'component.stockanalysis.snapshot_diff',
+    'component.naverstock.getNaverTheme',
+    'component.naverstock.getNaverThemDtl',
+    'component.naverstock.getStockDtl',
+    'component.naverstock.getStockChart',
+    'component.naverstock.getStockChartImage',
+    'component.getFileSum',
+]
+
+
+def preload_modules():
+    """PRELOAD_MODULES를 임포트합니다. 설치되지 않은 모듈은 건너뛰고, 그 단계가 실행될 때 다시 시도됩니다."""
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"미리 임포트 실패 (건너뜀): {name}: {e}")
+
+
+def make_shared_session():
+    """연결을 재사용하는 공용 세션을 만듭니다."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def start_browser():
+    """KRX 다운로드 단계와 같은 옵션으로 크롬을 띄워 그 단계에 등록합니다. 실패하면 None (단계가 평소처럼 새로 띄움)"""
+    try:
+        from selenium import webdriver
+        from component.krx import getKrxStockList
+
+        driver = webdriver.Chrome(options=getKrxStockList.chrome_options())
+        print(f"브라우저 다운로드 폴더: {getKrxStockList.DOWNLOAD_PATH}")
+        getKrxStockList.set_warm_driver(driver)
+        return driver
+    except Exception as e:
+        print(f"브라우저를 미리 띄우지 못했습니다: {e}")
+        return None
+
+
+@contextlib.contextmanager
+def temporary_env(env):
+    """요청에 담긴 환경변수(TRADING_DAY, NAVER_BACKEND 등)를 실행 동안만 적용합니다."""
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update({key: str(value) for key, value in env.items()})
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+class SocketWriter:
+    """print 출력을 요청한 클라이언트와 작업 프로세스 터미널 양쪽으로 보냅니다."""
+
+    def __init__(self, wfile, console):
+        self.wfile = wfile
+        self.console = console
+        self.lock = threading.Lock()   # 단계 안의 여러 스레드가 동시에 print할 수 있음
+
+    def write(self, text):
+        with self.lock:
+            self.console.write(text)
+            try:
+                self.wfile.write(text.encode('utf-8'))
+                self.wfile.flush()
+            except OSError:
+                pass  # 클라이언트가 먼저 끊어도 단계는 끝까지 실행합니다.
+        return len(text)
+
+    def flush(self):
+        self.console.flush()
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """한 줄짜리 JSON 요청을 받아 처리합니다. {"command": "run"|"status"|"stop", "stages": [...], "env": {...}}"""
+
+    def send_result(self, result):
+        self.wfile.write((RESULT_PREFIX + json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+        except ValueError as e:
+            self.send_result({'ok': False, 'error': f'잘못된 요청: {e}'})
+            return
+
+        command = request.get('command', 'run')
+        if command == 'status':
+            self.send_result(self.server.status())
+        elif command == 'stop':
+            self.send_result({'ok': True})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        elif command == 'run':
+            self.send_result(self.server.run(request.get('stages', []), request.get('env', {}), self.wfile))
+        else:
+            self.send_result({'ok': False, 'error': f'알 수 없는 명령: {command}'})
+
+
+class WarmWorker(socketserver.ThreadingTCPServer):
+    """준비를 마친 상태로 단계 실행 요청을 기다리는 서버입니다."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, browser=False):
+        super().__init__(address, WorkerHandler)
+        self.run_lock = threading.Lock()
+        self.current = None
+        self.runs = 0
+        self.started_at = time.strftime('%Y-%m-%d %H:%M:%S')
+
+        started = time.monotonic()
+        import main_stock
+        self.main_stock = main_stock
+        preload_modules()
+        raw_archive.set_shared_session(make_shared_session())
+        self.driver = start_browser() if browser else None
+        print(f"작업 프로세스 준비 완료 ({time.monotonic() - started:.1f}초)")
+
+    def status(self):
+        return {'ok': True, 'started_at': self.started_at, 'runs': self.runs,
+                'running': self.current, 'browser': self.driver is not None}
+
+    def run(self, stages, env, wfile):
+        """단계들을 순서대로 실행합니다. 다른 실행이 진행 중이면 끝날 때까지 기다립니다."""
+        unknown = [name for name in stages if name not in self.main_stock.STAGES]
+        if not stages or unknown:
+            return {'ok': False, 'error': f"알 수 없는 단계: {', '.join(unknown) or '(없음)'}"}
+
+        with self.run_lock:
+            self.current = stages
+            started = time.monotonic()
+            writer = SocketWriter(wfile, sys.__stdout__)
+            try:
+                with temporary_env(env), contextlib.redirect_stdout(writer):
+                    failed = self.main_stock.run_stages(stages)
+                return {'ok': not failed, 'failed': failed, 'seconds': round(time.monotonic() - started, 2)}
+            except Exception as e:
+                with contextlib.redirect_stdout(writer):
+                    traceback.print_exc(file=sys.stdout)
+                return {'ok': False, 'error': str(e), 'seconds': round(time.monotonic() - started, 2)}
+            finally:
+                self.current = None
+                self.runs += 1
+
+    def server_close(self):
+        if self.driver is not None:
+            self.driver.quit()
+        super().server_close()
+
+
+def send_request(request, port=DEFAULT_PORT):
+    """
+    작업 프로세스에 요청을 보내고, 단계 출력은 그대로 화면에 찍은 뒤 결과를 반환합니다.
+
+    Args:
+        request (dict): {"command": ..., "stages": [...], "env": {...}}
+        port (int): 작업 프로세스 포트
+    Returns:
+        dict: 실행 결과 ({'ok': bool, ...})
+    """
+    with socket.create_connection(('127.0.0.1', port)) as sock:
+        sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+        with sock.makefile('rb') as rfile:
+            for raw in rfile:
+                line = raw.decode('utf-8', errors='replace')
+                if line.startswith(RESULT_PREFIX):
+                    return json.loads(line[len(RESULT_PREFIX):])
+                sys.stdout.write(line)
+    return {'ok': False, 'error': '작업 프로세스가 결과 없이 연결을 끊었습니다.'}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="상주 작업 프로세스 (미리 임포트 + 연결/브라우저 재사용)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"로컬 포트 (기본 {DEFAULT_PORT})")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', help="작업 프로세스 시작")
+    serve_parser.add_argument('--browser', action='store_true', help="KRX 다운로드용 크롬을 미리 띄워 둠")
+    run_parser = sub.add_parser('run', help="단계 실행 요청")
+    run_parser.add_argument('stages', nargs='+', help="실행할 단계 이름 (main_stock.py --list)")
+    run_parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                            help="이번 실행에만 적용할 환경변수 (예: TRADING_DAY=20250102)")
+    sub.add_parser('status', help="작업 프로세스 상태")
+    sub.add_parser('stop', help="작업 프로세스 종료")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = WarmWorker(('127.0.0.1', args.port), browser=args.browser)
+        print(f"단계 실행 요청 대기 중: 127.0.0.1:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+    else:
+        request = {'command': args.command}
+        if args.command == 'run':
+            request['stages'] = args.stages
+            request['env'] = dict(item.split('=', 1) for item in args.env)
+        try:
+            result = send_request(request, args.port)
+        except ConnectionRefusedError:
+            print(f"작업 프로세스가 실행 중이 아닙니다. (python3 -m component.warm_worker serve)")
+            sys.exit(1)
+        print(json.dumps(result, ensure_ascii=False))
+        sys.exit(0 if result.get('ok') else 1)
@@ -0,0 +1,245 @@
+import argparse
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from common import file_manager, get_daily_folder_path, get_today_str, get_last_trading_day_str, get_trading_day_folder_path
+from component import news_store
+from component.krx.krxReport import RateLimiter
+from component.naverstock import getNaverThemDtl, naverJsonApi
+from component.stocknews import getStockNews
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 관심 종목/테마만 빠르게 갱신 (watchlist)]
+# 오늘 관심 있는 20개 종목만 최신으로 보고 싶어도 main_stock.py를 돌리면
+# 모든 테마 상세 페이지와 시가총액 페이지 전체를 다시 받습니다.
+#
+# 이 모듈은 관심 목록(종목코드, 테마명)에 필요한 것만 받습니다.
+#   - 테마 상세 : 지정한 테마 + 관심 종목이 속한 테마의 상세 페이지
+#   - 종목 시세 : 관심 종목 하나씩 (naverJsonApi.get_stock_basic)
+#   - 뉴스 RSS  : 관심 종목 이름으로만 검색
+# 그리고 받은 행을 오늘 거래일 파일에 '끼워 넣습니다'.
+#   naver_themes_dtl_list_YYYYMMDD.csv  : 갱신한 테마의 행만 교체 (수집 상태 파일도 함께)
+#   stock_dtl_list_YYYYMMDD.csv         : 갱신한 종목의 시세 컬럼만 교체
+#   stock_find_news_YYYYMMDD.xlsx       : 새 기사만 누적 저장소에 더한 뒤 다시 생성
+# --rebuild를 주면 분석/종합 단계를 이어서 실행합니다. (입력이 그대로인 계산은 계산 캐시로 건너뜀)
+#
+# 실행 예시:
+#   python3 -m component.watchlist 005930 000660 반도체
+#   python3 -m component.watchlist --file watchlist.txt --rebuild     # 한 줄에 하나씩 (종목코드 또는 테마명)
+# -----------------------------------------------------------------------------------------
+
+WORKERS = 4
+RATE = 4.0   # 전체 스레드 합계 초당 최대 요청 수
+
+# 종목 시세를 갱신할 때 교체하는 컬럼 (종목명/구분/PER은 전체 수집 값을 유지)
+PRICE_COLUMNS = ['현재가', '전일비', '등락률', '거래량']
+
+# --rebuild 시 이어서 실행할 단계 (main_stock.STAGES 이름)
+# (snapshotDiff도 다시 실행해야 종합 파일의 전일대비변화 시트가 갱신된 테마 구성과 맞습니다)
+REBUILD_STAGES = ['daily_analysis_stock', 'themeAnalytics', 'snapshotDiff', 'fileSum']
+
+
+def parse_items(items):
+    """관심 목록을 종목코드(6자리 숫자)와 테마명으로 나눕니다."""
+    codes, themes = [], []
+    for item in items:
+        item = item.strip()
+        if not item or item.startswith('#'):
+            continue
+        if re.fullmatch(r'\d{1,6}', item):
+            codes.append(item.zfill(6))
+        else:
+            themes.append(item)
+    return list(dict.fromkeys(codes)), list(dict.fromkeys(themes))
+
+
+def read_csv_if_exists(path, dtype=None):
+    if not os.path.exists(path):
+        print(f"파일이 없어 건너뜁니다: {os.path.basename(path)}")
+        return None
+    return pd.read_csv(path, dtype=dtype)
+
+
+def rewrite_csv(path, update):
+    """
+    CSV를 잠근 채로 다시 읽어 update(df)의 결과로 교체합니다.
+    (모든 값을 문자열로 읽으므로 손대지 않은 행은 표기가 그대로 유지됩니다)
+    (읽기~쓰기 사이에 다른 프로세스가 같은 파일을 바꾸지 못하게 하려고 잠금을 먼저 잡습니다.
+     atomic_write도 같은 잠금을 잡으므로, 여기서는 임시 파일 + 이름 바꾸기를 직접 하고 manifest에 기록합니다.)
+    """
+    with file_manager.artifact_lock(path):
+        df = update(pd.read_csv(path, dtype=str, keep_default_na=False) if os.path.exists(path) else None)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        os.replace(tmp_path, path)
+    file_manager.record_artifact(path)
+
+
+def merge_theme_detail(df_dtl, fresh):
+    """갱신한 테마의 행만 새 행으로 바꿉니다. (테마 순서는 기존 파일 순서 유지, 새 테마는 뒤에 추가)"""
+    frames = [fresh.pop(theme, group) for theme, group in df_dtl.groupby('테마', sort=False)]
+    frames += list(fresh.values())
+    return pd.concat(frames, ignore_index=True)
+
+
+def merge_state(df_state, fresh, theme_numbers, tradingday):
+    """갱신한 테마의 수집 상태(종목수, 수집일)를 오늘로 바꿉니다."""
+    df_state = df_state.set_index('테마번호') if df_state is not None else pd.DataFrame(columns=['테마', '종목수', '수집일'])
+    for theme, df in fresh.items():
+        df_state.loc[theme_numbers[theme], ['테마', '종목수', '수집일']] = [theme, str(len(df)), tradingday]
+    return df_state.reset_index(names='테마번호')
+
+
+def merge_stock_prices(df_stock, rows):
+    """갱신한 종목의 시세 컬럼만 새 값으로 바꿉니다. (응답에 없던 값(None)은 기존 값 유지)"""
+    fresh = pd.DataFrame(rows, dtype=object).set_index('종목코드')[PRICE_COLUMNS]
+    # 기존 파일은 문자열로 읽으므로 API가 숫자로 준 값도 문자열로 맞춥니다. (pandas 3은 str 컬럼에 숫자를 넣으면 오류)
+    fresh = fresh.where(fresh.isna(), fresh.astype(str))
+    df_stock = df_stock.set_index('종목코드')
+    df_stock.update(fresh)
+    return df_stock.reset_index()
+
+
+def refresh_watchlist(codes, themes, news=True, rebuild=False, workers=WORKERS, rate=RATE):
+    """
+    관심 종목/테마에 필요한 페이지만 받아 오늘 거래일 파일에 반영합니다.
+
+    Args:
+        codes (list): 종목코드 리스트 (6자리)
+        themes (list): 테마명 리스트
+        news (bool): 관심 종목의 뉴스 RSS도 검색할지 여부
+        rebuild (bool): 반영 후 분석/종합 단계(REBUILD_STAGES)를 이어서 실행할지 여부
+        workers (int): 동시에 실행할 스레드 수
+        rate (float): 전체 스레드 합계 초당 최대 요청 수
+    """
+    tradingday = get_last_trading_day_str()
+    folder_path = get_trading_day_folder_path()
+
+    theme_list_path = os.path.join(folder_path, f'naver_themes_list_{tradingday}.csv')
+    dtl_path = os.path.join(folder_path, f'naver_themes_dtl_list_{tradingday}.csv')
+    state_path = os.path.join(folder_path, f'naver_themes_dtl_state_{tradingday}.csv')
+    stock_path = os.path.join(folder_path, f'stock_dtl_list_{tradingday}.csv')
+
+    df_list = read_csv_if_exists(theme_list_path)
+    df_dtl = read_csv_if_exists(dtl_path, dtype={'종목코드': str})
+    df_stock = read_csv_if_exists(stock_path, dtype={'종목코드': str})
+
+    # 1. 받아야 할 테마: 지정한 테마 + 관심 종목이 속한 테마
+    wanted_themes = list(themes)
+    if df_dtl is not None:
+        wanted_themes += df_dtl.loc[df_dtl['종목코드'].isin(codes), '테마'].drop_duplicates().tolist()
+    wanted_themes = list(dict.fromkeys(wanted_themes))
+
+    theme_info = {}
+    if df_list is not None:
+        for _, row in df_list.iterrows():
+            theme_info[row['테마명']] = (row['상세url'].split('no=')[1], row['전일대비'])
+    missing = [theme for theme in wanted_themes if theme not in theme_info]
+    if missing:
+        print(f"테마 목록에 없는 테마는 건너뜁니다: {', '.join(missing)}")
+    wanted_themes = [theme for theme in wanted_themes if theme in theme_info]
+
+    # 종목명/구분은 기존 파일에서 찾습니다. (뉴스 검색어, 시세 행의 구분)
+    names, markets = {}, {}
+    if df_dtl is not None:
+        names.update(zip(df_dtl['종목코드'], df_dtl['종목명']))
+    if df_stock is not None:
+        names.update(zip(df_stock['종목코드'], df_stock['종목명']))
+        markets.update(zip(df_stock['종목코드'], df_stock['구분']))
+
+    print(f"관심 목록 갱신: 종목 {len(codes)}개, 테마 {len(wanted_themes)}개 (전체 테마 {len(theme_info)}개 중)")
+
+    # 2. 필요한 페이지만 동시에 받기 (모든 스레드가 하나의 속도 제한을 공유)
+    limiter = RateLimiter(rate)
+
+    def fetch_theme(theme):
+        theme_no, theme_rate = theme_info[theme]
+        limiter.acquire()
+        return pd.DataFrame(getNaverThemDtl.get_theme_detail(theme, theme_rate, theme_no))
+
+    def fetch_stock(code):
+        limiter.acquire()
+        return naverJsonApi.get_stock_basic(code, markets.get(code, ''))
+
+    def fetch_news(code):
+        limiter.acquire()
+        return getStockNews.search_google_news_rss(names[code])
+
+    tasks = [('theme', theme, fetch_theme) for theme in wanted_themes]
+    if df_stock is not None:
+        tasks += [('stock', code, fetch_stock) for code in codes]
+    if news:
+        tasks += [('news', code, fetch_news) for code in codes if code in names]
+
+    def run(task):
+        kind, key, fetch = task
+        try:
+            return kind, key, fetch(key)
+        except Exception as e:
+            print(f"관심 목록 수집 실패 ({kind}, {key}): {e}")
+            return kind, key, None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = [result for result in executor.map(run, tasks) if result[2] is not None]
+
+    fresh_themes = {key: value for kind, key, value in results if kind == 'theme' and not value.empty}
+    stock_rows = [value for kind, key, value in results if kind == 'stock']
+    news_items = {key: value for kind, key, value in results if kind == 'news'}
+
+    # 3. 오늘 거래일 파일에 반영 (다른 프로세스가 같은 파일을 고치는 중이면 기다림)
+    if fresh_themes and df_dtl is not None:
+        theme_numbers = {theme: theme_info[theme][0] for theme in fresh_themes}
+        rewrite_csv(dtl_path, lambda df: merge_theme_detail(df, dict(fresh_themes)))
+        rewrite_csv(state_path, lambda df: merge_state(df, fresh_themes, theme_numbers, tradingday))
+        print(f"테마 상세 반영: {len(fresh_themes)}개 테마")
+
+    if stock_rows:
+        rewrite_csv(stock_path, lambda df: merge_stock_prices(df, stock_rows))
+        print(f"종목 시세 반영: {len(stock_rows)}개 종목")
+
+    if news:
+        # 뉴스는 getStockNews와 같은 저장소/파일(오늘 날짜 폴더)에 반영합니다.
+        seen = news_store.SeenSet(getStockNews.NEWS_STORE_NAME)
+        all_news_data = []
+        for idx, code in enumerate(codes):
+            items = seen.filter_new(news_items.get(code) or [],
+                                    key=lambda item: f"{code}|{news_store.normalize_url(item['url'])}")
+            for item in items:
+                all_news_data.append({
+                    '번호': idx + 1,
+                    '종목코드': code,
+                    '종목명': names[code],
+                    '뉴스매체': item['media'],
+                    '뉴스내용': item['title'],
+                    'url': item['url'],
+                })
+        getStockNews.save_stock_news(all_news_data, seen, get_today_str(), get_daily_folder_path())
+
+    if rebuild:
+        import main_stock
+        main_stock.run_stages(REBUILD_STAGES)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="관심 종목/테마만 빠르게 갱신")
+    parser.add_argument('items', nargs='*', help="종목코드(6자리) 또는 테마명")
+    parser.add_argument('--file', help="관심 목록 파일 (한 줄에 하나, #으로 시작하면 주석)")
+    parser.add_argument('--no-news', action='store_true', help="뉴스 RSS 검색 생략")
+    parser.add_argument('--rebuild', action='store_true', help=f"반영 후 {', '.join(REBUILD_STAGES)} 단계 실행")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="동시에 실행할 스레드 수")
+    parser.add_argument('--rate', type=float, default=RATE, help="초당 최대 요청 수 (전체 스레드 합계)")
+    args = parser.parse_args()
+
+    items = list(args.items)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            items += f.read().splitlines()
+    codes, themes = parse_items(items)
+    if not codes and not themes:
+        parser.error("관심 종목코드나 테마명을 하나 이상 지정하세요.")
+
+    refresh_watchlist(codes, themes, news=not args.no_news, rebuild=args.rebuild,
+                      workers=args.workers, rate=args.rate)
@@ -1,8 +1,64 @@
+import datetime
+import hashlib
+import json
 import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl  # macOS / Linux
+except ImportError:
+    fcntl = None
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 원자적(atomic) 파일 쓰기와 산출물 목록(manifest)]
+# "기존 파일 삭제 -> 같은 자리에 쓰기" 방식은 쓰는 도중 프로그램이 죽으면 반쯤 쓰인 파일이 남고,
+# 두 단계(또는 두 번의 실행)가 같은 파일을 동시에 쓰면 내용이 섞일 수 있습니다.
+#
+# atomic_write()는 다음 순서로 파일을 씁니다.
+#   1. 같은 폴더의 임시 파일에 쓴다
+#   2. fsync로 디스크에 확실히 기록한다
+#   3. os.replace로 이름을 바꾼다 (이름 바꾸기는 한 번에 일어나므로 읽는 쪽은 항상 완전한 파일만 봅니다)
+#   4. 폴더의 manifest.json에 파일 크기와 SHA-256 체크섬, 완료 시각을 기록한다
+# 쓰는 동안에는 산출물별 잠금 파일(.locks/<파일명>.lock)을 잡아 다른 프로세스가 같은 파일을 쓰지 못하게 합니다.
+#
+# 사용 예:
+#   with file_manager.atomic_write(save_path) as tmp_path:
+#       df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+# -----------------------------------------------------------------------------------------
+
+MANIFEST_FILENAME = 'manifest.json'
+
+
+def file_sha256(path):
+    """파일의 SHA-256 체크섬을 계산합니다. (1MB씩 나눠 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fsync_dir(folder_path):
+    """이름 바꾸기 결과가 디스크에 남도록 폴더도 fsync 합니다. (지원하지 않는 OS에서는 생략)"""
+    try:
+        fd = os.open(folder_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 
 class FileManager:
     def __init__(self):
         self.current_path = os.getcwd()
+        # 같은 프로세스 안의 스레드끼리 쓰는 잠금 (경로 -> Lock)
+        self.thread_locks = {}
+        self.thread_locks_guard = threading.Lock()
     
     def make_folder(self, today):
         """
@@ -59,6 +115,108 @@ class FileManager:
         else:
             raise ValueError(f"존재하지 않는 경로입니다: {path}")
 
+    @contextmanager
+    def artifact_lock(self, path):
+        """
+        산출물 하나에 대한 잠금을 잡습니다. (같은 프로세스의 스레드 + 다른 프로세스 모두)
+        잠금 파일은 같은 폴더의 '.locks/<파일명>.lock'입니다.
+
+        Args:
+            path (str): 잠글 산출물 파일 경로
+        """
+        path = os.path.abspath(path)
+        with self.thread_locks_guard:
+            thread_lock = self.thread_locks.setdefault(path, threading.Lock())
+
+        with thread_lock:
+            lock_dir = os.path.join(os.path.dirname(path), '.locks')
+            os.makedirs(lock_dir, exist_ok=True)
+            with open(os.path.join(lock_dir, os.path.basename(path) + '.lock'), 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def atomic_write(self, path):
+        """
+        임시 파일 경로를 넘겨주고, with 블록이 정상 종료되면 원래 경로로 원자적으로 교체합니다.
+        블록 안에서 예외가 나면 임시 파일만 지우고 기존 파일은 그대로 둡니다.
+
+        Args:
+            path (str): 최종 저장할 파일 경로
+        Yields:
+            str: 실제로 써야 할 임시 파일 경로 (확장자는 원래 파일과 같음)
+        """
+        folder_path, filename = os.path.split(os.path.abspath(path))
+        root, ext = os.path.splitext(filename)
+        # 확장자를 유지해야 pandas가 엑셀 엔진 등을 올바르게 고릅니다.
+        tmp_path = os.path.join(folder_path, f'.{root}.{os.getpid()}.{threading.get_ident()}.tmp{ext}')
+
+        with self.artifact_lock(path):
+            try:
+                yield tmp_path
+                if not os.path.exists(tmp_path):
+                    # 블록이 아무 파일도 만들지 않았으면 기존 파일을 그대로 두고 기록도 하지 않습니다.
+                    print(f"저장할 내용이 없어 파일을 바꾸지 않았습니다: {filename}")
+                    return
+                with open(tmp_path, 'rb+') as f:
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+                fsync_dir(folder_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            self.record_artifact(path)
+
+    def read_manifest(self, folder_path):
+        """폴더의 manifest.json을 읽어 파일명 -> {size, sha256, completed_at} 딕셔너리로 반환합니다."""
+        manifest_path = os.path.join(folder_path, MANIFEST_FILENAME)
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def record_artifact(self, path):
+        """완성된 산출물의 크기와 체크섬을 폴더의 manifest.json에 기록합니다."""
+        folder_path, filename = os.path.split(os.path.abspath(path))
+        manifest_path = os.path.join(folder_path, MANIFEST_FILENAME)
+        entry = {
+            'size': os.path.getsize(path),
+            'sha256': file_sha256(path),
+            'completed_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+
+        with self.artifact_lock(manifest_path):
+            manifest = self.read_manifest(folder_path)
+            manifest[filename] = entry
+            tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, manifest_path)
+
+    def is_artifact_complete(self, path, verify=False):
+        """
+        manifest에 완료로 기록되어 있고 크기가 같은 산출물인지 확인합니다.
+
+        Args:
+            path (str): 확인할 파일 경로
+            verify (bool): True이면 체크섬까지 다시 계산해서 비교합니다.
+        Returns:
+            bool: 완성된 산출물이면 True
+        """
+        folder_path, filename = os.path.split(os.path.abspath(path))
+        entry = self.read_manifest(folder_path).get(filename)
+        if entry is None or not os.path.exists(path) or os.path.getsize(path) != entry['size']:
+            return False
+        return not verify or file_sha256(path) == entry['sha256']
+
 # 사용 예시
 if __name__ == "__main__":
     # FileManager 인스턴스 생성
@@ -1,34 +1,80 @@
-
-from component.krx import getKrxStockList
-from component.naverstock import getNaverTheme
-from component.naverstock import getNaverThemDtl
-from component.naverstock import getStockDtl
-from component import getFileSum
-from component.stockanalysis import daily_analysis_stocks
-from component.naverstock import getStockChart
-# from file_manager import FileManager
-import datetime, time
-import pandas as pd
+import argparse
+import sys
+import time
+import traceback
 from common import file_manager, get_daily_folder_path, get_today_str, get_last_trading_day_str,get_trading_day_folder_path
 
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 단계(stage) 등록소와 지연 임포트]
+# 예전에는 이 파일을 읽는 순간 모든 컴포넌트(selenium, pyperclip, openpyxl, BeautifulSoup, pandas 등)를
+# 한꺼번에 임포트했기 때문에, 단계 하나만 실행해도 시작이 느렸습니다.
+#
+# 이제 각 단계 함수는 실행될 때 자기에게 필요한 모듈만 임포트합니다.
+# @stage로 등록된 함수는 STAGES에 이름으로 저장되며, 명령줄에서 이름으로 골라 실행할 수 있습니다.
+#
+# 실행 예시:
+#   python3 main_stock.py                       # 전체 파이프라인 (PIPELINE 순서)
+#   python3 main_stock.py stockChart fileSum    # 지정한 단계만 순서대로
+#   python3 main_stock.py stockChartImage       # 선택 단계 (PIPELINE에 없으므로 이름을 지정할 때만 실행)
+#   python3 main_stock.py --list                # 등록된 단계 목록
+# -----------------------------------------------------------------------------------------
+
+# 단계 이름 -> (함수, 설명)
+STAGES = {}
+
+
+def stage(description):
+    """단계 함수를 STAGES에 등록하는 데코레이터입니다."""
+    def register(func):
+        STAGES[func.__name__] = (func, description)
+        return func
+    return register
+
+
+@stage("KRX 전종목 시세 다운로드 (selenium)")
 def krxStockList():
+    from component.krx import getKrxStockList
     getKrxStockList.selenium_get_file()
     # getKrxStockList.get_krx_stock_list()
     # getKrxStockList.test_file()
 
+@stage("일별 시세 큐브에 추가")
+def historyCube():
+    from component.stockanalysis import history_cube
+    history_cube.append_krx_snapshot()
+
+@stage("거래대금/등락률 상위 100 교집합")
 def krxStockList100():
-    getKrxStockList.get_krx_100()  
+    from component.krx import getKrxStockList
+    getKrxStockList.get_krx_100()
 
+@stage("전일대비 15%, 거래대금500억이상 종목 분석")
 def daily_analysis_stock():
+    from component.stockanalysis import daily_analysis_stocks
     daily_analysis_stocks.analyze_stocks_with_themes()
 
+@stage("테마 강도/확산도")
+def themeAnalytics():
+    from component.stockanalysis import theme_analytics
+    theme_analytics.themeAnalytics()
+
+@stage("전일 대비 변화 (테마 편입/이탈, 신규 선정, 순위 변화)")
+def snapshotDiff():
+    from component.stockanalysis import snapshot_diff
+    snapshot_diff.snapshotDiff()
+
+@stage("네이버 테마 목록 수집")
 def naverTheme():
+    import pandas as pd
+    from component.naverstock import getNaverTheme
+    from component import raw_archive
+
     # 모든 페이지의 데이터 수집
     all_themes_data = []
     for page in range(1, 9):  # 1페이지부터 8페이지까지
         page_data = getNaverTheme.get_theme_data(page)
         all_themes_data.extend(page_data)
-        time.sleep(1)  # 서버 부하 방지를 위한 지연
+        raw_archive.polite_sleep(1)  # 서버 부하 방지를 위한 지연 (replay 모드에서는 생략)
 
     for item in all_themes_data:
         print(item)
@@ -42,19 +88,25 @@ def naverTheme():
 
     # CSV 파일로 저장
     output_filename = f'naver_themes_list_{tradingday}.csv'
-    
-    # 동일 파일 삭제
-    file_manager.check_and_delete_file(folder_path+'/'+ output_filename)
 
     # # DataFrame 생성 및 CSV 저장
+    # 임시 파일에 쓴 뒤 한 번에 교체합니다. (쓰는 도중 중단되어도 반쯤 쓰인 파일이 남지 않음)
     df = pd.DataFrame(all_themes_data)
-    df.to_csv(folder_path+'/'+ output_filename, index=False, encoding='utf-8-sig')
+    with file_manager.atomic_write(folder_path+'/'+ output_filename) as tmp_path:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
     print(f"데이터가 {output_filename}로 저장되었습니다.")
 
+@stage("네이버 테마 상세 (구성 종목) 수집")
 def naverThemeDtl():
+    from component.naverstock import getNaverThemDtl
     getNaverThemDtl.naverThemeDtl()
 
+@stage("네이버 시가총액 페이지 종목 상세 수집")
 def stockDtl():
+    import pandas as pd
+    from component.naverstock import getStockDtl
+    from component import raw_archive
+
     # 거래일자 설정
     # 주말에는 장이 열리지 않으므로, 가장 최근 평일(거래일)을 계산해서 가져옵니다.
     tradingday = get_last_trading_day_str()
@@ -73,32 +125,88 @@ def stockDtl():
                 break
 
             all_stocks_data.extend(stocks_data)
-            time.sleep(1)
+            raw_archive.polite_sleep(1)
 
     # CSV 파일로 저장
     output_filename = f'stock_dtl_list_{tradingday}.csv'
 
-    # 동일 파일 삭제
-    file_manager.check_and_delete_file(folder_path+'/'+ output_filename)
-    
     # DataFrame 생성 및 CSV 저장
+    # 임시 파일에 쓴 뒤 한 번에 교체합니다. (쓰는 도중 중단되어도 반쯤 쓰인 파일이 남지 않음)
     df = pd.DataFrame(all_stocks_data)
-    df.to_csv(folder_path+'/'+ output_filename, index=False, encoding='utf-8-sig')
+    with file_manager.atomic_write(folder_path+'/'+ output_filename) as tmp_path:
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
     print(f"데이터가 {output_filename}로 저장되었습니다.")
 
+@stage("종합 엑셀(total_YYYYMMDD.xlsx) 생성")
 def fileSum():
+    from component import getFileSum
     getFileSum.getFileSum()
 
+@stage("주식 차트 URL 생성")
 def stockChart():
+    from component.naverstock import getStockChart
     getStockChart.generate_chart_urls()
 
+@stage("차트 이미지 미리 받기 (엑셀 썸네일 / HTML, 선택 단계)")
+def stockChartImage():
+    from component.naverstock import getStockChartImage
+    getStockChartImage.prefetchStockCharts()
+
+
+# 전체 실행 순서 (여기에 없는 단계(stockChartImage)는 이름을 지정했을 때만 실행합니다)
+PIPELINE = [
+    'krxStockList',
+    'historyCube',
+    'krxStockList100',
+    'naverTheme',
+    'naverThemeDtl',
+    'stockDtl',
+    'daily_analysis_stock',
+    'themeAnalytics',
+    'stockChart',
+    'snapshotDiff',
+    'fileSum',
+]
+
+
+def run_stages(names):
+    """
+    지정한 단계들을 순서대로 실행하고 단계별 소요 시간을 출력합니다.
+    한 단계가 실패하면 오류를 출력하고 다음 단계로 넘어가며, 마지막에 실패한 단계를 모아 보여줍니다.
+
+    Returns:
+        list: 실패한 단계 이름 리스트 (모두 성공하면 빈 리스트)
+    """
+    failed = []
+    for name in names:
+        func, description = STAGES[name]
+        started = time.monotonic()
+        try:
+            func()
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            print(f"[단계 실패] {name} - {description} ({time.monotonic() - started:.1f}초)")
+            failed.append(name)
+            continue
+        print(f"[단계 완료] {name} - {description} ({time.monotonic() - started:.1f}초)")
+
+    if failed:
+        print(f"실패한 단계 {len(failed)}개: {', '.join(failed)} (이후 단계는 이전 산출물로 실행되었을 수 있습니다)")
+    return failed
+
+
 if __name__ == '__main__':
-    krxStockList()
-    krxStockList100()
-    naverTheme()
-    naverThemeDtl()
-    stockDtl()
-    daily_analysis_stock()  # 전일대비 15%, 거래대금500억이상
-    stockChart() # stock chart
-    fileSum()
-    
+    parser = argparse.ArgumentParser(description="주식 데이터 수집/분석 파이프라인")
+    parser.add_argument('stages', nargs='*', help="실행할 단계 이름 (없으면 전체 실행)")
+    parser.add_argument('--list', action='store_true', help="등록된 단계 목록 출력")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in PIPELINE + [name for name in STAGES if name not in PIPELINE]:
+            print(f"{name:22s} {STAGES[name][1]}")
+    else:
+        unknown = [name for name in args.stages if name not in STAGES]
+        if unknown:
+            parser.error(f"알 수 없는 단계: {', '.join(unknown)} (--list로 확인)")
+        failed = run_stages(args.stages or PIPELINE)
+        sys.exit(1 if failed else 0)
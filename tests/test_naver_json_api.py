@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from component.naverstock import naverJsonApi
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: 네이버 JSON API 백엔드 테스트 (로컬 대역 서버 사용)]
+# 네이버에 실제로 요청하지 않고, 127.0.0.1에 띄운 작은 HTTP 서버(대역, stand-in)가
+# 모바일 API와 같은 모양의 JSON을 돌려주게 한 뒤 NAVER_API_BASE를 그 주소로 돌려 놓습니다.
+# JSON 백엔드가 HTML 수집기와 '같은 컬럼, 같은 표기'의 행을 만드는지 확인합니다.
+#
+# 실행: (저장소 최상위 폴더에서)
+#   python3 -m unittest tests.test_naver_json_api
+# -----------------------------------------------------------------------------------------
+
+# HTML 수집기(getStockDtl, getNaverTheme, getNaverThemDtl)가 만드는 컬럼 (순서까지 같아야 함)
+MARKET_COLUMNS = ['종목코드', '종목명', '구분', '현재가', '전일비', '등락률', '거래량', 'PER']
+THEME_COLUMNS = ['테마명', '전일대비', '상세url', '상승', '보합', '하락']
+THEME_DETAIL_COLUMNS = ['테마', '테마등락률', '종목코드', '종목명', '전일비', '등락률', '거래량', '편입사유']
+
+
+def api_stock(code, name, price, diff, direction, ratio, volume, **extra):
+    item = {
+        'itemCode': code,
+        'stockName': name,
+        'closePrice': price,
+        'compareToPreviousClosePrice': diff,
+        'compareToPreviousPrice': {'code': direction},
+        'fluctuationsRatio': ratio,
+        'accumulatedTradingVolume': volume,
+    }
+    item.update(extra)
+    return item
+
+
+RESPONSES = {
+    '/api/stocks/marketValue/KOSPI': {'stocks': [
+        api_stock('005930', '삼성전자', '72,000', '1,500', '2', '2.13', '12,345,678', per='12.34'),
+        api_stock('000660', 'SK하이닉스', '180,000', '-3,000', '5', '-1.64', '2,345,678'),
+        api_stock('035420', 'NAVER', '200,000', '0', '3', '0.00', '345,678'),
+    ]},
+    # 응답 형식이 바뀐 경우 (필수 필드 itemCode 없음)
+    '/api/stocks/marketValue/KOSDAQ': {'stocks': [{'stockName': '형식변경'}]},
+    '/api/stocks/theme': {'groups': [
+        {'no': 123, 'name': '반도체', 'changeRate': 1.234, 'riseCount': 10, 'steadyCount': 2, 'fallCount': 3},
+        {'no': 456, 'name': '게임', 'changeRate': -0.5, 'riseCount': 1, 'steadyCount': 0, 'fallCount': 7},
+        {'no': 789, 'name': '보합테마', 'changeRate': 0, 'riseCount': 0, 'steadyCount': 4, 'fallCount': 0},
+    ]},
+    '/api/stocks/theme/123': {'stocks': [
+        api_stock('005930', '삼성전자', '72,000', '1,500', '2', '2.13', '12,345,678', themeReason=' 메모리 반도체 1위 '),
+        api_stock('000660', 'SK하이닉스', '180,000', '-3,000', '5', '-1.64', '2,345,678'),
+    ]},
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """RESPONSES에 있는 경로면 JSON을, 없으면 404를 돌려주는 대역 서버입니다."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = RESPONSES.get(urlsplit(self.path).path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class NaverJsonApiTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.saved_env = {key: os.environ.get(key) for key in ('NAVER_API_BASE', 'RAW_ARCHIVE')}
+        os.environ['NAVER_API_BASE'] = f'http://127.0.0.1:{cls.server.server_port}'
+        os.environ['RAW_ARCHIVE'] = 'off'   # 테스트 응답을 원본 보관소에 기록하지 않음
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        for key, value in cls.saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    def assertFormat(self, rows, column, pattern):
+        for row in rows:
+            self.assertRegex(str(row[column]), pattern, f'{column} 표기가 HTML 수집기와 다릅니다: {row}')
+
+    def test_market_cap_info(self):
+        rows = naverJsonApi.get_market_cap_info(0, 1)
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            self.assertEqual(list(row), MARKET_COLUMNS)
+        self.assertFormat(rows, '종목코드', r'^\d{6}$')
+        self.assertFormat(rows, '구분', r'^코스피$')
+        self.assertFormat(rows, '현재가', r'^[\d,]+$')
+        self.assertFormat(rows, '전일비', r'^([+-][\d,]+|0)$')
+        self.assertFormat(rows, '등락률', r'^[+-]?\d+\.\d{2}%$')
+        self.assertFormat(rows, '거래량', r'^[\d,]+$')
+        self.assertEqual([row['전일비'] for row in rows], ['+1,500', '-3,000', '0'])
+        self.assertEqual([row['등락률'] for row in rows], ['+2.13%', '-1.64%', '0.00%'])
+        self.assertEqual([row['PER'] for row in rows], ['12.34', 'N/A', 'N/A'])
+
+    def test_stock_dtl_changed_payload_returns_none(self):
+        # 응답 형식이 바뀌어도 getStockDtl은 HTML 수집과 같이 예외 대신 None을 돌려줍니다.
+        from component.naverstock import getStockDtl
+        saved = os.environ.get('NAVER_BACKEND')
+        os.environ['NAVER_BACKEND'] = 'json'
+        try:
+            url = 'https://finance.naver.com/sise/sise_market_sum.naver?sosok=1&page=1'
+            self.assertIsNone(getStockDtl.get_market_cap_info(1, url))
+        finally:
+            if saved is None:
+                os.environ.pop('NAVER_BACKEND', None)
+            else:
+                os.environ['NAVER_BACKEND'] = saved
+
+    def test_theme_data(self):
+        rows = naverJsonApi.get_theme_data(1)
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            self.assertEqual(list(row), THEME_COLUMNS)
+        self.assertEqual([row['전일대비'] for row in rows], ['+1.23%', '-0.50%', '0.00%'])
+        self.assertFormat(rows, '상세url', r'sise_group_detail\.naver\?type=theme&no=\d+$')
+        for column in ('상승', '보합', '하락'):
+            self.assertFormat(rows, column, r'^\d+$')
+        # 다음 단계(테마 상세)는 URL의 'no=' 뒤 번호로 테마를 찾습니다.
+        self.assertEqual(rows[0]['상세url'].split('no=')[1], '123')
+
+    def test_theme_detail(self):
+        rows = naverJsonApi.get_theme_detail('반도체', '+1.23%', '123')
+        self.assertEqual(len(rows), 2)
+        for row in rows:
+            self.assertEqual(list(row), THEME_DETAIL_COLUMNS)
+        self.assertFormat(rows, '테마', r'^반도체$')
+        self.assertFormat(rows, '테마등락률', r'^\+1\.23%$')
+        self.assertFormat(rows, '전일비', r'^([+-][\d,]+|0)$')
+        self.assertFormat(rows, '등락률', r'^[+-]?\d+\.\d{2}$')
+        self.assertFormat(rows, '거래량', r'^\d+$')
+        self.assertEqual(rows[0]['편입사유'], '메모리 반도체 1위')
+        self.assertEqual(rows[1]['편입사유'], '')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import datetime
+
+# -----------------------------------------------------------------------------------------
+# [교육용 주석: KRX 거래일 달력]
+# 주말뿐 아니라 KRX 휴장일(공휴일, 대체공휴일, 선거일, 연말 휴장일 등)을 고려하여
+# 거래일 여부를 판단합니다.
+#
+# 휴장일 표는 KRX 공지(정보데이터시스템 > 휴장일) 기준으로 미리 계산해 둔 값입니다.
+# 매년 말 다음 해 휴장일이 공지되면 KRX_HOLIDAYS에 추가해주세요.
+# 표에 없는 연도는 주말만 제외합니다.
+# -----------------------------------------------------------------------------------------
+
+KRX_HOLIDAYS = {
+    2024: [
+        '20240101',                          # 신정
+        '20240209', '20240212',              # 설날 연휴, 대체공휴일
+        '20240301',                          # 삼일절
+        '20240410',                          # 제22대 국회의원 선거
+        '20240501',                          # 근로자의 날
+        '20240506',                          # 어린이날 대체공휴일
+        '20240515',                          # 부처님오신날
+        '20240606',                          # 현충일
+        '20240815',                          # 광복절
+        '20240916', '20240917', '20240918',  # 추석 연휴
+        '20241001',                          # 국군의 날 (임시공휴일)
+        '20241003',                          # 개천절
+        '20241009',                          # 한글날
+        '20241225',                          # 성탄절
+        '20241231',                          # 연말 휴장일
+    ],
+    2025: [
+        '20250101',                          # 신정
+        '20250127',                          # 임시공휴일
+        '20250128', '20250129', '20250130',  # 설날 연휴
+        '20250303',                          # 삼일절 대체공휴일
+        '20250501',                          # 근로자의 날
+        '20250505',                          # 어린이날, 부처님오신날
+        '20250506',                          # 대체공휴일
+        '20250603',                          # 제21대 대통령 선거
+        '20250606',                          # 현충일
+        '20250815',                          # 광복절
+        '20251003',                          # 개천절
+        '20251006', '20251007', '20251008',  # 추석 연휴, 대체공휴일
+        '20251009',                          # 한글날
+        '20251225',                          # 성탄절
+        '20251231',                          # 연말 휴장일
+    ],
+    2026: [
+        '20260101',                          # 신정
+        '20260216', '20260217', '20260218',  # 설날 연휴
+        '20260302',                          # 삼일절 대체공휴일
+        '20260501',                          # 근로자의 날
+        '20260505',                          # 어린이날
+        '20260525',                          # 부처님오신날 대체공휴일
+        '20260603',                          # 제9회 전국동시지방선거
+        '20260817',                          # 광복절 대체공휴일
+        '20260924', '20260925',              # 추석 연휴
+        '20261005',                          # 개천절 대체공휴일
+        '20261009',                          # 한글날
+        '20261225',                          # 성탄절
+        '20261231',                          # 연말 휴장일
+    ],
+    2027: [
+        '20270101',                          # 신정
+        '20270208', '20270209',              # 설날 연휴, 대체공휴일
+        '20270301',                          # 삼일절
+        '20270505',                          # 어린이날
+        '20270513',                          # 부처님오신날
+        '20270816',                          # 광복절 대체공휴일
+        '20270914', '20270915', '20270916',  # 추석 연휴
+        '20271004',                          # 개천절 대체공휴일
+        '20271011',                          # 한글날 대체공휴일
+        '20271227',                          # 성탄절 대체공휴일
+        '20271231',                          # 연말 휴장일
+    ],
+}
+
+# 빠른 조회를 위해 date 객체 집합으로 변환해 둡니다.
+_HOLIDAY_DATES = {
+    datetime.datetime.strptime(day, "%Y%m%d").date()
+    for days in KRX_HOLIDAYS.values()
+    for day in days
+}
+
+
+def to_date(day):
+    """'YYYYMMDD' 문자열 또는 date 객체를 date 객체로 변환합니다."""
+    if isinstance(day, datetime.datetime):
+        return day.date()
+    if isinstance(day, datetime.date):
+        return day
+    return datetime.datetime.strptime(str(day), "%Y%m%d").date()
+
+
+def is_holiday_table_covered(day):
+    """휴장일 표에 해당 연도가 등록되어 있는지 확인합니다."""
+    return to_date(day).year in KRX_HOLIDAYS
+
+
+def is_trading_day(day):
+    """
+    KRX 거래일인지 확인합니다. (주말과 휴장일이 아니면 거래일)
+
+    Args:
+        day (str | datetime.date): 확인할 날짜 ('YYYYMMDD' 또는 date)
+    Returns:
+        bool: 거래일이면 True
+    """
+    date = to_date(day)
+    return date.weekday() < 5 and date not in _HOLIDAY_DATES
+
+
+def get_last_trading_day(day=None):
+    """
+    주어진 날짜(기본: 오늘) 또는 그 이전의 가장 가까운 거래일을 반환합니다.
+
+    Returns:
+        datetime.date: 거래일
+    """
+    date = to_date(day) if day is not None else datetime.date.today()
+    while not is_trading_day(date):
+        date -= datetime.timedelta(days=1)
+    return date
+
+
+def get_previous_trading_day(day):
+    """주어진 날짜 직전의 거래일을 반환합니다. (당일 제외)"""
+    return get_last_trading_day(to_date(day) - datetime.timedelta(days=1))
+
+
+def trading_days_between(start, end):
+    """
+    start ~ end (양 끝 포함) 사이의 거래일 목록을 'YYYYMMDD' 문자열로 반환합니다.
+
+    Args:
+        start (str | datetime.date): 시작일
+        end (str | datetime.date): 종료일
+    Returns:
+        list: 거래일 문자열 리스트 (오래된 순)
+    """
+    start_date, end_date = to_date(start), to_date(end)
+    days = []
+    date = start_date
+    while date <= end_date:
+        if is_trading_day(date):
+            days.append(date.strftime("%Y%m%d"))
+        date += datetime.timedelta(days=1)
+    return days